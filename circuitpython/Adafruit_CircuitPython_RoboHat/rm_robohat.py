@@ -42,11 +42,19 @@ Implementation Notes
 """
 
 import sys
+import time
+from array import array
 
-import board
-import busio
+try:
+    import threading
+except ImportError:
+    threading = None
 
-from micropython import const
+try:
+    from micropython import const
+except ImportError:
+    def const(x):
+        return x
 
 #pylint: disable=wrong-import-position
 try:
@@ -58,12 +66,8 @@ except ValueError:
     # Don't change sys.path if it doesn't contain "lib" or ".frozen".
     pass
 
-from adafruit_seesaw.seesaw import Seesaw
-from adafruit_seesaw.robohat import MM1_Pinmap
-from adafruit_seesaw.pwmout import PWMOut
-from adafruit_motor.servo import Servo, ContinuousServo
-from adafruit_motor.motor import DCMotor
-from adafruit_motor.stepper import StepperMotor
+# The seesaw driver, board and busio are imported where first needed, so
+# importing this module for its constants costs next to nothing.
 
 __version__ = "0.0.0-auto.0"
 __repo__ = "https://github.com/robotics-masters/Adafruit_CircuitPython_RoboHat.git"
@@ -88,6 +92,26 @@ _RCH4 = const(4)
 
 _NEOPIXEL = const(20)
 
+# entries in an angle to duty cycle table: 1.5 us steps over 750-2250 us, inside
+# a servo's dead band
+_TABLE_SIZE = const(1025)
+
+_duty_tables = {}
+
+
+def _duty_table(frequency, min_pulse, max_pulse):
+    # 16-bit duty cycles for pulses evenly spaced from min_pulse to max_pulse,
+    # shared by every servo with the same settings
+    key = (frequency, min_pulse, max_pulse)
+    table = _duty_tables.get(key)
+    if table is None:
+        table = array("H", bytes(2 * _TABLE_SIZE))
+        for i in range(_TABLE_SIZE):
+            pulse = min_pulse + (max_pulse - min_pulse) * i / (_TABLE_SIZE - 1)
+            table[i] = min(0xFFFF, int(pulse * frequency * 0xFFFF / 1000000 + 0.5))
+        _duty_tables[key] = table
+    return table
+
 #pylint: disable=too-few-public-methods
 class MM1TouchIn:
     """Imitate touchio.TouchIn."""
@@ -107,6 +131,420 @@ class MM1TouchIn:
         return self.raw_value > self.threshold
 
 
+class MM1PulseOut:
+    """Pulses of a set width on a Robo HAT MM1 PWM terminal, for servos and
+    ESCs driven by pulse width in microseconds.
+
+    The duty cycle per microsecond is worked out once for the frequency, in
+    fixed point, and each write sends a prepacked PWM frame (see
+    ``Seesaw.write_pwm_frame``).
+
+       :param ~adafruit_seesaw.seesaw.Seesaw seesaw: The Robo HAT's seesaw
+       :param int pin: Seesaw pin of the terminal
+       :param int frequency: The frame rate, in Hz"""
+
+    def __init__(self, seesaw, pin, *, frequency=50):
+        self._seesaw = seesaw
+        self.pin = pin
+        self._frame = seesaw.pwm_frame(pin)
+        self.frequency = frequency
+
+    @property
+    def frequency(self):
+        """The PWM frequency in Hz. Terminals on the same timer share it."""
+        return self._frequency
+
+    @frequency.setter
+    def frequency(self, value):
+        self._seesaw.set_pwm_freq(self.pin, value)
+        self._frequency = value
+        # duty cycle per microsecond, as 16.16 fixed point
+        self._duty_per_us = int(value * 0xFFFF * 65536 / 1000000 + 0.5)
+        self._rescale()
+
+    def _rescale(self):
+        # the duty cycle per microsecond changed; for subclasses with tables
+        pass
+
+    def _write(self, duty):
+        frame = self._frame
+        frame[3] = duty >> 8
+        frame[4] = duty & 0xFF
+        self._seesaw.write_pwm_frame(frame)
+
+    def _set_duty(self, duty):
+        self._write(duty)
+
+    def _duty_for_us(self, microseconds):
+        duty = int(microseconds * self._duty_per_us) >> 16
+        if not 0 <= duty <= 0xFFFF:
+            raise ValueError("Pulse longer than the frame")
+        return duty
+
+    @property
+    def duty_cycle(self):
+        """The 16-bit duty cycle last written."""
+        return (self._frame[3] << 8) | self._frame[4]
+
+    @duty_cycle.setter
+    def duty_cycle(self, value):
+        if not 0 <= value <= 0xFFFF:
+            raise ValueError("Out of range")
+        self._set_duty(value)
+
+    @property
+    def pulse_us(self):
+        """The pulse width in microseconds."""
+        return (self.duty_cycle * 65536 + self._duty_per_us // 2) // self._duty_per_us
+
+    @pulse_us.setter
+    def pulse_us(self, microseconds):
+        self._set_duty(self._duty_for_us(microseconds))
+
+    def release(self):
+        """Stop sending pulses, letting a servo go limp."""
+        self._set_duty(0)
+
+
+class MM1Servo(MM1PulseOut):
+    """Imitate ``adafruit_motor.servo.Servo`` on a Robo HAT MM1 servo terminal.
+
+    Angles are turned into duty cycles through a table computed once for the
+    frame rate and pulse range, and written through ``MM1PulseOut``'s path.
+    That saves the floating point work of ``adafruit_motor``, but each write
+    still takes the settle pause: 1 ms unless the seesaw is calibrated, which
+    bounds either path to under 1000 writes a second.
+
+       :param ~adafruit_seesaw.seesaw.Seesaw seesaw: The Robo HAT's seesaw
+       :param int pin: Seesaw pin of the servo terminal
+       :param int actuation_range: The physical range of motion, in degrees
+       :param int min_pulse: The pulse width at 0 degrees, in microseconds
+       :param int max_pulse: The pulse width at ``actuation_range``, in microseconds
+       :param int frequency: The servo frame rate, in Hz"""
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(self, seesaw, pin, *, actuation_range=180, min_pulse=750, max_pulse=2250,
+                 frequency=50):
+        # pylint: disable=too-many-arguments
+        self._pulse_range = (min_pulse, max_pulse)
+        self._table = None
+        self._value = None
+        super().__init__(seesaw, pin, frequency=frequency)
+        self.actuation_range = actuation_range
+
+    def set_pulse_width_range(self, min_pulse=750, max_pulse=2250):
+        """Change min and max pulse widths."""
+        self._pulse_range = (min_pulse, max_pulse)
+        self._rescale()
+
+    def _rescale(self):
+        self._table = _duty_table(self._frequency, *self._pulse_range)
+        self._value = None
+
+    @property
+    def actuation_range(self):
+        """The physical range of motion of the servo in degrees."""
+        return self._range
+
+    @actuation_range.setter
+    def actuation_range(self, value):
+        self._range = value
+        self._per_degree = (_TABLE_SIZE - 1) / value
+        self._value = None
+
+    def _set_duty(self, duty):
+        self._write(duty)
+        self._value = None
+
+    def _angle_index(self, angle):
+        if angle < 0 or angle > self._range:
+            raise ValueError("Angle out of range")
+        return int(angle * self._per_degree + 0.5)
+
+    def _written(self, index, duty):
+        # record a duty cycle someone else (a servo group) sent for this servo
+        self._frame[3] = duty >> 8
+        self._frame[4] = duty & 0xFF
+        self._value = index
+
+    @property
+    def fraction(self):
+        """Pulse width expressed as fraction between 0.0 (``min_pulse``) and 1.0
+        (``max_pulse``). None when the servo is disabled."""
+        if self._value is None:
+            return None
+        return self._value / (_TABLE_SIZE - 1)
+
+    @fraction.setter
+    def fraction(self, value):
+        if value is None:
+            self.release()
+            return
+        if not 0.0 <= value <= 1.0:
+            raise ValueError("Must be 0.0 to 1.0")
+        index = int(value * (_TABLE_SIZE - 1) + 0.5)
+        self._write(self._table[index])
+        self._value = index
+
+    @property
+    def angle(self):
+        """The servo angle in degrees. Must be in the range ``0`` to
+        ``actuation_range``. None when the servo is disabled."""
+        if self._value is None:
+            return None
+        return self._value / self._per_degree
+
+    @angle.setter
+    def angle(self, new_angle):
+        if new_angle is None:
+            self.release()
+            return
+        index = self._angle_index(new_angle)
+        self._write(self._table[index])
+        self._value = index
+
+
+
+class MM1ContinuousServo(MM1Servo):
+    """Imitate ``adafruit_motor.servo.ContinuousServo`` on a Robo HAT MM1 servo
+    terminal, with the table-driven write path of ``MM1Servo``."""
+
+    @property
+    def throttle(self):
+        """How much power is being delivered to the motor. Values range from
+        ``-1.0`` (full throttle reverse) to ``1.0`` (full throttle forwards.)
+        ``0`` will stop the motor from spinning."""
+        if self._value is None:
+            return None
+        return self._value * 2.0 / (_TABLE_SIZE - 1) - 1.0
+
+    @throttle.setter
+    def throttle(self, value):
+        if value is None:
+            raise ValueError("Continuous servos cannot spin freely")
+        if not -1.0 <= value <= 1.0:
+            raise ValueError("Throttle must be between -1.0 and 1.0")
+        index = int((value + 1.0) * ((_TABLE_SIZE - 1) // 2) + 0.5)
+        self._write(self._table[index])
+        self._value = index
+
+
+class MM1ServoGroup:
+    """Servos on several Robo HAT MM1 terminals, moved together. Created by
+    ``RoboHatMM1.servo_group``.
+
+    ``stage`` and ``stage_pulse_us`` record targets without touching the bus;
+    ``commit`` sends every staged target in one bulk PWM command, so the
+    outputs change on the same PWM frame.  Firmware without the bulk command
+    gets one back-to-back write per servo.  ``play`` runs a trajectory of
+    keyframes, committing an interpolated pose ``rate`` times a second.
+
+    .. code-block:: python
+
+      from rm_robohat import robohat
+
+      legs = robohat.servo_group(1, 2, 3)
+      legs.stage(0, 45)
+      legs.stage(1, 90)
+      legs.commit()
+
+      legs.play([(0.0, (45, 90, 90)), (0.5, (90, 45, 120)), (1.0, (45, 90, 90))],
+                loop=True)
+      ...
+      legs.stop()
+
+    With ``thread=True`` the trajectory is committed through a ``Seesaw.fork``
+    of the board, so its writes and the caller's own reads and writes hold
+    the shared ``transaction_lock`` and never share a buffer.  Without
+    ``threading`` pass ``thread=False`` to ``play`` and call ``update`` from
+    the main loop."""
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(self, seesaw, servos):
+        self._seesaw = seesaw
+        self.servos = tuple(servos)
+        self._by_pin = {servo.pin: servo for servo in self.servos}
+        self._staged = {}
+        self._indices = {}
+        # the seesaw commits go through, and its frames for the no-bulk
+        # fallback; a fork of _seesaw while a trajectory thread runs
+        self._bus = seesaw
+        self._frames = None
+        self._keyframes = None
+        self._segment = 0
+        self._loop = False
+        self._period = 0.0
+        self._started = 0.0
+        self._thread = None
+        self._stop = None
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Zero the commit and trajectory counters."""
+        self.commits = 0
+        self.commit_time = 0.0
+        self.commit_max = 0.0
+        self.last_commit = 0.0
+        self.frames_played = 0
+        self.late_frames = 0
+
+    @property
+    def commit_avg(self):
+        """Average commit latency in seconds."""
+        return self.commit_time / self.commits if self.commits else 0.0
+
+    def __len__(self):
+        return len(self.servos)
+
+    def stage(self, index, angle):
+        """Stage ``angle`` degrees for the ``index``-th servo of the group."""
+        servo = self.servos[index]
+        table_index = servo._angle_index(angle)  # pylint: disable=protected-access
+        self._staged[servo.pin] = servo._table[table_index]  # pylint: disable=protected-access
+        self._indices[index] = table_index
+
+    def stage_pulse_us(self, index, microseconds):
+        """Stage a pulse of ``microseconds`` for the ``index``-th servo of the group."""
+        servo = self.servos[index]
+        self._staged[servo.pin] = servo._duty_for_us(microseconds)  # pylint: disable=protected-access
+        self._indices[index] = None
+
+    def stage_angles(self, angles):
+        """Stage one angle per servo, in group order. ``None`` leaves a servo as is."""
+        for index, angle in enumerate(angles):
+            if angle is not None:
+                self.stage(index, angle)
+
+    def commit(self):
+        """Send every staged target in one transaction; returns the seconds it took."""
+        if not self._staged:
+            return 0.0
+        start = time.monotonic()
+        bus = self._bus
+        if bus.capabilities.pwm_bulk:
+            bus.analog_write_bulk(self._staged)
+        elif self._frames is None:
+            # no bulk command in this firmware: one frame per servo, each
+            # followed by the settle pause
+            for pin, duty in self._staged.items():
+                self._by_pin[pin]._write(duty)  # pylint: disable=protected-access
+        else:
+            for pin, duty in self._staged.items():
+                frame = self._frames[pin]
+                frame[3] = duty >> 8
+                frame[4] = duty & 0xFF
+                bus.write_pwm_frame(frame)
+        elapsed = time.monotonic() - start
+        for index, table_index in self._indices.items():
+            servo = self.servos[index]
+            servo._written(table_index, self._staged[servo.pin])  # pylint: disable=protected-access
+        self._staged.clear()
+        self._indices.clear()
+        self.commits += 1
+        self.commit_time += elapsed
+        self.last_commit = elapsed
+        if elapsed > self.commit_max:
+            self.commit_max = elapsed
+        return elapsed
+
+    @property
+    def playing(self):
+        """True while a trajectory is running."""
+        return self._keyframes is not None
+
+    def play(self, keyframes, *, rate=50, loop=False, thread=True):
+        """Run a trajectory.
+
+        ``keyframes`` is a list of ``(seconds, angles)`` with the times rising
+        from the start of the trajectory and one angle (or None to hold) per
+        servo. Angles are interpolated linearly between keyframes.
+
+           :param float rate: Poses committed per second
+           :param bool loop: Start over after the last keyframe
+           :param bool thread: Commit from a background thread. False leaves it
+               to ``update``"""
+        if not keyframes:
+            raise ValueError("No keyframes")
+        self.stop()
+        self._keyframes = [(when, tuple(angles)) for when, angles in keyframes]
+        self._segment = 0
+        self._loop = loop
+        self._period = 1.0 / rate
+        self._started = time.monotonic()
+        if thread:
+            if threading is None:
+                raise RuntimeError("threading is not available; pass thread=False")
+            self._bus = self._seesaw.fork()
+            self._frames = {pin: self._bus.pwm_frame(pin) for pin in self._by_pin}
+            self._stop = threading.Event()
+            self._thread = threading.Thread(target=self._run, name="servo-group",
+                                            daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """End the trajectory, leaving the servos where they are."""
+        if self._thread is not None:
+            self._stop.set()
+            if self._thread is not threading.current_thread():
+                self._thread.join()
+            self._thread = None
+        if self._frames is not None:
+            # the fork wrote these channels; the board's shadow no longer knows them
+            shadow = self._seesaw._pwm_shadow  # pylint: disable=protected-access
+            for frame in self._frames.values():
+                shadow.pop(frame[2], None)
+            self._frames = None
+            self._bus = self._seesaw
+        self._keyframes = None
+
+    def _run(self):
+        deadline = time.monotonic()
+        while not self._stop.is_set() and self.update():
+            deadline += self._period
+            delay = deadline - time.monotonic()
+            if delay < 0:
+                self.late_frames += 1
+                deadline = time.monotonic()
+            else:
+                self._stop.wait(delay)
+
+    def update(self):
+        """Commit the pose for the current point of the trajectory. Returns
+        False once it has finished."""
+        frames = self._keyframes
+        if frames is None:
+            return False
+        elapsed = time.monotonic() - self._started
+        end = frames[-1][0]
+        if elapsed >= end:
+            if self._loop and end > 0:
+                elapsed %= end
+                self._segment = 0
+            else:
+                self.stage_angles(frames[-1][1])
+                self.commit()
+                self.frames_played += 1
+                self._keyframes = None
+                return False
+        while self._segment < len(frames) - 2 and frames[self._segment + 1][0] <= elapsed:
+            self._segment += 1
+        when, start = frames[self._segment]
+        if len(frames) == 1 or elapsed <= when:
+            self.stage_angles(start)
+        else:
+            next_when, finish = frames[self._segment + 1]
+            fraction = (elapsed - when) / (next_when - when)
+            for index, (first, last) in enumerate(zip(start, finish)):
+                if first is None or last is None:
+                    if last is not None:
+                        self.stage(index, last)
+                    continue
+                self.stage(index, first + (last - first) * fraction)
+        self.commit()
+        self.frames_played += 1
+        return True
+
+
 #pylint: disable=too-many-public-methods
 class RoboHatMM1:
     """Represents a Robo HAT MM1 board. Provides a number of devices available via properties, such as
@@ -150,12 +588,15 @@ class RoboHatMM1:
     D14 = 3  # (POWER_OFF)
 
     def __init__(self, seesaw):
+        from adafruit_seesaw.robohat import MM1_Pinmap  # pylint: disable=import-outside-toplevel
         self._seesaw = seesaw
         self._seesaw.pin_mapping = MM1_Pinmap
         # Associate terminal(s) with certain devices.
         # Used to find existing devices.
         self._devices = dict()
         self._neopixel = None
+        self._telemetry = None
+        self._rc_input = None
 
     @property
     def seesaw(self):
@@ -175,94 +616,111 @@ class RoboHatMM1:
 
     @property
     def servo_1(self):
-        """``adafruit_motor.servo.Servo`` object on Servo 1 terminal"""
-        return self._servo(_SERVO1, Servo)
+        """``MM1Servo`` object on Servo 1 terminal"""
+        return self._servo(_SERVO1)
 
     @property
     def servo_2(self):
-        """``adafruit_motor.servo.Servo`` object on Servo 2 terminal"""
-        return self._servo(_SERVO2, Servo)
+        """``MM1Servo`` object on Servo 2 terminal"""
+        return self._servo(_SERVO2)
 
     @property
     def servo_3(self):
-        """``adafruit_motor.servo.Servo`` object on Servo 3 terminal"""
-        return self._servo(_SERVO3, Servo)
+        """``MM1Servo`` object on Servo 3 terminal"""
+        return self._servo(_SERVO3)
 
     @property
     def servo_4(self):
-        """``adafruit_motor.servo.Servo`` object on Servo 4 terminal"""
-        return self._servo(_SERVO4, Servo)
+        """``MM1Servo`` object on Servo 4 terminal"""
+        return self._servo(_SERVO4)
 
     @property
     def servo_5(self):
-        """``adafruit_motor.servo.Servo`` object on Servo 5 terminal"""
-        return self._servo(_SERVO5, Servo)
+        """``MM1Servo`` object on Servo 5 terminal"""
+        return self._servo(_SERVO5)
 
     @property
     def servo_6(self):
-        """``adafruit_motor.servo.Servo`` object on Servo 6 terminal"""
-        return self._servo(_SERVO6, Servo)
+        """``MM1Servo`` object on Servo 6 terminal"""
+        return self._servo(_SERVO6)
 
     @property
     def servo_7(self):
-        """``adafruit_motor.servo.Servo`` object on Servo 7 terminal"""
-        return self._servo(_SERVO7, Servo)
+        """``MM1Servo`` object on Servo 7 terminal"""
+        return self._servo(_SERVO7)
 
     @property
     def servo_8(self):
-        """``adafruit_motor.servo.Servo`` object on Servo 8 terminal"""
-        return self._servo(_SERVO8, Servo)
+        """``MM1Servo`` object on Servo 8 terminal"""
+        return self._servo(_SERVO8)
 
 
     @property
     def continuous_servo_1(self):
-        """``adafruit_motor.servo.ContinuousServo`` object on Servo 1 terminal"""
-        return self._servo(_SERVO1, ContinuousServo)
+        """``MM1ContinuousServo`` object on Servo 1 terminal"""
+        return self._servo(_SERVO1, continuous=True)
 
     @property
     def continuous_servo_2(self):
-        """``adafruit_motor.servo.ContinuousServo`` object on Servo 2 terminal"""
-        return self._servo(_SERVO2, ContinuousServo)
+        """``MM1ContinuousServo`` object on Servo 2 terminal"""
+        return self._servo(_SERVO2, continuous=True)
 
     @property
     def continuous_servo_3(self):
-        """``adafruit_motor.servo.ContinuousServo`` object on Servo 3 terminal"""
-        return self._servo(_SERVO3, ContinuousServo)
+        """``MM1ContinuousServo`` object on Servo 3 terminal"""
+        return self._servo(_SERVO3, continuous=True)
 
     @property
     def continuous_servo_4(self):
-        """``adafruit_motor.servo.ContinuousServo`` object on Servo 4 terminal"""
-        return self._servo(_SERVO4, ContinuousServo)
+        """``MM1ContinuousServo`` object on Servo 4 terminal"""
+        return self._servo(_SERVO4, continuous=True)
 
     @property
     def continuous_servo_5(self):
-        """``adafruit_motor.servo.ContinuousServo`` object on Servo 5 terminal"""
-        return self._servo(_SERVO5, ContinuousServo)
+        """``MM1ContinuousServo`` object on Servo 5 terminal"""
+        return self._servo(_SERVO5, continuous=True)
 
     @property
     def continuous_servo_6(self):
-        """``adafruit_motor.servo.ContinuousServo`` object on Servo 6 terminal"""
-        return self._servo(_SERVO6, ContinuousServo)
+        """``MM1ContinuousServo`` object on Servo 6 terminal"""
+        return self._servo(_SERVO6, continuous=True)
 
     @property
     def continuous_servo_7(self):
-        """``adafruit_motor.servo.ContinuousServo`` object on Servo 7 terminal"""
-        return self._servo(_SERVO7, ContinuousServo)
+        """``MM1ContinuousServo`` object on Servo 7 terminal"""
+        return self._servo(_SERVO7, continuous=True)
 
     @property
     def continuous_servo_8(self):
-        """``adafruit_motor.servo.ContinuousServo`` object on Servo 8 terminal"""
-        return self._servo(_SERVO8, ContinuousServo)
+        """``MM1ContinuousServo`` object on Servo 8 terminal"""
+        return self._servo(_SERVO8, continuous=True)
+
+    def _servo(self, terminal, continuous=False):
+        return self._pwm_device(terminal, MM1ContinuousServo if continuous else MM1Servo)
 
-    def _servo(self, terminal, servo_class):
+    def _pwm_device(self, terminal, device_class):
         device = self._devices.get(terminal, None)
-        if not isinstance(device, servo_class):
-            pwm = PWMOut(self._seesaw, terminal)
-            pwm.frequency = 50
-            device = servo_class(pwm)
+        if type(device) is not device_class:  # pylint: disable=unidiomatic-typecheck
+            device = device_class(self._seesaw, terminal)
             self._devices[terminal] = device
         return device
 
+    def pulse_out(self, index, frequency=50):
+        """``MM1PulseOut`` on servo terminal ``index`` (1 to 8), for setting
+        pulse widths in microseconds, e.g. for an ESC.
+
+        .. code-block:: python
+
+          from rm_robohat import robohat
+
+          esc = robohat.pulse_out(2)
+          esc.pulse_us = 1500
+        """
+        device = self._pwm_device(self.get_channel(index), MM1PulseOut)
+        if device.frequency != frequency:
+            device.frequency = frequency
+        return device
+
     def get_channel(self, index):
         """ For converting to servo numbers to pins """
         if index < 9 and index > 0:
@@ -270,6 +728,38 @@ class RoboHatMM1:
         else:
             raise ValueError("Incorrect servo pin index")
 
+    def servo_group(self, *servos):
+        """An ``MM1ServoGroup`` of the given servo terminals (1 to 8), whose
+        targets are staged and then committed in one transaction.
+
+        .. code-block:: python
+
+          from rm_robohat import robohat
+
+          arm = robohat.servo_group(1, 2)
+          arm.stage(0, 30)
+          arm.stage(1, 150)
+          arm.commit()
+        """
+        return MM1ServoGroup(self._seesaw, [self._servo(self.get_channel(index))
+                                            for index in servos])
+
+    def update_channels(self, values):
+        """Set the raw 16-bit duty cycle of several servo terminals at once.
+
+        ``values`` maps servo numbers (1 to 8) to duty cycles. All of them are
+        sent in a single frame when the firmware supports it, so the outputs
+        change on the same PWM period.
+
+        .. code-block:: python
+
+          from rm_robohat import robohat
+
+          robohat.update_channels({1: 4915, 2: 4915, 3: 3277})
+        """
+        self._seesaw.analog_write_bulk([(self.get_channel(index), value)
+                                        for index, value in values.items()])
+
     @property
     def touch_1(self):
         """``adafruit_crickit.CrickitTouchIn`` object on Touch 1 terminal"""
@@ -299,7 +789,7 @@ class RoboHatMM1:
 
     @property
     def neopixel(self):
-        """```adafruit_seesaw.neopixel`` object on NeoPixel terminal.
+        """```adafruit_seesaw.fastpixel.FastNeoPixel`` object on NeoPixel terminal.
         Raises ValueError if ``init_neopixel`` has not been called.
         """
         if not self._neopixel:
@@ -308,7 +798,8 @@ class RoboHatMM1:
 
 
     def init_neopixel(self, n, *, bpp=3, brightness=1.0, auto_write=True, pixel_order=None):
-        """Set up a seesaw.NeoPixel object
+        """Set up a seesaw NeoPixel object. Only the pixels that changed are sent
+        to the seesaw on each ``show``; see ``adafruit_seesaw.fastpixel``.
 
         .. note:: On the CPX Crickit board, the NeoPixel terminal is by default
           controlled by CPX pin A1, and is not controlled by seesaw. So this object
@@ -327,18 +818,119 @@ class RoboHatMM1:
           crickit.init_neopixel(24)
           crickit.neopixel.fill((100, 0, 0))
         """
-        from adafruit_seesaw.neopixel import NeoPixel
-        self._neopixel = NeoPixel(self._seesaw, _NEOPIXEL, n, bpp=bpp,
-                                  brightness=brightness, auto_write=auto_write,
-                                  pixel_order=pixel_order)
+        from adafruit_seesaw.fastpixel import FastNeoPixel
+        self._neopixel = FastNeoPixel(self._seesaw, _NEOPIXEL, n, bpp=bpp,
+                                      brightness=brightness, auto_write=auto_write,
+                                      pixel_order=pixel_order)
+
+    @property
+    def rc_input(self):
+        """``adafruit_seesaw.rcin.RCInput`` reading an RC receiver on the four
+        RC headers, created on first use. The headers stop working as touch
+        inputs. Needs firmware with the RC capture bank.
+
+        .. code-block:: python
+
+          from rm_robohat import robohat
+
+          if robohat.rc_input.update():
+              print(robohat.rc_input.pulses)
+        """
+        if not self._rc_input:
+            from adafruit_seesaw.rcin import RCInput
+            self._rc_input = RCInput(self._seesaw)
+        return self._rc_input
+
+    @property
+    def telemetry(self):
+        """``adafruit_seesaw.telemetry.TelemetrySampler`` serving the latest
+        temperature, ADC and touch readings.
+        Raises ValueError if ``start_telemetry`` has not been called.
+        """
+        if not self._telemetry:
+            raise ValueError("Call start_telemetry first")
+        return self._telemetry
+
+    def start_telemetry(self, *, interval=0.5, budget=0.02, depth=32):
+        """Start sampling temperature, the ADC inputs (D2 and D3) and the four
+        RC/touch inputs in the background, using at most ``budget`` of the bus.
+        D7 (BATTERY) has no ADC channel in the MM1 firmware and is not sampled.
+
+        .. code-block:: python
+
+          from rm_robohat import robohat
+
+          robohat.start_telemetry(interval=1.0)
+          ...
+          print(robohat.telemetry.temperature, robohat.telemetry.analog(robohat.D2))
+        """
+        from adafruit_seesaw.telemetry import TelemetrySampler
+        if self._telemetry:
+            self._telemetry.stop()
+        self._telemetry = TelemetrySampler(self._seesaw, interval=interval, budget=budget,
+                                           depth=depth)
+        return self._telemetry
 
     def reset(self):
         """Reset the whole Crickit board."""
         self._seesaw.sw_reset()
 
-robohat = None # pylint: disable=invalid-name
-"""A singleton instance to control a single Crickit board, controlled by the default I2C pins."""
-
-# Sphinx's board is missing real pins so skip the constructor in that case.
-if "SCL" in dir(board):
-    robohat = RoboHatMM1(Seesaw(busio.I2C(board.SCL, board.SDA))) # pylint: disable=invalid-name
+_robohat = None  # pylint: disable=invalid-name
+_robohat_error = None  # pylint: disable=invalid-name
+
+
+def get_robohat():
+    """The singleton ``RoboHatMM1`` on the default I2C pins, created on first use.
+
+    Creating it opens the bus and attaches to the seesaw without a reset, so
+    restarting a program does not glitch servos that are holding position; call
+    ``robohat.reset()`` for a clean start. It also runs ``Seesaw.calibrate``
+    (read-only probes, cached per firmware version), so the settle pause after
+    each PWM write is the turnaround this chip needs rather than 1 ms.
+
+    Raises ``RuntimeError`` when there is no ``board`` module or it has no I2C
+    pins (e.g. when building the docs); that is decided once, and later calls
+    raise the same error without trying again."""
+    global _robohat, _robohat_error  # pylint: disable=global-statement,invalid-name
+    if _robohat is None:
+        if _robohat_error is not None:
+            raise RuntimeError(_robohat_error)
+        # pylint: disable=import-outside-toplevel
+        try:
+            import board
+        except (ImportError, NotImplementedError) as err:
+            _robohat_error = "No Robo HAT MM1: cannot import board ({})".format(err)
+            raise RuntimeError(_robohat_error) from err
+        if "SCL" not in dir(board):
+            _robohat_error = "No Robo HAT MM1: board has no default I2C pins"
+            raise RuntimeError(_robohat_error)
+        import busio
+        from adafruit_seesaw.seesaw import Seesaw
+        seesaw = Seesaw(busio.I2C(board.SCL, board.SDA), reset=False)
+        seesaw.calibrate()
+        _robohat = RoboHatMM1(seesaw)
+    return _robohat
+
+
+class _LazyRoboHat:
+    """Stands in for the singleton until first used, then forwards to it.
+
+    A module-level ``__getattr__`` would need Python 3.7 and is not in
+    CircuitPython, so ``robohat`` is an object of its own. Use
+    ``get_robohat()`` where the real ``RoboHatMM1`` is needed, e.g. for
+    ``isinstance``."""
+
+    def __getattr__(self, name):
+        return getattr(get_robohat(), name)
+
+    def __setattr__(self, name, value):
+        setattr(get_robohat(), name, value)
+
+    def __repr__(self):
+        if _robohat is None:
+            return "<rm_robohat.robohat, not yet created>"
+        return repr(_robohat)
+
+
+robohat = _LazyRoboHat()  # pylint: disable=invalid-name
+"""The Robo HAT MM1 on the default I2C pins. The bus is opened on first use."""
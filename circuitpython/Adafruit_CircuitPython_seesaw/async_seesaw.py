@@ -0,0 +1,506 @@
+# The MIT License (MIT)
+#
+# Copyright (c) 2019 Robotics Masters
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+"""
+`adafruit_seesaw.async_seesaw`
+====================================================
+
+An ``asyncio`` flavour of the ``Seesaw`` driver.  Every bus access is a
+coroutine: the turnaround between selecting a register and reading it, and
+any wait on the data-ready line, are awaited instead of slept, so one event
+loop can drive several boards and other I/O at the same time.
+
+Transactions on one device are serialized with an ``asyncio.Lock``; pass the
+same ``lock`` to several ``AsyncSeesaw`` objects to serialize a whole bus.
+
+It covers GPIO (including interrupts), ADC with ``analog_read_all``, touch,
+PWM with ``analog_write_bulk``, ``capabilities`` and ``calibrate``.  Not
+mirrored from ``Seesaw``: the PWM/GPIO write shadow and port cache, retry
+policies, PWM frames, ``fork``, the turnaround cache shared between boards,
+and the EEPROM, UART, NeoPixel and moisture helpers; use the blocking driver
+for those.
+
+.. code-block:: python
+
+  import asyncio
+  import board, busio
+  from adafruit_seesaw.async_seesaw import AsyncSeesaw
+
+  async def main():
+      i2c = busio.I2C(board.SCL, board.SDA)
+      ss = await AsyncSeesaw.create(i2c)
+      print(await ss.get_temp())
+
+  loop = asyncio.new_event_loop()
+  asyncio.set_event_loop(loop)
+  loop.run_until_complete(main())
+
+It only needs the ``asyncio`` of Python 3.5, like the rest of the driver:
+no ``asyncio.run`` or ``get_running_loop``, and deadlines use
+``time.monotonic``.
+
+* Author(s): Robotics Masters
+"""
+
+# pylint: disable=missing-docstring,invalid-name,too-many-public-methods
+
+import asyncio
+import struct
+import time
+from array import array
+
+try:
+    from micropython import const
+except ImportError:
+    def const(x):
+        return x
+from adafruit_seesaw.seesaw import pinmap_for, pin_table, Capabilities, DataReadyTimeout
+
+__version__ = "0.0.0-auto.0"
+__repo__ = "https://github.com/robotics-masters/mm1-hat-seesaw.git"
+
+_STATUS_BASE = const(0x00)
+_GPIO_BASE = const(0x01)
+_TIMER_BASE = const(0x08)
+_ADC_BASE = const(0x09)
+_TOUCH_BASE = const(0x0F)
+
+_GPIO_DIRSET_BULK = const(0x02)
+_GPIO_DIRCLR_BULK = const(0x03)
+_GPIO_BULK = const(0x04)
+_GPIO_BULK_SET = const(0x05)
+_GPIO_BULK_CLR = const(0x06)
+_GPIO_INTENSET = const(0x08)
+_GPIO_INTENCLR = const(0x09)
+_GPIO_INTFLAG = const(0x0A)
+_GPIO_PULLENSET = const(0x0B)
+
+_STATUS_HW_ID = const(0x01)
+_STATUS_VERSION = const(0x02)
+_STATUS_OPTIONS = const(0x03)
+_STATUS_TEMP = const(0x04)
+_STATUS_SWRST = const(0x7F)
+
+_TIMER_STATUS = const(0x00)
+_TIMER_PWM = const(0x01)
+_TIMER_FREQ = const(0x02)
+_TIMER_PWM_BULK = const(0x03)
+
+_ADC_CHANNEL_OFFSET = const(0x07)
+_TOUCH_CHANNEL_OFFSET = const(0x10)
+
+_ADC_MAX_CHANNELS = const(8)
+
+_HW_ID_CODE = const(0x55)
+
+_DEFAULT_DELAY = .001
+# Candidate turnarounds tried by calibrate(), longest first.
+_TURNAROUND_STEPS = (.0005, .00025, .000125, .0000625, .00003125, 0)
+
+# data-ready wait: sleep with a doubling interval, as Seesaw's backoff does
+_DRDY_MIN_SLEEP = .00005
+_DRDY_MAX_SLEEP = .001
+
+# reset handling, as in Seesaw.sw_reset
+_RESET_SETTLE = .01
+_RESET_POLL = .002
+_RESET_POLL_MAX = .05
+_RESET_TIMEOUT = .5
+
+
+def _corrupt(buf):
+    # a read clocked out before the firmware was ready comes back as all 0xFF
+    for b in buf:
+        if b != 0xFF:
+            return False
+    return True
+
+
+class AsyncSeesaw:
+    """Awaitable driver for a seesaw on an I2C bus. Use ``create`` to construct one.
+
+       :param ~busio.I2C i2c_bus: Bus the SeeSaw is connected to, or a ready-made
+           device such as ``adafruit_seesaw.linux_i2c.LinuxI2CDevice``
+       :param int addr: I2C address of the SeeSaw device (unused when given a device)
+       :param drdy: Optional data-ready input
+       :param ~asyncio.Lock lock: Lock shared by everything that must not
+           interleave with this device's transactions"""
+    INPUT = const(0x00)
+    OUTPUT = const(0x01)
+    INPUT_PULLUP = const(0x02)
+    INPUT_PULLDOWN = const(0x03)
+
+    def __init__(self, i2c_bus, addr=0x49, drdy=None, lock=None):
+        self._drdy = drdy
+        if drdy is not None:
+            drdy.switch_to_input()
+        if hasattr(i2c_bus, "device_address"):
+            self.i2c_device = i2c_bus
+        else:
+            # pylint: disable=import-outside-toplevel
+            from adafruit_bus_device.i2c_device import I2CDevice
+            self.i2c_device = I2CDevice(i2c_bus, addr)
+        self._lock = lock if lock is not None else asyncio.Lock()
+        # seconds to wait for data-ready before raising DataReadyTimeout
+        self.drdy_timeout = .1
+        self._txbuf = bytearray(8)
+        self._rxbuf = bytearray(8)
+        rx = memoryview(self._rxbuf)
+        self._rx1 = rx[:1]
+        self._rx2 = rx[:2]
+        self._rx4 = rx[:4]
+        self._rx8 = rx
+        self._adcbuf = bytearray(2 * _ADC_MAX_CHANNELS)
+        # turnaround per register base, in seconds (see Seesaw.calibrate)
+        self.delays = {}
+        self._pin_mapping = None
+        self._pins = None
+        # firmware that reports no options is trusted with everything
+        self.capabilities = Capabilities(0)
+
+    @classmethod
+    async def create(cls, i2c_bus, addr=0x49, drdy=None, lock=None, reset=True):
+        """Construct an ``AsyncSeesaw`` and reset the chip, or with ``reset=False``
+        attach to it as it is."""
+        self = cls(i2c_bus, addr, drdy, lock)
+        if reset:
+            await self.sw_reset()
+        else:
+            await self.attach()
+        return self
+
+    async def sw_reset(self):
+        await self.write8(_STATUS_BASE, _STATUS_SWRST, 0xFF)
+        await asyncio.sleep(_RESET_SETTLE)
+        await self.attach()
+
+    async def attach(self):
+        chip_id = await self._poll_hw_id()
+        if chip_id != _HW_ID_CODE:
+            raise RuntimeError("Seesaw hardware ID returned (0x{:x}) is not "
+                               "correct! Expected 0x{:x}. Please check your wiring."
+                               .format(chip_id, _HW_ID_CODE))
+
+        self.capabilities = Capabilities(await self.get_options())
+        self.pin_mapping = pinmap_for((await self.get_version()) >> 16)
+
+    @property
+    def pin_mapping(self):
+        """The pinmap class in use. Assigning one compiles its lookup tables."""
+        return self._pin_mapping
+
+    @pin_mapping.setter
+    def pin_mapping(self, pinmap):
+        self._pin_mapping = pinmap
+        self._pins = pin_table(pinmap)
+
+    async def _poll_hw_id(self):
+        deadline = time.monotonic() + _RESET_TIMEOUT
+        interval = _RESET_POLL
+        while time.monotonic() < deadline:
+            try:
+                if await self.read8(_STATUS_BASE, _STATUS_HW_ID) == _HW_ID_CODE:
+                    return _HW_ID_CODE
+            except OSError:
+                pass
+            await asyncio.sleep(interval)
+            interval = min(interval * 2, _RESET_POLL_MAX)
+        return await self.read8(_STATUS_BASE, _STATUS_HW_ID)
+
+    async def get_options(self):
+        async with self._lock:
+            await self._read(_STATUS_BASE, _STATUS_OPTIONS, self._rx4)
+            return struct.unpack_from(">I", self._rxbuf)[0]
+
+    async def get_version(self):
+        async with self._lock:
+            await self._read(_STATUS_BASE, _STATUS_VERSION, self._rx4)
+            return struct.unpack_from(">I", self._rxbuf)[0]
+
+    async def get_temp(self):
+        async with self._lock:
+            await self._read(_STATUS_BASE, _STATUS_TEMP, self._rx4)
+            ret = struct.unpack_from(">I", self._rxbuf)[0] & 0x3FFFFFFF
+        return 0.00001525878 * ret
+
+    async def pin_mode(self, pin, mode):
+        if pin >= 32:
+            await self.pin_mode_bulk_b(1 << (pin - 32), mode)
+        else:
+            await self.pin_mode_bulk(1 << pin, mode)
+
+    async def pin_mode_bulk(self, pins, mode):
+        await self._pin_mode(struct.pack(">I", pins), mode)
+
+    async def pin_mode_bulk_b(self, pins, mode):
+        await self._pin_mode(struct.pack(">II", 0, pins), mode)
+
+    async def _pin_mode(self, cmd, mode):
+        if mode == self.OUTPUT:
+            await self.write(_GPIO_BASE, _GPIO_DIRSET_BULK, cmd)
+        elif mode == self.INPUT:
+            await self.write(_GPIO_BASE, _GPIO_DIRCLR_BULK, cmd)
+        elif mode in (self.INPUT_PULLUP, self.INPUT_PULLDOWN):
+            await self.write(_GPIO_BASE, _GPIO_DIRCLR_BULK, cmd)
+            await self.write(_GPIO_BASE, _GPIO_PULLENSET, cmd)
+            await self.write(_GPIO_BASE, _GPIO_BULK_SET if mode == self.INPUT_PULLUP
+                             else _GPIO_BULK_CLR, cmd)
+        else:
+            raise ValueError("Invalid pin mode")
+
+    async def digital_write(self, pin, value):
+        if pin >= 32:
+            await self.digital_write_bulk_b(1 << (pin - 32), value)
+        else:
+            await self.digital_write_bulk(1 << pin, value)
+
+    async def digital_write_bulk(self, pins, value):
+        await self.write(_GPIO_BASE, _GPIO_BULK_SET if value else _GPIO_BULK_CLR,
+                         struct.pack(">I", pins))
+
+    async def digital_write_bulk_b(self, pins, value):
+        await self.write(_GPIO_BASE, _GPIO_BULK_SET if value else _GPIO_BULK_CLR,
+                         struct.pack(">II", 0, pins))
+
+    async def digital_read(self, pin):
+        if pin >= 32:
+            return (await self.digital_read_bulk_b(1 << (pin - 32))) != 0
+        return (await self.digital_read_bulk(1 << pin)) != 0
+
+    async def digital_read_bulk(self, pins):
+        async with self._lock:
+            await self._read(_GPIO_BASE, _GPIO_BULK, self._rx4)
+            return struct.unpack_from(">I", self._rxbuf)[0] & 0x3FFFFFFF & pins
+
+    async def digital_read_bulk_b(self, pins):
+        async with self._lock:
+            await self._read(_GPIO_BASE, _GPIO_BULK, self._rx8)
+            return struct.unpack_from(">I", self._rxbuf, 4)[0] & pins
+
+    async def set_GPIO_interrupts(self, pins, enabled):
+        await self.write(_GPIO_BASE, _GPIO_INTENSET if enabled else _GPIO_INTENCLR,
+                         struct.pack(">I", pins))
+
+    async def set_GPIO_interrupts_b(self, pins, enabled):
+        await self.write(_GPIO_BASE, _GPIO_INTENSET if enabled else _GPIO_INTENCLR,
+                         struct.pack(">II", 0, pins))
+
+    async def get_GPIO_interrupt_flags(self):
+        """Pins (A in the low 32 bits, B in the high 32) that changed since the last
+        call. Reading the flags clears them on the chip."""
+        async with self._lock:
+            await self._read(_GPIO_BASE, _GPIO_INTFLAG, self._rx8)
+            port_a, port_b = struct.unpack_from(">II", self._rxbuf)
+        return port_a | (port_b << 32)
+
+    async def analog_read(self, pin):
+        self.capabilities.require(_ADC_BASE)
+        reg = self._pins.adc_reg.get(pin)
+        if reg is None:
+            raise ValueError("Invalid ADC pin")
+        async with self._lock:
+            await self._read(_ADC_BASE, reg, self._rx2)
+            return struct.unpack_from(">H", self._rxbuf)[0]
+
+    async def analog_read_all(self, out=None):
+        """Read every configured ADC channel, in ``pin_mapping.analog_pins`` order,
+        in one transaction when the firmware supports it (see
+        ``Seesaw.analog_read_all``)."""
+        self.capabilities.require(_ADC_BASE)
+        count = len(self._pin_mapping.analog_pins)
+        if out is None:
+            out = array("H", bytes(2 * count))
+        async with self._lock:
+            if self.capabilities.adc_bulk:
+                await self._read(_ADC_BASE, _ADC_CHANNEL_OFFSET,
+                                 memoryview(self._adcbuf)[:2 * count])
+                for i in range(count):
+                    out[i] = (self._adcbuf[2 * i] << 8) | self._adcbuf[2 * i + 1]
+            else:
+                for i in range(count):
+                    await self._read(_ADC_BASE, _ADC_CHANNEL_OFFSET + i, self._rx2)
+                    out[i] = struct.unpack_from(">H", self._rxbuf)[0]
+        return out
+
+    async def touch_read(self, pin):
+        self.capabilities.require(_TOUCH_BASE)
+        reg = self._pins.touch_reg.get(pin)
+        if reg is None:
+            raise ValueError("Invalid touch pin")
+        async with self._lock:
+            await self._read(_TOUCH_BASE, reg, self._rx2)
+            return struct.unpack_from(">H", self._rxbuf)[0]
+
+    async def analog_write(self, pin, value):
+        self.capabilities.require(_TIMER_BASE)
+        index = self._pins.pwm_index.get(pin)
+        if index is None:
+            raise ValueError("Invalid PWM pin")
+        if self._pins.pwm_width == 16:
+            cmd = struct.pack(">BH", index, value)
+        else:
+            cmd = struct.pack(">BB", index, value)
+        async with self._lock:
+            await self._write(_TIMER_BASE, _TIMER_PWM, cmd)
+            await self._pause(_TIMER_BASE)
+
+    async def analog_write_bulk(self, values):
+        """Set the duty cycle of several PWM pins in one transaction when the
+        firmware supports it (see ``Seesaw.analog_write_bulk``)."""
+        if isinstance(values, dict):
+            values = values.items()
+        self.capabilities.require(_TIMER_BASE)
+        if not self.capabilities.pwm_bulk or self._pins.pwm_width != 16:
+            for pin, value in values:
+                await self.analog_write(pin, value)
+            return
+        cmd = bytearray(1)
+        for pin, value in values:
+            index = self._pins.pwm_index.get(pin)
+            if index is None:
+                raise ValueError("Invalid PWM pin")
+            cmd += struct.pack(">BH", index, value)
+        if len(cmd) == 1:
+            return
+        cmd[0] = (len(cmd) - 1) // 3
+        async with self._lock:
+            await self._write(_TIMER_BASE, _TIMER_PWM_BULK, cmd)
+            await self._pause(_TIMER_BASE)
+
+    async def set_pwm_freq(self, pin, freq):
+        self.capabilities.require(_TIMER_BASE)
+        index = self._pins.pwm_index.get(pin)
+        if index is None:
+            raise ValueError("Invalid PWM pin")
+        await self.write(_TIMER_BASE, _TIMER_FREQ, struct.pack(">BH", index, freq))
+
+    async def write8(self, reg_base, reg, value):
+        await self.write(reg_base, reg, bytes((value,)))
+
+    async def read8(self, reg_base, reg):
+        async with self._lock:
+            await self._read(reg_base, reg, self._rx1)
+            return self._rxbuf[0]
+
+    async def read(self, reg_base, reg, buf, delay=None):
+        async with self._lock:
+            await self._read(reg_base, reg, buf, delay)
+
+    async def write(self, reg_base, reg, buf=None):
+        async with self._lock:
+            await self._write(reg_base, reg, buf)
+
+    async def calibrate(self, trials=8, margin=1.5):
+        """Measure the shortest safe write-to-read turnaround for each register
+        base, as ``Seesaw.calibrate`` does, and use it from now on. Returns
+        ``delays``.
+
+        The probes sleep with ``time.sleep``: ``asyncio.sleep`` overshoots
+        sub-millisecond waits, which would make too short a turnaround look
+        safe. This blocks the event loop for a few milliseconds, once."""
+        delays = {}
+        async with self._lock:
+            for reg_base, reg, size, exact in self._calibration_probes():
+                delays[reg_base] = self._measure_turnaround(reg_base, reg, size, exact,
+                                                            trials, margin)
+        self.delays = delays
+        return delays
+
+    def _calibration_probes(self):
+        # (reg_base, reg, read size, reply must match a slow read exactly)
+        supports = self.capabilities.supports
+        probes = [(_STATUS_BASE, _STATUS_HW_ID, 1, True),
+                  (_GPIO_BASE, _GPIO_BULK, 8, True)]
+        if supports(_TIMER_BASE):
+            probes.append((_TIMER_BASE, _TIMER_STATUS, 1, True))
+        if self._pin_mapping.analog_pins and supports(_ADC_BASE):
+            probes.append((_ADC_BASE, _ADC_CHANNEL_OFFSET, 2, False))
+        if self._pin_mapping.touch_pins and supports(_TOUCH_BASE):
+            probes.append((_TOUCH_BASE, _TOUCH_CHANNEL_OFFSET, 2, False))
+        return probes
+
+    def _measure_turnaround(self, reg_base, reg, size, exact, trials, margin):
+        # pylint: disable=too-many-arguments
+        reference = bytearray(size)
+        self._probe(reg_base, reg, reference, _DEFAULT_DELAY)
+        buf = bytearray(size)
+        safe = _DEFAULT_DELAY
+        for delay in _TURNAROUND_STEPS:
+            for _ in range(trials):
+                self._probe(reg_base, reg, buf, delay)
+                if _corrupt(buf) or (exact and buf != reference):
+                    return min(_DEFAULT_DELAY, safe * margin)
+            safe = delay
+        return min(_DEFAULT_DELAY, safe * margin)
+
+    def _probe(self, reg_base, reg, buf, delay):
+        self._txbuf[0] = reg_base
+        self._txbuf[1] = reg
+        with self.i2c_device as i2c:
+            i2c.write(self._txbuf, end=2)
+        if delay:
+            time.sleep(delay)
+        with self.i2c_device as i2c:
+            i2c.readinto(buf)
+
+    async def _pause(self, reg_base):
+        delay = self.delays.get(reg_base, _DEFAULT_DELAY)
+        if delay:
+            await asyncio.sleep(delay)
+
+    async def _wait_drdy(self):
+        if self._drdy.value:
+            return
+        # back off with growing sleeps so other tasks get the loop meanwhile
+        deadline = time.monotonic() + self.drdy_timeout
+        interval = _DRDY_MIN_SLEEP
+        while not self._drdy.value:
+            if time.monotonic() > deadline:
+                raise DataReadyTimeout("Seesaw data ready line stayed low for {:.3f}s"
+                                       .format(self.drdy_timeout))
+            await asyncio.sleep(interval)
+            interval = min(_DRDY_MAX_SLEEP, interval * 2)
+
+    async def _read(self, reg_base, reg, buf, delay=None):
+        await self._write(reg_base, reg)
+        if self._drdy is not None:
+            await self._wait_drdy()
+        else:
+            if delay is None:
+                delay = self.delays.get(reg_base, _DEFAULT_DELAY)
+            await asyncio.sleep(delay)
+        with self.i2c_device as i2c:
+            i2c.readinto(buf)
+
+    async def _write(self, reg_base, reg, buf=None):
+        end = 2
+        if buf is not None:
+            end += len(buf)
+        if end > len(self._txbuf):
+            self._txbuf = bytearray(end)
+        self._txbuf[0] = reg_base
+        self._txbuf[1] = reg
+        if buf is not None:
+            self._txbuf[2:end] = buf
+        if self._drdy is not None:
+            await self._wait_drdy()
+        with self.i2c_device as i2c:
+            i2c.write(self._txbuf, end=end)
@@ -0,0 +1,410 @@
+# The MIT License (MIT)
+#
+# Copyright (c) 2019 Robotics Masters
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+"""
+`adafruit_seesaw.busmanager`
+====================================================
+
+Share one I2C bus between several seesaw boards, and between the threads
+driving them, with actuator writes served first.
+
+Every ``Seesaw`` owns its own ``I2CDevice`` and nothing orders the transfers
+of one board against another.  ``BusManager.manage`` swaps a board's device
+for a ``ManagedDevice`` that queues on the shared manager, and sets the
+board's ``transaction_lock`` so that a whole register transaction (the
+register select, the turnaround and the read) runs under one grant of the
+bus.  When the bus frees up, the waiting transaction with the best priority
+goes next:
+
+* ``ACTUATOR``: PWM and GPIO writes (servos, motors, outputs)
+* ``NORMAL``: every other command (NeoPixel data, configuration)
+* ``POLL``: register reads (temperature, ADC, touch, inputs)
+
+A write never lands between another thread's select and read, at the price
+of the bus idling through the turnaround.  Give each thread its own
+``Seesaw`` (see ``Seesaw.fork``): the manager orders transactions, but two
+threads sharing one ``Seesaw`` still share its buffers.
+
+Each board can be given a budget of ``rate`` operations per second.  Reads
+and commands over budget are delayed; actuator writes never are.
+
+.. code-block:: python
+
+  import board, busio
+  from adafruit_seesaw.seesaw import Seesaw
+  from adafruit_seesaw.busmanager import BusManager
+
+  i2c = busio.I2C(board.SCL, board.SDA)
+  manager = BusManager()
+  mm1 = Seesaw(i2c, 0x49, reset=False)
+  sensors = Seesaw(i2c, 0x4A)
+  manager.manage(mm1)
+  manager.manage(sensors, rate=100)
+  ...
+  print(manager.report())
+
+On boards without ``threading`` there is only one caller, so transfers go
+straight through and only the statistics are kept.
+
+* Author(s): Robotics Masters
+"""
+
+import time
+
+try:
+    from micropython import const
+except ImportError:
+    def const(x):
+        return x
+
+try:
+    import threading
+    import heapq
+except ImportError:
+    threading = None
+
+__version__ = "0.0.0-auto.0"
+__repo__ = "https://github.com/robotics-masters/mm1-hat-seesaw.git"
+
+_GPIO_BASE = const(0x01)
+_TIMER_BASE = const(0x08)
+
+ACTUATOR = const(0)
+NORMAL = const(1)
+POLL = const(2)
+
+_PRIORITY_NAMES = ("actuator", "normal", "poll")
+
+
+class BusManager:
+    """Arbitrates the transfers of every ``ManagedDevice`` on one bus."""
+
+    def __init__(self):
+        self._cond = threading.Condition() if threading else None
+        # per thread: open transaction depth, and when its grant was taken
+        self._local = threading.local() if threading else None
+        self._queue = []
+        self._seq = 0
+        self._busy = False
+        self.devices = []
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Zero the bus and per-device counters."""
+        self._since = time.monotonic()
+        self.busy_time = 0.0
+        self.transactions = 0
+        self.wait_count = [0, 0, 0]
+        self.wait_total = [0.0, 0.0, 0.0]
+        self.wait_max = [0.0, 0.0, 0.0]
+        for device in self.devices:
+            device.reset_stats()
+
+    def manage(self, seesaw, *, rate=None, burst=None, priorities=None):
+        """Route ``seesaw``'s transfers through this manager.
+
+        :param float rate: Operations per second allowed for this board below
+            ``ACTUATOR`` priority, or None for no budget
+        :param int burst: Operations that may run back to back before ``rate``
+            applies; defaults to a tenth of a second's worth
+        :param dict priorities: Register base to priority overrides for writes"""
+        device = ManagedDevice(self, seesaw.i2c_device, rate=rate, burst=burst,
+                               priorities=priorities)
+        seesaw.i2c_device = device
+        seesaw._device_changed()  # pylint: disable=protected-access
+        if self._cond is not None:
+            seesaw.transaction_lock = _Transaction(self, seesaw.transaction_lock)
+        self.devices.append(device)
+        return device
+
+    @property
+    def utilization(self):
+        """Fraction of the time since ``reset_stats`` the bus was busy."""
+        elapsed = time.monotonic() - self._since
+        return self.busy_time / elapsed if elapsed > 0 else 0.0
+
+    def report(self):
+        """Bus utilization, queueing delay and per-board load as printable text."""
+        lines = ["bus utilization {:.1f}% over {:.1f}s, {} transactions".format(
+            100.0 * self.utilization, time.monotonic() - self._since, self.transactions)]
+        for priority, name in enumerate(_PRIORITY_NAMES):
+            count = self.wait_count[priority]
+            if count:
+                lines.append("  {:<9} {:>7} waits, avg {:>8.1f} us, max {:>8.1f} us".format(
+                    name, count, 1e6 * self.wait_total[priority] / count,
+                    1e6 * self.wait_max[priority]))
+        for device in self.devices:
+            lines.append("  0x{:02x}: {} transfers, {:.1f} ms busy, {} errors, "
+                         "{} throttled ({:.1f} ms)".format(
+                             device.device_address, device.transactions,
+                             1e3 * device.busy_time, device.errors, device.throttled,
+                             1e3 * device.throttle_time))
+        return "\n".join(lines)
+
+    def _acquire(self, priority):
+        start = time.monotonic()
+        if self._cond is not None:
+            with self._cond:
+                self._seq += 1
+                ticket = (priority, self._seq)
+                heapq.heappush(self._queue, ticket)
+                while self._busy or self._queue[0] != ticket:
+                    self._cond.wait()
+                heapq.heappop(self._queue)
+                self._busy = True
+        granted = time.monotonic()
+        waited = granted - start
+        self.wait_count[priority] += 1
+        self.wait_total[priority] += waited
+        if waited > self.wait_max[priority]:
+            self.wait_max[priority] = waited
+        return granted
+
+    def _open(self):
+        local = self._local
+        local.depth = getattr(local, "depth", 0) + 1
+
+    def _close(self):
+        local = self._local
+        local.depth -= 1
+        if not local.depth and getattr(local, "granted", None) is not None:
+            granted = local.granted
+            local.granted = None
+            self._release(time.monotonic() - granted)
+
+    def _idle(self):
+        # nothing holds or waits for the bus, or this thread already holds it
+        if getattr(self._local, "granted", None) is not None:
+            return True
+        with self._cond:
+            return not self._busy and not self._queue
+
+    def _grant(self, priority):
+        # Returns True when the transfer must release the bus itself; False
+        # when an open transaction on this thread holds it until it closes.
+        local = self._local
+        if local is None:
+            self._acquire(priority)
+            return True
+        if getattr(local, "granted", None) is not None:
+            return False
+        granted = self._acquire(priority)
+        if getattr(local, "depth", 0):
+            local.granted = granted
+            return False
+        return True
+
+    def _release(self, busy):
+        self.busy_time += busy
+        self.transactions += 1
+        if self._cond is not None:
+            with self._cond:
+                self._busy = False
+                self._cond.notify_all()
+
+
+class _Transaction:
+    """A board's ``transaction_lock`` under a ``BusManager``: the first
+    transfer inside it takes the bus, which is held until it exits. Reentrant,
+    and wraps any lock the board already had (e.g. from ``Seesaw.fork``).
+
+    ``acquire(False)`` succeeds only while the bus is idle, so a background
+    sampler can keep to the slots nobody else wants."""
+
+    def __init__(self, manager, outer=None):
+        self._manager = manager
+        self._outer = outer
+
+    def acquire(self, blocking=True):
+        """Open a transaction; without ``blocking``, only if the bus is idle."""
+        # pylint: disable=protected-access
+        outer = self._outer
+        if outer is not None and not outer.acquire(blocking):
+            return False
+        if not blocking and not self._manager._idle():
+            if outer is not None:
+                outer.release()
+            return False
+        self._manager._open()
+        return True
+
+    def release(self):
+        """Close the transaction, releasing the bus if it was the outermost."""
+        try:
+            self._manager._close()  # pylint: disable=protected-access
+        finally:
+            if self._outer is not None:
+                self._outer.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+        return False
+
+
+class ManagedDevice:
+    """Stands in for a board's ``I2CDevice`` and queues its transfers on a
+    ``BusManager``. Created by ``BusManager.manage``."""
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(self, manager, device, *, rate=None, burst=None, priorities=None):
+        self._manager = manager
+        self._device = device
+        self._priorities = {_GPIO_BASE: ACTUATOR, _TIMER_BASE: ACTUATOR}
+        if priorities:
+            self._priorities.update(priorities)
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1, (rate or 0) / 10)
+        self._tokens = self.burst
+        self._stamp = time.monotonic()
+        if hasattr(device, "flush"):
+            # a pipelining transport (SerialTransport) confirms writes on flush
+            self.flush = self._flush
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Zero this board's counters."""
+        self.transactions = 0
+        self.busy_time = 0.0
+        self.errors = 0
+        self.throttled = 0
+        self.throttle_time = 0.0
+
+    @property
+    def device_address(self):
+        """The board's I2C address."""
+        return self._device.device_address
+
+    @device_address.setter
+    def device_address(self, addr):
+        self._device.device_address = addr
+
+    @property
+    def needs_turnaround(self):
+        """Whether the board's transport needs a pause between select and read."""
+        return getattr(self._device, "needs_turnaround", True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+    def _priority(self, buf, start, end):
+        if end - start <= 2:
+            # a bare register select ahead of a read
+            return POLL
+        return self._priorities.get(buf[start], NORMAL)
+
+    def _throttle(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._stamp) * self.rate)
+        self._stamp = now
+        if self._tokens < 1:
+            delay = (1 - self._tokens) / self.rate
+            self.throttled += 1
+            self.throttle_time += delay
+            time.sleep(delay)
+            self._tokens = 1
+            self._stamp = time.monotonic()
+        self._tokens -= 1
+
+    def _begin(self, priority, charge=True):
+        if charge and self.rate and priority != ACTUATOR:
+            self._throttle()
+        return self._manager._grant(priority)  # pylint: disable=protected-access
+
+    def _end(self, release, start):
+        busy = time.monotonic() - start
+        self.transactions += 1
+        self.busy_time += busy
+        if release:
+            self._manager._release(busy)  # pylint: disable=protected-access
+
+    def write(self, buf, *, start=0, end=None):
+        """Queue a write, as ``I2CDevice.write``."""
+        if end is None:
+            end = len(buf)
+        release = self._begin(self._priority(buf, start, end))
+        began = time.monotonic()
+        try:
+            with self._device as i2c:
+                i2c.write(buf, start=start, end=end)
+        except OSError:
+            self.errors += 1
+            raise
+        finally:
+            self._end(release, began)
+
+    def _flush(self):
+        # wait for the transport's outstanding acknowledgements under a grant
+        release = self._begin(NORMAL, charge=False)
+        began = time.monotonic()
+        try:
+            self._device.flush()
+        except OSError:
+            self.errors += 1
+            raise
+        finally:
+            self._end(release, began)
+
+    def readinto(self, buf, *, start=0, end=None):
+        """Queue a read, as ``I2CDevice.readinto``. The read half of a register
+        read is not charged against the budget a second time."""
+        if end is None:
+            end = len(buf)
+        release = self._begin(POLL, charge=False)
+        began = time.monotonic()
+        try:
+            with self._device as i2c:
+                i2c.readinto(buf, start=start, end=end)
+        except OSError:
+            self.errors += 1
+            raise
+        finally:
+            self._end(release, began)
+
+    def write_then_readinto(self, out_buffer, in_buffer, *, out_start=0, out_end=None,
+                            in_start=0, in_end=None):
+        """Queue a combined register read, as ``I2CDevice.write_then_readinto``."""
+        # pylint: disable=too-many-arguments
+        if out_end is None:
+            out_end = len(out_buffer)
+        if in_end is None:
+            in_end = len(in_buffer)
+        release = self._begin(POLL)
+        began = time.monotonic()
+        try:
+            with self._device as i2c:
+                if hasattr(i2c, "write_then_readinto"):
+                    i2c.write_then_readinto(out_buffer, in_buffer, out_start=out_start,
+                                            out_end=out_end, in_start=in_start, in_end=in_end)
+                else:
+                    i2c.write(out_buffer, start=out_start, end=out_end)
+                    i2c.readinto(in_buffer, start=in_start, end=in_end)
+        except OSError:
+            self.errors += 1
+            raise
+        finally:
+            self._end(release, began)
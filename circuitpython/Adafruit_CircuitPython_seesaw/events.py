@@ -0,0 +1,164 @@
+# The MIT License (MIT)
+#
+# Copyright (c) 2019 Robotics Masters
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+"""
+`adafruit_seesaw.events`
+====================================================
+
+Pin-change events for seesaw GPIO, built on the ``GPIO_INTENSET`` and
+``GPIO_INTFLAG`` registers instead of polling ``digital_read`` in a loop.
+
+The seesaw latches a flag for every armed pin that changes, so short pulses
+between two polls are not lost.  If the seesaw interrupt output is wired to a
+host GPIO, pass it as ``irq`` and ``poll`` costs no bus traffic until the line
+is asserted; otherwise each poll is a single ``INTFLAG`` read.
+
+.. code-block:: python
+
+  from rm_robohat import robohat
+  from adafruit_seesaw.events import GPIOEvents
+
+  events = GPIOEvents(robohat.seesaw)
+  events.watch(robohat.D4, lambda pin, value, timestamp: print(pin, value))
+  while True:
+      events.wait(timeout=0.05)
+
+.. note:: The stock Robo HAT MM1 firmware is built with ``CONFIG_INTERRUPT 0``,
+  so there is no interrupt line to the host and ``irq`` should be left unset.
+
+* Author(s): Robotics Masters
+"""
+
+import time
+
+try:
+    import struct
+except ImportError:
+    import ustruct as struct
+try:
+    from micropython import const
+except ImportError:
+    def const(x):
+        return x
+
+__version__ = "0.0.0-auto.0"
+__repo__ = "https://github.com/robotics-masters/mm1-hat-seesaw.git"
+
+_GPIO_BASE = const(0x01)
+_GPIO_BULK = const(0x04)
+
+
+class GPIOEvents:
+    """Dispatch seesaw pin-change interrupts to callbacks or a timestamped queue.
+
+       :param ~adafruit_seesaw.seesaw.Seesaw seesaw: The device
+       :param irq: Optional ``digitalio``-style input wired to the seesaw
+           interrupt output (active low)
+       :param int maxlen: Number of queued events kept before the oldest are dropped"""
+
+    def __init__(self, seesaw, irq=None, maxlen=32):
+        self._seesaw = seesaw
+        self._irq = irq
+        if irq is not None:
+            irq.switch_to_input()
+        self._callbacks = {}
+        self._watched = 0
+        self._levels = bytearray(8)
+        self._events = []
+        self.maxlen = maxlen
+        self.dropped = 0
+        self.polls = 0
+
+    def watch(self, pin, callback=None):
+        """Arm the pin-change interrupt for ``pin``.
+
+        ``callback(pin, value, timestamp)`` is called from ``poll`` for every
+        change; without a callback the change is queued for ``get``."""
+        self._callbacks[pin] = callback
+        self._watched |= 1 << pin
+        if pin >= 32:
+            self._seesaw.set_GPIO_interrupts_b(1 << (pin - 32), True)
+        else:
+            self._seesaw.set_GPIO_interrupts(1 << pin, True)
+
+    def unwatch(self, pin):
+        """Disarm the pin-change interrupt for ``pin``."""
+        self._callbacks.pop(pin, None)
+        self._watched &= ~(1 << pin)
+        if pin >= 32:
+            self._seesaw.set_GPIO_interrupts_b(1 << (pin - 32), False)
+        else:
+            self._seesaw.set_GPIO_interrupts(1 << pin, False)
+
+    def poll(self):
+        """Collect and dispatch pending changes. Returns the number of events."""
+        if self._irq is not None and self._irq.value:
+            return 0
+        self.polls += 1
+        flags = self._seesaw.get_GPIO_interrupt_flags() & self._watched
+        if not flags:
+            return 0
+        timestamp = time.monotonic()
+        self._seesaw.read(_GPIO_BASE, _GPIO_BULK, self._levels)
+        port_a, port_b = struct.unpack_from(">II", self._levels)
+        levels = port_a | (port_b << 32)
+
+        count = 0
+        pin = 0
+        while flags:
+            if flags & 1:
+                value = bool(levels & (1 << pin))
+                callback = self._callbacks.get(pin)
+                if callback is not None:
+                    callback(pin, value, timestamp)
+                else:
+                    self._queue((pin, value, timestamp))
+                count += 1
+            flags >>= 1
+            pin += 1
+        return count
+
+    def wait(self, timeout=None, interval=0.001):
+        """Poll until at least one event is dispatched or ``timeout`` seconds pass.
+        Returns the number of events."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            count = self.poll()
+            if count:
+                return count
+            if deadline is not None and time.monotonic() >= deadline:
+                return 0
+            time.sleep(interval)
+
+    def get(self):
+        """The oldest queued ``(pin, value, timestamp)`` event, or None."""
+        if not self._events:
+            return None
+        return self._events.pop(0)
+
+    def __len__(self):
+        return len(self._events)
+
+    def _queue(self, event):
+        if len(self._events) >= self.maxlen:
+            self._events.pop(0)
+            self.dropped += 1
+        self._events.append(event)
@@ -0,0 +1,289 @@
+# The MIT License (MIT)
+#
+# Copyright (c) 2019 Robotics Masters
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+"""
+`adafruit_seesaw.fastpixel`
+====================================================
+
+NeoPixels on a seesaw that only upload what changed.
+
+``adafruit_seesaw.neopixel`` rewrites the whole ``NEOPIXEL_BUF`` on every
+``show``.  ``FastNeoPixel`` keeps a copy of what the chip already holds, sends
+only the byte ranges that differ (split to the seesaw's I2C receive buffer) and
+then latches the frame with a single ``NEOPIXEL_SHOW``.  A status strip that
+animates a few pixels at a time costs a few short writes per frame instead of
+the whole buffer, which leaves the bus to the servos.
+
+.. code-block:: python
+
+  from rm_robohat import robohat
+
+  robohat.init_neopixel(60)
+  robohat.neopixel[3] = (0, 40, 0)
+  print(robohat.neopixel.fps)
+
+* Author(s): Robotics Masters
+"""
+
+import time
+
+try:
+    from micropython import const
+except ImportError:
+    def const(x):
+        return x
+
+__version__ = "0.0.0-auto.0"
+__repo__ = "https://github.com/robotics-masters/mm1-hat-seesaw.git"
+
+_NEOPIXEL_BASE = const(0x0E)
+
+_NEOPIXEL_PIN = const(0x01)
+_NEOPIXEL_BUF_LENGTH = const(0x03)
+_NEOPIXEL_BUF = const(0x04)
+_NEOPIXEL_SHOW = const(0x05)
+
+# Largest single I2C write the seesaw accepts: 2 register bytes, 2 offset bytes
+# and the pixel data.
+_MAX_TRANSFER = const(32)
+# Unchanged bytes between two changed runs cheaper to resend than to split on.
+_MERGE_GAP = const(4)
+
+# Pixel color order constants: offset of red, green, blue (and white)
+RGB = (0, 1, 2)
+GRB = (1, 0, 2)
+RGBW = (0, 1, 2, 3)
+GRBW = (1, 0, 2, 3)
+
+
+class FastNeoPixel:
+    """Control NeoPixels connected to a seesaw, uploading only changed bytes.
+
+       :param ~adafruit_seesaw.seesaw.Seesaw seesaw: The device
+       :param int pin: The pin number on the device
+       :param int n: The number of pixels
+       :param int bpp: The number of bytes per pixel
+       :param float brightness: The brightness, from 0.0 to 1.0
+       :param bool auto_write: Automatically update the pixels when changed
+       :param pixel_order: The layout of the pixels, one of the order constants
+           such as ``RGBW`` or a string such as ``"GRB"``
+       :param int max_transfer: Largest I2C write, in bytes, the firmware accepts"""
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(self, seesaw, pin, n, *, bpp=3, brightness=1.0, auto_write=True,
+                 pixel_order=None, max_transfer=_MAX_TRANSFER):
+        # pylint: disable=too-many-arguments
+        self._seesaw = seesaw
+        self._pin = pin
+        self._n = n
+        self._bpp = bpp
+        if pixel_order is None:
+            pixel_order = GRB if bpp == 3 else GRBW
+        elif isinstance(pixel_order, str):
+            pixel_order = tuple(pixel_order.index(color) for color in "RGBW"[:bpp])
+        self._order = pixel_order
+        self.auto_write = False
+        self._raw = bytearray(n * bpp)
+        self._buf = bytearray(n * bpp)
+        self._sent = bytearray(n * bpp)
+        self._chunk = max_transfer - 4
+        self._out = bytearray(2 + self._chunk)
+        # dirty byte range of _buf since the last show
+        self._lo = 0
+        self._hi = n * bpp
+        # the chip buffer contents are unknown until the first show sends it all
+        self._stale = True
+        # bytes uploaded but not yet latched with NEOPIXEL_SHOW
+        self._unlatched = False
+
+        self.frames = 0
+        self.bytes_sent = 0
+        self.transfers = 0
+        self._fps = 0.0
+        self._fps_start = time.monotonic()
+        self._fps_frames = 0
+
+        self._configure()
+        self._brightness = 1.0
+        self.brightness = brightness
+        self.auto_write = auto_write
+
+    def _configure(self):
+        length = self._n * self._bpp
+        self._seesaw.write(_NEOPIXEL_BASE, _NEOPIXEL_PIN, bytes((self._pin,)))
+        self._seesaw.write(_NEOPIXEL_BASE, _NEOPIXEL_BUF_LENGTH,
+                           bytes((length >> 8, length & 0xFF)))
+        self._resets = self._seesaw.resets
+
+    def __len__(self):
+        return self._n
+
+    @property
+    def bpp(self):
+        """The number of bytes per pixel."""
+        return self._bpp
+
+    @property
+    def brightness(self):
+        """Overall brightness of the pixels, 0.0 to 1.0."""
+        return self._brightness
+
+    @brightness.setter
+    def brightness(self, brightness):
+        self._brightness = min(max(brightness, 0.0), 1.0)
+        for i, value in enumerate(self._raw):
+            self._buf[i] = int(value * self._brightness)
+        self._mark(0, len(self._buf))
+        if self.auto_write:
+            self.show()
+
+    @property
+    def fps(self):
+        """Frames shown per second, averaged over the last second or so."""
+        return self._fps
+
+    def _mark(self, lo, hi):
+        if lo < self._lo:
+            self._lo = lo
+        if hi > self._hi:
+            self._hi = hi
+
+    def _set(self, index, color):
+        if isinstance(color, int):
+            color = ((color >> 16) & 0xFF, (color >> 8) & 0xFF, color & 0xFF)
+            if self._bpp == 4:
+                color = color + (0,)
+        offset = index * self._bpp
+        brightness = self._brightness
+        for i in range(self._bpp):
+            value = color[i] if i < len(color) else 0
+            self._raw[offset + self._order[i]] = value
+            self._buf[offset + self._order[i]] = int(value * brightness)
+        self._mark(offset, offset + self._bpp)
+
+    def _get(self, index):
+        offset = index * self._bpp
+        return tuple(self._raw[offset + self._order[i]] for i in range(self._bpp))
+
+    def __setitem__(self, key, color):
+        if isinstance(key, slice):
+            for index, value in zip(range(*key.indices(self._n)), color):
+                self._set(index, value)
+        else:
+            if key < 0:
+                key += self._n
+            if not 0 <= key < self._n:
+                raise IndexError("NeoPixel index out of range")
+            self._set(key, color)
+        if self.auto_write:
+            self.show()
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return [self._get(index) for index in range(*key.indices(self._n))]
+        if key < 0:
+            key += self._n
+        if not 0 <= key < self._n:
+            raise IndexError("NeoPixel index out of range")
+        return self._get(key)
+
+    def fill(self, color):
+        """Set every pixel to ``color``."""
+        for index in range(self._n):
+            self._set(index, color)
+        if self.auto_write:
+            self.show()
+
+    def _upload(self, start, end):
+        buf = self._buf
+        out = self._out
+        while start < end:
+            count = min(end - start, self._chunk)
+            out[0] = start >> 8
+            out[1] = start & 0xFF
+            out[2:2 + count] = buf[start:start + count]
+            self._seesaw.write(_NEOPIXEL_BASE, _NEOPIXEL_BUF, memoryview(out)[:2 + count])
+            self._sent[start:start + count] = buf[start:start + count]
+            self._unlatched = True
+            self.bytes_sent += count
+            self.transfers += 1
+            start += count
+
+    def show(self):
+        """Upload the changed bytes and latch them with one ``NEOPIXEL_SHOW``.
+        Returns the number of pixel bytes sent; nothing is written if no pixel
+        changed since the last show.
+
+        If a write fails, the bytes the chip did not take stay marked and go
+        out on the next ``show``. After a seesaw ``sw_reset`` the pin, length
+        and whole buffer are sent again."""
+        if self._seesaw.resets != self._resets:
+            # the reset cleared the chip's NeoPixel setup and buffer
+            self._configure()
+            self._stale = True
+        lo, hi = self._lo, self._hi
+        stale = self._stale
+        self._lo = len(self._buf)
+        self._hi = 0
+        self._stale = False
+        before = self.bytes_sent
+        try:
+            if stale:
+                self._upload(0, len(self._buf))
+            else:
+                self._upload_changes(lo, hi)
+            if not self._unlatched:
+                return 0
+            self._seesaw.write(_NEOPIXEL_BASE, _NEOPIXEL_SHOW)
+            self._unlatched = False
+        except (OSError, RuntimeError):
+            # chunks that made it are in _sent and compare equal next time
+            self._mark(lo, hi)
+            self._stale = self._stale or stale
+            raise
+
+        self.frames += 1
+        self._fps_frames += 1
+        now = time.monotonic()
+        if now - self._fps_start >= 1.0:
+            self._fps = self._fps_frames / (now - self._fps_start)
+            self._fps_start = now
+            self._fps_frames = 0
+        return self.bytes_sent - before
+
+    def _upload_changes(self, lo, hi):
+        buf = self._buf
+        sent = self._sent
+        run_start = None
+        run_end = 0
+        for i in range(lo, hi):
+            if buf[i] != sent[i]:
+                if run_start is None:
+                    run_start = i
+                elif i - run_end > _MERGE_GAP:
+                    self._upload(run_start, run_end)
+                    run_start = i
+                run_end = i + 1
+        if run_start is not None:
+            self._upload(run_start, run_end)
+
+    def deinit(self):
+        """Nothing to release; kept for ``adafruit_seesaw.neopixel`` compatibility."""
@@ -0,0 +1,187 @@
+# The MIT License (MIT)
+#
+# Copyright (c) 2019 Robotics Masters
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+"""
+`adafruit_seesaw.linux_i2c`
+====================================================
+
+Talk to a seesaw through ``/dev/i2c-N`` directly on Linux hosts such as the
+Raspberry Pi, without Blinka's ``busio`` or ``adafruit_bus_device``.
+
+Every transfer is a single ``I2C_RDWR`` ioctl, and a register read that needs
+no turnaround sends the register select and reads the reply in one ioctl with
+a repeated start.  Whether a register bank needs a turnaround is only known
+after ``Seesaw.calibrate``, so ``Seesaw`` calibrates when it attaches through
+a ``LinuxI2CDevice``: a few hundred short reads, once per firmware version in
+a process.  Pass ``calibrate=False`` to skip that and keep the conservative
+1 ms turnaround, with the select and the read in separate ioctls.
+
+.. code-block:: python
+
+  from adafruit_seesaw.seesaw import Seesaw
+  from adafruit_seesaw.linux_i2c import LinuxI2CDevice
+
+  ss = Seesaw(LinuxI2CDevice(1, 0x49), reset=False)
+
+``LinuxI2CDevice`` takes the place of ``I2CDevice``: ``Seesaw`` uses any
+object with a ``device_address`` as it is.  Pass ``fd`` and ``ioctl`` to run
+it against a stand-in such as ``adafruit_seesaw.simulator.I2CDevFile``.
+
+* Author(s): Robotics Masters
+"""
+
+import ctypes
+import os
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+__version__ = "0.0.0-auto.0"
+__repo__ = "https://github.com/robotics-masters/mm1-hat-seesaw.git"
+
+# linux/i2c-dev.h and linux/i2c.h
+I2C_RDWR = 0x0707
+I2C_M_RD = 0x0001
+
+_MAX_TRANSFER = 256
+
+
+class i2c_msg(ctypes.Structure):
+    """``struct i2c_msg``"""
+    # pylint: disable=invalid-name,too-few-public-methods
+    _fields_ = [("addr", ctypes.c_uint16),
+                ("flags", ctypes.c_uint16),
+                ("len", ctypes.c_uint16),
+                ("buf", ctypes.POINTER(ctypes.c_uint8))]
+
+
+class i2c_rdwr_ioctl_data(ctypes.Structure):
+    """``struct i2c_rdwr_ioctl_data``"""
+    # pylint: disable=invalid-name,too-few-public-methods
+    _fields_ = [("msgs", ctypes.POINTER(i2c_msg)),
+                ("nmsgs", ctypes.c_uint32)]
+
+
+class LinuxI2CDevice:
+    """One I2C address on a Linux ``/dev/i2c-N`` adapter, with the
+    ``I2CDevice`` interface ``Seesaw`` uses.
+
+       :param int bus: Adapter number, e.g. 1 for ``/dev/i2c-1`` on a Raspberry Pi
+       :param int device_address: I2C address of the device
+       :param int fd: An already open file descriptor to use instead of opening
+           the adapter
+       :param ioctl: Replacement for ``fcntl.ioctl``, for running without hardware
+       :param int max_transfer: Longest single write or read, in bytes
+       :param bool calibrate: Have ``Seesaw`` calibrate the turnaround when it
+           attaches, so reads that need none go out as one ioctl"""
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(self, bus, device_address, *, fd=None, ioctl=None,
+                 max_transfer=_MAX_TRANSFER, calibrate=True):
+        # pylint: disable=too-many-arguments
+        self.calibrate_on_attach = calibrate
+        self._owns_fd = fd is None
+        if fd is None:
+            fd = os.open("/dev/i2c-{}".format(bus), os.O_RDWR)
+        self._fd = fd
+        self._ioctl = ioctl if ioctl is not None else fcntl.ioctl
+        self.device_address = device_address
+
+        # fixed buffers and messages, reused by every transfer
+        self._out = bytearray(max_transfer)
+        self._in = bytearray(max_transfer)
+        self._outv = memoryview(self._out)
+        self._inv = memoryview(self._in)
+        out_c = (ctypes.c_uint8 * max_transfer).from_buffer(self._out)
+        in_c = (ctypes.c_uint8 * max_transfer).from_buffer(self._in)
+        self._msgs = (i2c_msg * 2)()
+        self._msgs[0].buf = ctypes.cast(out_c, ctypes.POINTER(ctypes.c_uint8))
+        self._msgs[1].flags = I2C_M_RD
+        self._msgs[1].buf = ctypes.cast(in_c, ctypes.POINTER(ctypes.c_uint8))
+        self._keep = (out_c, in_c)
+        # write only or write+read start at msgs[0]; read only is msgs[1] alone
+        self._from_write = i2c_rdwr_ioctl_data(
+            ctypes.cast(self._msgs, ctypes.POINTER(i2c_msg)), 1)
+        self._from_read = i2c_rdwr_ioctl_data(ctypes.pointer(self._msgs[1]), 1)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+    def close(self):
+        """Close the adapter if this object opened it."""
+        if self._owns_fd and self._fd is not None:
+            os.close(self._fd)
+        self._fd = None
+
+    def _check(self, nbytes):
+        if nbytes > len(self._out):
+            raise ValueError("Transfer longer than max_transfer")
+
+    def write(self, buf, *, start=0, end=None):
+        """Write ``buf[start:end]`` in one ioctl."""
+        if end is None:
+            end = len(buf)
+        count = end - start
+        self._check(count)
+        self._outv[:count] = memoryview(buf)[start:end]
+        msg = self._msgs[0]
+        msg.addr = self.device_address
+        msg.len = count
+        self._from_write.nmsgs = 1
+        self._ioctl(self._fd, I2C_RDWR, self._from_write)
+
+    def readinto(self, buf, *, start=0, end=None):
+        """Read into ``buf[start:end]`` in one ioctl."""
+        if end is None:
+            end = len(buf)
+        count = end - start
+        self._check(count)
+        msg = self._msgs[1]
+        msg.addr = self.device_address
+        msg.len = count
+        self._ioctl(self._fd, I2C_RDWR, self._from_read)
+        memoryview(buf)[start:end] = self._inv[:count]
+
+    def write_then_readinto(self, out_buffer, in_buffer, *, out_start=0, out_end=None,
+                            in_start=0, in_end=None):
+        """Write then read with a repeated start, both in one ioctl."""
+        # pylint: disable=too-many-arguments
+        if out_end is None:
+            out_end = len(out_buffer)
+        if in_end is None:
+            in_end = len(in_buffer)
+        out_count = out_end - out_start
+        in_count = in_end - in_start
+        self._check(out_count)
+        self._check(in_count)
+        self._outv[:out_count] = memoryview(out_buffer)[out_start:out_end]
+        write, read = self._msgs[0], self._msgs[1]
+        write.addr = read.addr = self.device_address
+        write.len = out_count
+        read.len = in_count
+        self._from_write.nmsgs = 2
+        self._ioctl(self._fd, I2C_RDWR, self._from_write)
+        memoryview(in_buffer)[in_start:in_end] = self._inv[:in_count]
@@ -0,0 +1,146 @@
+# The MIT License (MIT)
+#
+# Copyright (c) 2019 Robotics Masters
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+"""
+`adafruit_seesaw.rcin`
+====================================================
+
+RC receiver input on the Robo HAT MM1's RCH1-RCH4 header (PA07-PA04): the
+width of the latest servo pulse on each channel, all four read in one
+transaction, with a failsafe when the receiver stops sending.
+
+The firmware side is a register bank at base ``0x1C``, advertised by bit 28 of
+``STATUS_OPTIONS``:
+
+* ``RC_ENABLE`` (``0x01``, write, 1 byte): channels to capture, bit 0 for RCH1.
+  Captured channels stop working as touch inputs.
+* ``RC_PULSES`` (``0x02``, read, 16 bytes): for each channel, big endian, the
+  latest pulse width in microseconds and the milliseconds since that pulse
+  ended (``0xFFFF`` when none was seen or the count has saturated).
+
+.. code-block:: python
+
+  from rm_robohat import robohat
+
+  rc = robohat.rc_input
+  while True:
+      if rc.update():
+          steering, throttle = rc.value(0), rc.value(1)
+      else:
+          steering = throttle = 0.0  # failsafe
+
+.. note:: The stock Robo HAT MM1 firmware does not include this bank;
+  ``RCInput`` raises ``RuntimeError`` on firmware that does not advertise it.
+  ``adafruit_seesaw.simulator.SeesawSimulator(rc_capture=True)`` implements it
+  for testing.
+
+* Author(s): Robotics Masters
+"""
+
+import time
+from array import array
+
+try:
+    import struct
+except ImportError:
+    import ustruct as struct
+try:
+    from micropython import const
+except ImportError:
+    def const(x):
+        return x
+
+__version__ = "0.0.0-auto.0"
+__repo__ = "https://github.com/robotics-masters/mm1-hat-seesaw.git"
+
+_RC_BASE = const(0x1C)
+_RC_ENABLE = const(0x01)
+_RC_PULSES = const(0x02)
+
+CHANNELS = const(4)
+_NO_PULSE = const(0xFFFF)
+
+
+class RCInput:
+    """Pulse widths from an RC receiver on RCH1-RCH4.
+
+       :param ~adafruit_seesaw.seesaw.Seesaw seesaw: The Robo HAT's seesaw
+       :param int channels: Bitmask of the channels to capture, bit 0 for RCH1
+       :param float timeout: Seconds without a pulse before a channel counts as lost
+       :param int min_pulse: Shortest valid pulse, in microseconds
+       :param int max_pulse: Longest valid pulse, in microseconds"""
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(self, seesaw, *, channels=0x0F, timeout=0.1, min_pulse=800, max_pulse=2200):
+        # pylint: disable=too-many-arguments
+        seesaw.capabilities.require(_RC_BASE)
+        self._seesaw = seesaw
+        self.channels = channels
+        self.timeout = timeout
+        self.min_pulse = min_pulse
+        self.max_pulse = max_pulse
+        self._buf = bytearray(4 * CHANNELS)
+        # latest pulse width in microseconds, and when that pulse ended
+        self.pulses = array("H", bytes(2 * CHANNELS))
+        self.timestamps = [None] * CHANNELS
+        self.signal = False
+        self.reads = 0
+        self.failsafes = 0
+        seesaw.write8(_RC_BASE, _RC_ENABLE, channels)
+
+    def update(self):
+        """Read all four channels in one transaction. Returns ``signal``: True
+        when every captured channel has had a valid pulse within ``timeout``."""
+        self._seesaw.read(_RC_BASE, _RC_PULSES, self._buf)
+        now = time.monotonic()
+        self.reads += 1
+        signal = True
+        for channel in range(CHANNELS):
+            width, age = struct.unpack_from(">HH", self._buf, 4 * channel)
+            self.pulses[channel] = width
+            if age == _NO_PULSE:
+                self.timestamps[channel] = None
+            else:
+                self.timestamps[channel] = now - age / 1000
+            if self.channels & (1 << channel) and not self._valid(channel, now):
+                signal = False
+        if self.signal and not signal:
+            self.failsafes += 1
+        self.signal = signal
+        return signal
+
+    def _valid(self, channel, now):
+        stamp = self.timestamps[channel]
+        return (stamp is not None and now - stamp <= self.timeout
+                and self.min_pulse <= self.pulses[channel] <= self.max_pulse)
+
+    def valid(self, channel):
+        """Whether the latest pulse on ``channel`` is in range and no older than
+        ``timeout``."""
+        return self._valid(channel, time.monotonic())
+
+    def value(self, channel, *, center=1500, span=500):
+        """The latest pulse on ``channel`` scaled to -1.0 to 1.0, ``span``
+        microseconds either side of ``center``; 0.0 if the channel is not valid."""
+        if not self.valid(channel):
+            return 0.0
+        value = (self.pulses[channel] - center) / span
+        return max(-1.0, min(1.0, value))
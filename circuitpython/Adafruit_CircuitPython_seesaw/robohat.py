@@ -21,7 +21,11 @@
 # THE SOFTWARE.
 # pylint: disable=missing-docstring,invalid-name,too-many-public-methods,too-few-public-methods
 
-from micropython import const
+try:
+    from micropython import const
+except ImportError:
+    def const(x):
+        return x
 
 __version__ = "0.0.0-auto.0"
 __repo__ = "https://github.com/adafruit/Adafruit_CircuitPython_seesaw.git"
@@ -89,6 +93,13 @@ class MM1_Pinmap:
     		_MM1_SERVO5, _MM1_SERVO6, _MM1_SERVO7, _MM1_SERVO8,
                 _MM1_D12, _MM1_D10, _MM1_D11, _MM1_D9)
 
+    # timer behind each pwm pin (SAMD21 peripheral function E). Channels on one
+    # timer share its frequency: setting Servo 2 to 100 Hz moves Servo 1 too.
+    # PA16/PA17 TCC2, PA18/PA19 TC3, PA11/PA10 TCC1, PA09/PA08 TCC0,
+    # PB08/PB09 TC4, PB10/PB11 TC5
+    pwm_timers = ("TCC2", "TCC2", "TC3", "TC3", "TCC1", "TCC1",
+                  "TCC0", "TCC0", "TC4", "TC4", "TC5", "TC5")
+
     # seesaw firmware touch pin map:
     # touch[0]: 7    touch[1]: 6    touch[2]: 5    touch[3]: 4
     touch_pins = (_MM1_RCH1, _MM1_RCH2, _MM1_RCH3, _MM1_RCH4)
@@ -47,13 +47,22 @@ Implementation Notes
 # pylint: disable=missing-docstring,invalid-name,too-many-public-methods,no-name-in-module
 
 import time
+from array import array
+import random
 
 try:
     import struct
 except ImportError:
     import ustruct as struct
-from micropython import const
-from adafruit_bus_device.i2c_device import I2CDevice
+try:
+    from micropython import const
+except ImportError:
+    def const(x):
+        return x
+try:
+    import threading
+except ImportError:
+    threading = None
 
 __version__ = "0.0.0-auto.0"
 __repo__ = "https://github.com/adafruit/Adafruit_CircuitPython_seesaw.git"
@@ -71,6 +80,8 @@ _DAP_BASE = const(0x0C)
 _EEPROM_BASE = const(0x0D)
 _NEOPIXEL_BASE = const(0x0E)
 _TOUCH_BASE = const(0x0F)
+# Robo HAT MM1 extension: RC pulse capture (see adafruit_seesaw.rcin)
+_RC_BASE = const(0x1C)
 
 _GPIO_DIRSET_BULK = const(0x02)
 _GPIO_DIRCLR_BULK = const(0x03)
@@ -93,6 +104,7 @@ _STATUS_SWRST = const(0x7F)
 _TIMER_STATUS = const(0x00)
 _TIMER_PWM = const(0x01)
 _TIMER_FREQ = const(0x02)
+_TIMER_PWM_BULK = const(0x03)
 
 _ADC_STATUS = const(0x00)
 _ADC_INTEN = const(0x02)
@@ -116,6 +128,13 @@ _NEOPIXEL_SHOW = const(0x05)
 
 _TOUCH_CHANNEL_OFFSET = const(0x10)
 
+# STATUS_OPTIONS bits above the module bases advertise firmware extensions.
+_OPTION_TIMER_PWM_BULK = const(31)
+_OPTION_ADC_BULK = const(30)
+
+# seesaw firmware supports at most 8 ADC inputs (CONFIG_ADC_INPUT_0..7)
+_ADC_MAX_CHANNELS = const(8)
+
 _HW_ID_CODE = const(0x55)
 _EEPROM_I2C_ADDR = const(0x3F)
 
@@ -123,58 +142,375 @@ _EEPROM_I2C_ADDR = const(0x3F)
 _CRICKIT_PID = const(9999)
 _ROBOHATMM1_PID = const(9998)
 
+# Size of the preallocated transmit buffer: register header plus the largest
+# payload the driver sends itself (a bulk PWM frame for 12 channels).
+_TX_BUF_SIZE = const(40)
+
+# Conservative write-to-read turnaround used until the board is calibrated.
+_DEFAULT_DELAY = .001
+# Candidate turnarounds tried by calibrate(), longest first.
+_TURNAROUND_STEPS = (.0005, .00025, .000125, .0000625, .00003125, 0)
+
+# Data-ready wait: busy-poll this many times, then yield this many times,
+# then sleep with a doubling interval capped at _DRDY_MAX_SLEEP.
+_DRDY_SPINS = const(20)
+_DRDY_YIELDS = const(20)
+_DRDY_MIN_SLEEP = .00005
+_DRDY_MAX_SLEEP = .001
+# drdy wait histogram: bucket 0 counts waits of 0 us, bucket n waits shorter
+# than 2**n us, the last bucket everything longer (~65 ms).
+_DRDY_BUCKETS = const(17)
+
+# After a software reset: wait this long for the chip to drop off the bus, then
+# poll HW_ID with a doubling interval until it answers or the timeout expires.
+_RESET_SETTLE = .01
+_RESET_POLL = .002
+_RESET_POLL_MAX = .05
+_RESET_TIMEOUT = .5
+
+# Capabilities keyed by (product id, STATUS_VERSION).
+_capability_cache = {}
+
+# Calibrated turnarounds keyed by firmware version (STATUS_VERSION).
+_turnaround_cache = {}
+
+def _corrupt(buf):
+    """A read that was clocked out before the firmware was ready comes back as all 0xFF."""
+    for b in buf:
+        if b != 0xFF:
+            return False
+    return True
+
+def pinmap_for(pid):
+    """The pin table class for a seesaw product id."""
+    # pylint: disable=import-outside-toplevel
+    if pid == _CRICKIT_PID:
+        from adafruit_seesaw.crickit import Crickit_Pinmap
+        return Crickit_Pinmap
+    if pid == _ROBOHATMM1_PID:
+        from adafruit_seesaw.robohat import MM1_Pinmap
+        return MM1_Pinmap
+    from adafruit_seesaw.samd09 import SAMD09_Pinmap
+    return SAMD09_Pinmap
+
+class PinTable:
+    """A pinmap compiled into direct lookups for the hot path.
+
+       ``pwm_prefix`` maps a PWM pin to its ready-made ``TIMER_PWM`` command
+       header, ``pwm_timer`` to the timer that sets its frequency (None when the
+       pinmap does not say), ``adc_reg`` and ``touch_reg`` map a pin to its
+       channel register."""
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self, pinmap):
+        self.pwm_index = {pin: i for i, pin in enumerate(pinmap.pwm_pins)}
+        timers = getattr(pinmap, "pwm_timers", None)
+        self.pwm_timer = {pin: timers[i] if timers else None
+                          for pin, i in self.pwm_index.items()}
+        self.pwm_prefix = {pin: bytes((_TIMER_BASE, _TIMER_PWM, i))
+                           for pin, i in self.pwm_index.items()}
+        self.pwm_width = pinmap.pwm_width
+        self.adc_reg = {pin: _ADC_CHANNEL_OFFSET + i
+                        for i, pin in enumerate(pinmap.analog_pins)}
+        self.touch_reg = {pin: _TOUCH_CHANNEL_OFFSET + i
+                          for i, pin in enumerate(pinmap.touch_pins)}
+
+_pin_tables = {}
+
+def pin_table(pinmap):
+    """The compiled ``PinTable`` for a pinmap class, built once per class."""
+    table = _pin_tables.get(pinmap)
+    if table is None:
+        table = _pin_tables[pinmap] = PinTable(pinmap)
+    return table
+
+class Capabilities:
+    """What the attached firmware supports, decoded once from ``STATUS_OPTIONS``.
+
+       Each seesaw module sets the bit numbered by its register base; bits above
+       the module range advertise optional fast paths."""
+    _NAMES = {_GPIO_BASE: "GPIO", _SERCOM0_BASE: "SERCOM0", _TIMER_BASE: "timer/PWM",
+              _ADC_BASE: "ADC", _DAC_BASE: "DAC", _INTERRUPT_BASE: "interrupt",
+              _DAP_BASE: "DAP", _EEPROM_BASE: "EEPROM", _NEOPIXEL_BASE: "NeoPixel",
+              _TOUCH_BASE: "touch", _RC_BASE: "RC input"}
+
+    def __init__(self, options):
+        self.options = options
+        self.pwm_bulk = bool(options & (1 << _OPTION_TIMER_PWM_BULK))
+        self.adc_bulk = bool(options & (1 << _OPTION_ADC_BULK))
+
+    def supports(self, module_base):
+        # firmware that reports no modules at all predates STATUS_OPTIONS; trust it
+        return not self.options or bool(self.options & (1 << module_base))
+
+    def require(self, module_base):
+        if not self.supports(module_base):
+            raise RuntimeError("Seesaw firmware was built without the {} module"
+                               .format(self._NAMES.get(module_base, hex(module_base))))
+
+# Writes that set a register to an absolute value, so sending one twice is
+# harmless. Toggles, resets, UART data and EEPROM writes are not in here.
+_ABSOLUTE_WRITES = frozenset((
+    (_GPIO_BASE, _GPIO_DIRSET_BULK), (_GPIO_BASE, _GPIO_DIRCLR_BULK),
+    (_GPIO_BASE, _GPIO_BULK_SET), (_GPIO_BASE, _GPIO_BULK_CLR),
+    (_GPIO_BASE, _GPIO_INTENSET), (_GPIO_BASE, _GPIO_INTENCLR),
+    (_GPIO_BASE, _GPIO_PULLENSET), (_GPIO_BASE, _GPIO_PULLENCLR),
+    (_TIMER_BASE, _TIMER_PWM), (_TIMER_BASE, _TIMER_FREQ), (_TIMER_BASE, _TIMER_PWM_BULK),
+    (_NEOPIXEL_BASE, _NEOPIXEL_PIN), (_NEOPIXEL_BASE, _NEOPIXEL_SPEED),
+    (_NEOPIXEL_BASE, _NEOPIXEL_BUF_LENGTH), (_NEOPIXEL_BASE, _NEOPIXEL_BUF),
+))
+
+class RetryPolicy:
+    """How ``Seesaw`` repeats a transaction that failed with ``OSError``.
+
+       Reads are always retried; writes only when ``(reg_base, reg)`` is in
+       ``absolute``, the registers where a repeated write cannot do harm.
+
+       :param int attempts: Tries per call, including the first
+       :param float deadline: Stop retrying once a call has taken this many
+           seconds; None for no deadline
+       :param float backoff: Sleep before the first retry, doubled on each retry
+       :param float max_backoff: Longest sleep between retries
+       :param float jitter: Up to this fraction of the sleep is added at random,
+           so boards sharing a bus do not retry in lockstep
+       :param absolute: ``(reg_base, reg)`` pairs safe to write twice"""
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(self, attempts=3, deadline=.02, backoff=.0005, max_backoff=.005,
+                 jitter=.5, absolute=_ABSOLUTE_WRITES):
+        # pylint: disable=too-many-arguments
+        self.attempts = attempts
+        self.deadline = deadline
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.absolute = set(absolute)
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Zero the counters.
+
+        ``retries`` counts repeated tries, ``recovered`` calls that succeeded
+        after a retry, ``failures`` calls that gave up and ``deadline_misses``
+        the failures that ran out of time rather than attempts."""
+        self.retries = 0
+        self.recovered = 0
+        self.failures = 0
+        self.deadline_misses = 0
+
+    def retries_write(self, reg_base, reg):
+        return (reg_base, reg) in self.absolute
+
+    def run(self, func, *args):
+        """Call ``func(*args)`` until it does not raise ``OSError``, or the
+        attempts or deadline run out; then the last error is raised."""
+        start = time.monotonic()
+        delay = self.backoff
+        attempt = 1
+        while True:
+            try:
+                result = func(*args)
+            except OSError:
+                pause = delay + delay * self.jitter * random.random()
+                if attempt >= self.attempts:
+                    self.failures += 1
+                    raise
+                if self.deadline is not None and \
+                        time.monotonic() + pause - start > self.deadline:
+                    self.failures += 1
+                    self.deadline_misses += 1
+                    raise
+                self.retries += 1
+                attempt += 1
+                time.sleep(pause)
+                delay = min(delay * 2, self.max_backoff)
+                continue
+            if attempt > 1:
+                self.recovered += 1
+            return result
+
+class DataReadyTimeout(RuntimeError):
+    """The seesaw did not raise its data-ready line within ``drdy_timeout``."""
+
+def _bucket(microseconds):
+    n = 0
+    while microseconds and n < _DRDY_BUCKETS - 1:
+        microseconds >>= 1
+        n += 1
+    return n
+
 class Seesaw:
     """Driver for Seesaw i2c generic conversion trip
 
-       :param ~busio.I2C i2c_bus: Bus the SeeSaw is connected to
-       :param int addr: I2C address of the SeeSaw device"""
+       :param ~busio.I2C i2c_bus: Bus the SeeSaw is connected to, or a ready-made
+           device such as ``adafruit_seesaw.linux_i2c.LinuxI2CDevice``
+       :param int addr: I2C address of the SeeSaw device (unused when given a device)
+       :param bool reset: Reset the chip on construction. Pass False to attach to a
+           running chip without disturbing its outputs (e.g. servos holding position)"""
     INPUT = const(0x00)
     OUTPUT = const(0x01)
     INPUT_PULLUP = const(0x02)
     INPUT_PULLDOWN = const(0x03)
 
-    def __init__(self, i2c_bus, addr=0x49, drdy=None):
+    def __init__(self, i2c_bus, addr=0x49, drdy=None, reset=True):
         self._drdy = drdy
         if drdy is not None:
             drdy.switch_to_input()
+        # seconds to wait for data-ready before raising DataReadyTimeout
+        self.drdy_timeout = .1
+        self.reset_drdy_stats()
 
-        self.i2c_device = I2CDevice(i2c_bus, addr)
-        self.sw_reset()
+        if hasattr(i2c_bus, "device_address"):
+            self.i2c_device = i2c_bus
+        else:
+            # pylint: disable=import-outside-toplevel
+            from adafruit_bus_device.i2c_device import I2CDevice
+            self.i2c_device = I2CDevice(i2c_bus, addr)
+        # preallocated transaction buffers so the hot path does not churn the heap
+        self._txbuf = bytearray(_TX_BUF_SIZE)
+        self._rxbuf = bytearray(8)
+        rx = memoryview(self._rxbuf)
+        self._rx1 = rx[:1]
+        self._rx2 = rx[:2]
+        self._rx4 = rx[:4]
+        self._rx8 = rx
+        self._adcbuf = bytearray(2 * _ADC_MAX_CHANNELS)
+        self._device_changed()
+        self._delays = {}
+        if not getattr(self.i2c_device, "needs_turnaround", True):
+            # framed transports only answer once the reply is ready
+            self._delays = {base: 0 for base in range(_RC_BASE + 1)}
+        self._calibrated_version = None
+        self.turnaround_fallbacks = 0
+        # Port A/B input cache. None disables it; otherwise a GPIO_BULK read is
+        # reused for this many seconds or until invalidate_gpio_cache().
+        self.gpio_cache_window = None
+        self.gpio_cache_hits = 0
+        self.gpio_cache_misses = 0
+        self._gpio_cache = bytearray(8)
+        self._gpio_cache_stamp = None
+        # Opt-in shadow of the last value written to every PWM channel, timer
+        # frequency and output bit; writes that would not change it are skipped.
+        self.shadow_writes = False
+        self.writes_suppressed = 0
+        self._invalidate_shadow()
+        # software resets so far, for helpers that keep chip state of their own
+        self.resets = 0
+        self._version = None
+        self._options = None
+        # set to a RetryPolicy to retry failed transactions
+        self.retry_policy = None
+        # held across each register transaction when set; see fork()
+        self.transaction_lock = None
+        if reset:
+            self.sw_reset()
+        else:
+            self.attach()
 
     def sw_reset(self):
         """Trigger a software reset of the SeeSaw chip"""
         self.write8(_STATUS_BASE, _STATUS_SWRST, 0xFF)
-        time.sleep(.500)
+        self.resets += 1
+        self._gpio_cache_stamp = None
+        self._invalidate_shadow()
+        time.sleep(_RESET_SETTLE)
+        self.attach()
+
+    def attach(self):
+        """Check the hardware ID and pick the pinmap without resetting the chip.
 
-        chip_id = self.read8(_STATUS_BASE, _STATUS_HW_ID)
+        The hardware ID is polled with backoff for up to ``_RESET_TIMEOUT``
+        seconds, so this also waits out a chip that is still booting."""
+        chip_id = self._poll_hw_id()
 
         if chip_id != _HW_ID_CODE:
             raise RuntimeError("Seesaw hardware ID returned (0x{:x}) is not "
                                "correct! Expected 0x{:x}. Please check your wiring."
                                .format(chip_id, _HW_ID_CODE))
 
-        pid = self.get_version() >> 16
-        if pid == _CRICKIT_PID:
-            from adafruit_seesaw.crickit import Crickit_Pinmap
-            self.pin_mapping = Crickit_Pinmap
-	elif pid == _ROBOHATMM1_PID:
-	    from adafruit_seesaw.robohat import MM1_Pinmap
-	    self.pin_mapping = MM1_Pinmap
+        version = self.get_version()
+        pid = version >> 16
+        key = (pid, version)
+        capabilities = _capability_cache.get(key)
+        if capabilities is None:
+            capabilities = Capabilities(self.get_options())
+            _capability_cache[key] = capabilities
         else:
-            from adafruit_seesaw.samd09 import SAMD09_Pinmap
-            self.pin_mapping = SAMD09_Pinmap
+            self._options = capabilities.options
+        self.capabilities = capabilities
+
+        self.pin_mapping = pinmap_for(pid)
+        if self._calibrated_version is None and getattr(self.i2c_device,
+                                                        "calibrate_on_attach", False):
+            # the transport only pays off with the turnaround known
+            self.calibrate()
+
+    def _device_changed(self):
+        # what the transfer paths know about i2c_device; redone by whoever
+        # swaps it (e.g. BusManager.manage)
+        self._combined = hasattr(self.i2c_device, "write_then_readinto")
+        # transports that pipeline writes report a failure later unless flushed
+        self._pipelined = hasattr(self.i2c_device, "flush")
+
+    def fork(self):
+        """Another ``Seesaw`` on the same chip with its own buffers, for a
+        second thread such as a telemetry sampler.
+
+        The two share the calibration, pinmap and retry policy, and a
+        ``transaction_lock`` that keeps a register select from one thread out
+        of the middle of a read from the other."""
+        lock = self.transaction_lock
+        if lock is None and threading is not None:
+            lock = self.transaction_lock = threading.RLock()
+        if lock is None:
+            twin = Seesaw(self.i2c_device, drdy=self._drdy, reset=False)
+        else:
+            with lock:
+                twin = Seesaw(self.i2c_device, drdy=self._drdy, reset=False)
+        twin.transaction_lock = lock
+        twin.drdy_timeout = self.drdy_timeout
+        twin.retry_policy = self.retry_policy
+        twin.pin_mapping = self.pin_mapping
+        twin._delays = self._delays  # pylint: disable=protected-access
+        twin._calibrated_version = self._calibrated_version  # pylint: disable=protected-access
+        return twin
+
+    def _poll_hw_id(self):
+        deadline = time.monotonic() + _RESET_TIMEOUT
+        interval = _RESET_POLL
+        while time.monotonic() < deadline:
+            try:
+                if self.read8(_STATUS_BASE, _STATUS_HW_ID) == _HW_ID_CODE:
+                    return _HW_ID_CODE
+            except OSError:
+                # the chip NACKs while it boots
+                pass
+            time.sleep(interval)
+            interval = min(interval * 2, _RESET_POLL_MAX)
+        return self.read8(_STATUS_BASE, _STATUS_HW_ID)
+
+    @property
+    def pin_mapping(self):
+        """The pinmap class in use. Assigning one compiles its lookup tables."""
+        return self._pin_mapping
+
+    @pin_mapping.setter
+    def pin_mapping(self, pinmap):
+        self._pin_mapping = pinmap
+        self._pins = pin_table(pinmap)
 
     def get_options(self):
-        buf = bytearray(4)
-        self.read(_STATUS_BASE, _STATUS_OPTIONS, buf)
-        ret = struct.unpack(">I", buf)[0]
-        return ret
+        # the firmware cannot change under us, so read this once per session
+        if self._options is None:
+            self.read(_STATUS_BASE, _STATUS_OPTIONS, self._rx4)
+            self._options = struct.unpack_from(">I", self._rxbuf)[0]
+        return self._options
 
     def get_version(self):
-        buf = bytearray(4)
-        self.read(_STATUS_BASE, _STATUS_VERSION, buf)
-        ret = struct.unpack(">I", buf)[0]
-        return ret
+        if self._version is None:
+            self.read(_STATUS_BASE, _STATUS_VERSION, self._rx4)
+            self._version = struct.unpack_from(">I", self._rxbuf)[0]
+        return self._version
 
     def pin_mode(self, pin, mode):
         if pin >= 32:
@@ -194,17 +530,59 @@ class Seesaw:
         return self.digital_read_bulk((1 << pin)) != 0
 
     def digital_read_bulk(self, pins):
-        buf = bytearray(4)
-        self.read(_GPIO_BASE, _GPIO_BULK, buf)
-        buf[0] = buf[0] & 0x3F
-        ret = struct.unpack(">I", buf)[0]
-        return ret & pins
+        if self.gpio_cache_window is not None:
+            return struct.unpack_from(">I", self._gpio_ports())[0] & 0x3FFFFFFF & pins
+        self.read(_GPIO_BASE, _GPIO_BULK, self._rx4)
+        return struct.unpack_from(">I", self._rxbuf)[0] & 0x3FFFFFFF & pins
 
     def digital_read_bulk_b(self, pins):
-        buf = bytearray(8)
-        self.read(_GPIO_BASE, _GPIO_BULK, buf)
-        ret = struct.unpack(">I", buf[4:])[0]
-        return ret & pins
+        if self.gpio_cache_window is not None:
+            return struct.unpack_from(">I", self._gpio_ports(), 4)[0] & pins
+        self.read(_GPIO_BASE, _GPIO_BULK, self._rx8)
+        return struct.unpack_from(">I", self._rxbuf, 4)[0] & pins
+
+    def invalidate_gpio_cache(self):
+        """Force the next digital read to fetch ports A and B from the chip.
+
+        Set ``gpio_cache_window`` to a number of seconds to serve all digital
+        reads within that window from one 8-byte ``GPIO_BULK`` fetch. Calling
+        this once per drive loop tick (with a window at least as long as the
+        tick) gives one fetch per tick."""
+        self._gpio_cache_stamp = None
+
+    def _invalidate_shadow(self):
+        self._pwm_shadow = {}
+        self._freq_shadow = {}
+        self._out_high = 0
+        self._out_low = 0
+
+    def _output_unchanged(self, mask, value):
+        if not self.shadow_writes:
+            return False
+        known = self._out_high if value else self._out_low
+        if mask & ~known:
+            return False
+        self.writes_suppressed += 1
+        return True
+
+    def _output_written(self, mask, value):
+        if value:
+            self._out_high |= mask
+            self._out_low &= ~mask
+        else:
+            self._out_low |= mask
+            self._out_high &= ~mask
+
+    def _gpio_ports(self):
+        now = time.monotonic()
+        stamp = self._gpio_cache_stamp
+        if stamp is not None and now - stamp <= self.gpio_cache_window:
+            self.gpio_cache_hits += 1
+        else:
+            self.read(_GPIO_BASE, _GPIO_BULK, self._gpio_cache)
+            self._gpio_cache_stamp = now
+            self.gpio_cache_misses += 1
+        return self._gpio_cache
 
 
     def set_GPIO_interrupts(self, pins, enabled):
@@ -214,38 +592,73 @@ class Seesaw:
         else:
             self.write(_GPIO_BASE, _GPIO_INTENCLR, cmd)
 
+    def set_GPIO_interrupts_b(self, pins, enabled):
+        cmd = bytearray(8)
+        cmd[4:] = struct.pack(">I", pins)
+        if enabled:
+            self.write(_GPIO_BASE, _GPIO_INTENSET, cmd)
+        else:
+            self.write(_GPIO_BASE, _GPIO_INTENCLR, cmd)
+
+    def get_GPIO_interrupt_flags(self):
+        """Pins (A in the low 32 bits, B in the high 32) that changed since the last
+        call. Reading the flags clears them on the chip."""
+        self.read(_GPIO_BASE, _GPIO_INTFLAG, self._rx8)
+        port_a, port_b = struct.unpack_from(">II", self._rxbuf)
+        return port_a | (port_b << 32)
+
     def analog_read(self, pin):
-        buf = bytearray(2)
-        if pin not in self.pin_mapping.analog_pins:
+        self.capabilities.require(_ADC_BASE)
+        reg = self._pins.adc_reg.get(pin)
+        if reg is None:
             raise ValueError("Invalid ADC pin")
 
-        self.read(_ADC_BASE, _ADC_CHANNEL_OFFSET + self.pin_mapping.analog_pins.index(pin), buf)
-        ret = struct.unpack(">H", buf)[0]
-        time.sleep(.001)
+        self.read(_ADC_BASE, reg, self._rx2)
+        ret = struct.unpack_from(">H", self._rxbuf)[0]
+        self._pause(_ADC_BASE)
         return ret
 
-    def touch_read(self, pin):
-        buf = bytearray(2)
+    def analog_read_all(self, out=None):
+        """Read every configured ADC channel, in ``pin_mapping.analog_pins`` order.
+
+        The channels are read in one contiguous transaction when the firmware
+        supports it. Pass a preallocated ``array('H')`` as ``out`` to avoid
+        allocating a new one on every call."""
+        self.capabilities.require(_ADC_BASE)
+        count = len(self.pin_mapping.analog_pins)
+        if out is None:
+            out = array("H", bytes(2 * count))
+        if self.capabilities.adc_bulk:
+            self.read(_ADC_BASE, _ADC_CHANNEL_OFFSET, memoryview(self._adcbuf)[:2 * count])
+            for i in range(count):
+                out[i] = (self._adcbuf[2 * i] << 8) | self._adcbuf[2 * i + 1]
+        else:
+            for i in range(count):
+                self.read(_ADC_BASE, _ADC_CHANNEL_OFFSET + i, self._rx2)
+                out[i] = struct.unpack_from(">H", self._rxbuf)[0]
+        self._pause(_ADC_BASE)
+        return out
 
-        if pin not in self.pin_mapping.touch_pins:
+    def touch_read(self, pin):
+        self.capabilities.require(_TOUCH_BASE)
+        reg = self._pins.touch_reg.get(pin)
+        if reg is None:
             raise ValueError("Invalid touch pin")
 
-        self.read(_TOUCH_BASE, _TOUCH_CHANNEL_OFFSET + self.pin_mapping.touch_pins.index(pin), buf)
-        ret = struct.unpack(">H", buf)[0]
-        return ret
+        self.read(_TOUCH_BASE, reg, self._rx2)
+        return struct.unpack_from(">H", self._rxbuf)[0]
 
     def moisture_read(self):
-        buf = bytearray(2)
-
-        self.read(_TOUCH_BASE, _TOUCH_CHANNEL_OFFSET, buf, .005)
-        ret = struct.unpack(">H", buf)[0]
+        self.capabilities.require(_TOUCH_BASE)
+        self.read(_TOUCH_BASE, _TOUCH_CHANNEL_OFFSET, self._rx2, .005)
+        ret = struct.unpack_from(">H", self._rxbuf)[0]
         time.sleep(.001)
 
         # retry if reading was bad
         count = 0
         while ret > 4095:
-            self.read(_TOUCH_BASE, _TOUCH_CHANNEL_OFFSET, buf, .005)
-            ret = struct.unpack(">H", buf)[0]
+            self.read(_TOUCH_BASE, _TOUCH_CHANNEL_OFFSET, self._rx2, .005)
+            ret = struct.unpack_from(">H", self._rxbuf)[0]
             time.sleep(.001)
             count += 1
             if count > 3:
@@ -254,6 +667,9 @@ class Seesaw:
         return ret
 
     def pin_mode_bulk(self, pins, mode):
+        self._gpio_cache_stamp = None
+        self._out_high &= ~pins
+        self._out_low &= ~pins
         cmd = struct.pack(">I", pins)
         if mode == self.OUTPUT:
             self.write(_GPIO_BASE, _GPIO_DIRSET_BULK, cmd)
@@ -274,6 +690,9 @@ class Seesaw:
             raise ValueError("Invalid pin mode")
 
     def pin_mode_bulk_b(self, pins, mode):
+        self._gpio_cache_stamp = None
+        self._out_high &= ~(pins << 32)
+        self._out_low &= ~(pins << 32)
         cmd = bytearray(8)
         cmd[4:] = struct.pack(">I", pins)
         if mode == self.OUTPUT:
@@ -295,48 +714,144 @@ class Seesaw:
             raise ValueError("Invalid pin mode")
 
     def digital_write_bulk(self, pins, value):
-        cmd = struct.pack(">I", pins)
-        if value:
-            self.write(_GPIO_BASE, _GPIO_BULK_SET, cmd)
-        else:
-            self.write(_GPIO_BASE, _GPIO_BULK_CLR, cmd)
-
+        if self._output_unchanged(pins, value):
+            return
+        self._gpio_cache_stamp = None
+        struct.pack_into(">BBI", self._txbuf, 0, _GPIO_BASE,
+                         _GPIO_BULK_SET if value else _GPIO_BULK_CLR, pins)
+        self._write_txbuf(6)
+        self._output_written(pins, value)
 
     def digital_write_bulk_b(self, pins, value):
-        cmd = bytearray(8)
-        cmd[4:] = struct.pack(">I", pins)
-        if value:
-            self.write(_GPIO_BASE, _GPIO_BULK_SET, cmd)
-        else:
-            self.write(_GPIO_BASE, _GPIO_BULK_CLR, cmd)
+        if self._output_unchanged(pins << 32, value):
+            return
+        self._gpio_cache_stamp = None
+        struct.pack_into(">BBII", self._txbuf, 0, _GPIO_BASE,
+                         _GPIO_BULK_SET if value else _GPIO_BULK_CLR, 0, pins)
+        self._write_txbuf(10)
+        self._output_written(pins << 32, value)
 
     def analog_write(self, pin, value):
-        pin_found = False
-        if self.pin_mapping.pwm_width == 16:
-            if pin in self.pin_mapping.pwm_pins:
-                pin_found = True
-                cmd = bytearray([self.pin_mapping.pwm_pins.index(pin), (value >> 8), value & 0xFF])
+        self.capabilities.require(_TIMER_BASE)
+        prefix = self._pins.pwm_prefix.get(pin)
+        if prefix is None:
+            raise ValueError("Invalid PWM pin")
+        index = prefix[2]
+        if self.shadow_writes and self._pwm_shadow.get(index) == value:
+            self.writes_suppressed += 1
+            return
+        self._txbuf[0:3] = prefix
+        if self._pins.pwm_width == 16:
+            self._txbuf[3] = value >> 8
+            self._txbuf[4] = value & 0xFF
+            self._write_txbuf(5)
         else:
-            if pin in self.pin_mapping.pwm_pins:
-                pin_found = True
-                cmd = bytearray([self.pin_mapping.pwm_pins.index(pin), value])
-
-        if pin_found is False:
+            self._txbuf[3] = value
+            self._write_txbuf(4)
+        self._pwm_shadow[index] = value
+        self._pause(_TIMER_BASE)
+
+    def pwm_frame(self, pin):
+        """A ``bytearray`` holding the 16-bit PWM command for ``pin``.
+
+        Put the duty cycle, big endian, in bytes 3 and 4 and send it with
+        ``write_pwm_frame``; a caller that keeps the frame skips the pin lookup
+        and packing on every write."""
+        self.capabilities.require(_TIMER_BASE)
+        prefix = self._pins.pwm_prefix.get(pin)
+        if prefix is None:
             raise ValueError("Invalid PWM pin")
-        self.write(_TIMER_BASE, _TIMER_PWM, cmd)
-        time.sleep(.001)
+        if self._pins.pwm_width != 16:
+            raise RuntimeError("PWM frames need 16-bit PWM firmware")
+        return bytearray(prefix) + bytearray(2)
+
+    def write_pwm_frame(self, frame):
+        """Send a frame from ``pwm_frame`` as it is.
+
+        Like ``analog_write`` it pauses afterwards for the chip to settle, for
+        the turnaround ``calibrate`` measured for the timer bank (1 ms if not
+        calibrated)."""
+        index = frame[2]
+        value = (frame[3] << 8) | frame[4]
+        if self.shadow_writes and self._pwm_shadow.get(index) == value:
+            self.writes_suppressed += 1
+            return
+        policy = self.retry_policy
+        if policy is not None and policy.retries_write(_TIMER_BASE, _TIMER_PWM):
+            policy.run(self._send_frame, frame)
+        else:
+            self._send_frame(frame)
+        self._pwm_shadow[index] = value
+        self._pause(_TIMER_BASE)
+
+    def _send_frame(self, frame):
+        lock = self.transaction_lock
+        if lock is not None:
+            with lock:
+                self._transfer_write(frame, len(frame))
+        else:
+            self._transfer_write(frame, len(frame))
+
+    def analog_write_bulk(self, values):
+        """Set the duty cycle of several PWM pins in one bus transaction.
+
+        ``values`` is a sequence of ``(pin, value)`` pairs (or a dict of them).
+        All channels land on the same PWM frame when the firmware supports the
+        bulk timer command; otherwise each pin is written in turn."""
+        if isinstance(values, dict):
+            values = values.items()
+        self.capabilities.require(_TIMER_BASE)
+        if not self.capabilities.pwm_bulk or self._pins.pwm_width != 16:
+            for pin, value in values:
+                self.analog_write(pin, value)
+            return
+        pwm_index = self._pins.pwm_index
+        count = 0
+        offset = 3
+        shadow = self._pwm_shadow
+        for pin, value in values:
+            index = pwm_index.get(pin)
+            if index is None:
+                raise ValueError("Invalid PWM pin")
+            if self.shadow_writes and shadow.get(index) == value:
+                self.writes_suppressed += 1
+                continue
+            if offset + 3 > _TX_BUF_SIZE:
+                raise ValueError("Too many PWM channels")
+            struct.pack_into(">BH", self._txbuf, offset, index, value)
+            offset += 3
+            count += 1
+        if not count:
+            return
+        struct.pack_into(">BBB", self._txbuf, 0, _TIMER_BASE, _TIMER_PWM_BULK, count)
+        self._write_txbuf(offset)
+        for i in range(count):
+            index, value = struct.unpack_from(">BH", self._txbuf, 3 + 3 * i)
+            shadow[index] = value
+        self._pause(_TIMER_BASE)
 
     def get_temp(self):
-        buf = bytearray(4)
-        self.read(_STATUS_BASE, _STATUS_TEMP, buf)
-        buf[0] = buf[0] & 0x3F
-        ret = struct.unpack(">I", buf)[0]
+        self.read(_STATUS_BASE, _STATUS_TEMP, self._rx4)
+        ret = struct.unpack_from(">I", self._rxbuf)[0] & 0x3FFFFFFF
         return 0.00001525878 * ret
 
     def set_pwm_freq(self, pin, freq):
-        if pin in self.pin_mapping.pwm_pins:
-            cmd = bytearray([self.pin_mapping.pwm_pins.index(pin), (freq >> 8), freq & 0xFF])
-            self.write(_TIMER_BASE, _TIMER_FREQ, cmd)
+        self.capabilities.require(_TIMER_BASE)
+        index = self._pins.pwm_index.get(pin)
+        if index is not None:
+            # the frequency belongs to the timer, which several channels share
+            timer = self._pins.pwm_timer[pin]
+            key = index if timer is None else timer
+            if self.shadow_writes and self._freq_shadow.get(key) == freq:
+                self.writes_suppressed += 1
+                return
+            struct.pack_into(">BBBH", self._txbuf, 0, _TIMER_BASE, _TIMER_FREQ, index, freq)
+            self._write_txbuf(5)
+            if timer is None:
+                # no timer layout for this pinmap: any other channel may have
+                # just changed with this one
+                self._freq_shadow.clear()
+            self._freq_shadow[key] = freq
         else:
             raise ValueError("Invalid PWM pin")
 
@@ -357,52 +872,243 @@ class Seesaw:
     #     return self.read8(SEESAW_SERCOM0_BASE + sercom, SEESAW_SERCOM_DATA)
 
     def set_i2c_addr(self, addr):
+        self.capabilities.require(_EEPROM_BASE)
         self.eeprom_write8(_EEPROM_I2C_ADDR, addr)
         time.sleep(.250)
         self.i2c_device.device_address = addr
         self.sw_reset()
 
     def get_i2c_addr(self):
+        self.capabilities.require(_EEPROM_BASE)
         return self.read8(_EEPROM_BASE, _EEPROM_I2C_ADDR)
 
     def eeprom_write8(self, addr, val):
         self.eeprom_write(addr, bytearray([val]))
 
     def eeprom_write(self, addr, buf):
+        self.capabilities.require(_EEPROM_BASE)
         self.write(_EEPROM_BASE, addr, buf)
 
     def eeprom_read8(self, addr):
+        self.capabilities.require(_EEPROM_BASE)
         return self.read8(_EEPROM_BASE, addr)
 
     def uart_set_baud(self, baud):
+        self.capabilities.require(_SERCOM0_BASE)
         cmd = struct.pack(">I", baud)
         self.write(_SERCOM0_BASE, _SERCOM_BAUD, cmd)
 
     def write8(self, reg_base, reg, value):
-        self.write(reg_base, reg, bytearray([value]))
+        struct.pack_into(">BBB", self._txbuf, 0, reg_base, reg, value)
+        self._write_txbuf(3)
 
     def read8(self, reg_base, reg):
-        ret = bytearray(1)
-        self.read(reg_base, reg, ret)
-        return ret[0]
+        self.read(reg_base, reg, self._rx1)
+        return self._rxbuf[0]
+
+    def calibrate(self, trials=8, margin=1.5, force=False):
+        """Measure the shortest safe write-to-read turnaround for each register base
+        and use it in place of the fixed 1 ms sleeps.
+
+        Results are cached per firmware version, so only the first board (or a
+        ``force`` run) pays for the measurement. Returns the delays in use, in
+        seconds, keyed by register base."""
+        version = self.get_version()
+        delays = _turnaround_cache.get(version)
+        if delays is None or force:
+            self._delays = {}
+            delays = {}
+            for reg_base, reg, size, exact in self._calibration_probes():
+                delays[reg_base] = self._measure_turnaround(reg_base, reg, size, exact,
+                                                            trials, margin)
+            _turnaround_cache[version] = delays
+        self._delays = dict(delays)
+        self._calibrated_version = version
+        return self._delays
+
+    def _calibration_probes(self):
+        # (reg_base, reg, read size, reply must match a slow read exactly)
+        supports = self.capabilities.supports
+        probes = [(_STATUS_BASE, _STATUS_HW_ID, 1, True),
+                  (_GPIO_BASE, _GPIO_BULK, 8, True)]
+        if supports(_TIMER_BASE):
+            probes.append((_TIMER_BASE, _TIMER_STATUS, 1, True))
+        if self.pin_mapping.analog_pins and supports(_ADC_BASE):
+            probes.append((_ADC_BASE, _ADC_CHANNEL_OFFSET, 2, False))
+        if self.pin_mapping.touch_pins and supports(_TOUCH_BASE):
+            probes.append((_TOUCH_BASE, _TOUCH_CHANNEL_OFFSET, 2, False))
+        return probes
+
+    def _measure_turnaround(self, reg_base, reg, size, exact, trials, margin):
+        reference = bytearray(size)
+        self._read(reg_base, reg, reference, _DEFAULT_DELAY)
+        buf = bytearray(size)
+        safe = _DEFAULT_DELAY
+        for delay in _TURNAROUND_STEPS:
+            for _ in range(trials):
+                self._read(reg_base, reg, buf, delay)
+                if _corrupt(buf) or (exact and buf != reference):
+                    return min(_DEFAULT_DELAY, safe * margin)
+            safe = delay
+        return min(_DEFAULT_DELAY, safe * margin)
+
+    def reset_drdy_stats(self):
+        """Clear the data-ready wait statistics.
+
+        ``drdy_histogram[n]`` counts waits shorter than 2**n microseconds
+        (``[0]`` is a line that was already high); ``drdy_waits``,
+        ``drdy_wait_total`` and ``drdy_wait_max`` summarize them in seconds."""
+        self.drdy_histogram = [0] * _DRDY_BUCKETS
+        self.drdy_waits = 0
+        self.drdy_wait_total = 0.0
+        self.drdy_wait_max = 0.0
+
+    def _wait_drdy(self):
+        # spin briefly, then yield the CPU, then back off with growing sleeps
+        drdy = self._drdy
+        self.drdy_waits += 1
+        if drdy.value:
+            self.drdy_histogram[0] += 1
+            return
+        start = time.monotonic()
+        tries = 0
+        interval = _DRDY_MIN_SLEEP
+        while not drdy.value:
+            tries += 1
+            if tries <= _DRDY_SPINS:
+                continue
+            waited = time.monotonic() - start
+            if waited > self.drdy_timeout:
+                raise DataReadyTimeout("Seesaw data ready line stayed low for {:.3f}s"
+                                       .format(waited))
+            if tries <= _DRDY_SPINS + _DRDY_YIELDS:
+                time.sleep(0)
+            else:
+                time.sleep(interval)
+                interval = min(_DRDY_MAX_SLEEP, interval * 2)
+        waited = time.monotonic() - start
+        self.drdy_histogram[_bucket(int(waited * 1000000))] += 1
+        self.drdy_wait_total += waited
+        if waited > self.drdy_wait_max:
+            self.drdy_wait_max = waited
+
+    def _pause(self, reg_base):
+        delay = self._delays.get(reg_base, _DEFAULT_DELAY)
+        if delay:
+            time.sleep(delay)
 
-    def read(self, reg_base, reg, buf, delay=.001):
-        self.write(reg_base, reg)
-        if self._drdy is not None:
-            while self._drdy.value is False:
-                pass
+    def read(self, reg_base, reg, buf, delay=None):
+        if self.retry_policy is not None:
+            self.retry_policy.run(self._read_checked, reg_base, reg, buf, delay)
         else:
-            time.sleep(delay)
-        with self.i2c_device as i2c:
-            i2c.readinto(buf)
+            self._read_checked(reg_base, reg, buf, delay)
+
+    def _read_checked(self, reg_base, reg, buf, delay):
+        if delay is not None:
+            self._read(reg_base, reg, buf, delay)
+            return
+        delay = self._delays.get(reg_base, _DEFAULT_DELAY)
+        self._read(reg_base, reg, buf, delay)
+        if delay < _DEFAULT_DELAY and _corrupt(buf):
+            # the calibrated turnaround was too tight for this board; fall back
+            # to the conservative delay and forget the calibration for this base
+            self.turnaround_fallbacks += 1
+            self._delays[reg_base] = _DEFAULT_DELAY
+            cached = _turnaround_cache.get(self._calibrated_version)
+            if cached is not None:
+                cached[reg_base] = _DEFAULT_DELAY
+            self._read(reg_base, reg, buf, _DEFAULT_DELAY)
+
+    def _read(self, reg_base, reg, buf, delay):
+        lock = self.transaction_lock
+        if lock is not None:
+            with lock:
+                self._transfer_read(reg_base, reg, buf, delay)
+        else:
+            self._transfer_read(reg_base, reg, buf, delay)
+
+    def _transfer_read(self, reg_base, reg, buf, delay):
+        try:
+            if self._drdy is None and not delay and self._combined:
+                # no turnaround needed: register select and read in one transaction
+                with self.i2c_device as i2c:
+                    self._txbuf[0] = reg_base
+                    self._txbuf[1] = reg
+                    i2c.write_then_readinto(self._txbuf, buf, out_end=2)
+                return
+            self._write(reg_base, reg)
+            if self._drdy is not None:
+                self._wait_drdy()
+            elif delay:
+                time.sleep(delay)
+            with self.i2c_device as i2c:
+                i2c.readinto(buf)
+        except OSError:
+            self._invalidate_shadow()
+            raise
 
     def write(self, reg_base, reg, buf=None):
-        full_buffer = bytearray([reg_base, reg])
+        policy = self.retry_policy
+        if policy is not None and policy.retries_write(reg_base, reg):
+            policy.run(self._write, reg_base, reg, buf)
+        else:
+            self._write(reg_base, reg, buf)
+
+    def _write(self, reg_base, reg, buf=None):
+        end = 2
         if buf is not None:
+            end += len(buf)
+        if end > _TX_BUF_SIZE:
+            full_buffer = bytearray([reg_base, reg])
             full_buffer += buf
+        else:
+            full_buffer = self._txbuf
+            full_buffer[0] = reg_base
+            full_buffer[1] = reg
+            if buf is not None:
+                full_buffer[2:end] = buf
+
+        lock = self.transaction_lock
+        if lock is not None:
+            with lock:
+                self._transfer_write(full_buffer, end)
+        else:
+            self._transfer_write(full_buffer, end)
+
+    def _send_txbuf(self, end):
+        lock = self.transaction_lock
+        if lock is not None:
+            with lock:
+                self._transfer_write(self._txbuf, end)
+        else:
+            self._transfer_write(self._txbuf, end)
 
+    def _transfer_write(self, buf, end):
         if self._drdy is not None:
-            while self._drdy.value is False:
-                pass
-        with self.i2c_device as i2c:
-            i2c.write(full_buffer)
+            self._wait_drdy()
+        try:
+            with self.i2c_device as i2c:
+                i2c.write(buf, end=end)
+                if self._pipelined and self._confirm(buf[0], buf[1]):
+                    i2c.flush()
+        except OSError:
+            # the chip may or may not have seen it; stop trusting the shadow
+            self._invalidate_shadow()
+            raise
+
+    def _confirm(self, reg_base, reg):
+        # the shadow and the retry policy need to know a write failed from the
+        # write itself, not from some later call
+        if self.shadow_writes:
+            return True
+        policy = self.retry_policy
+        return policy is not None and policy.retries_write(reg_base, reg)
+
+    def _write_txbuf(self, end):
+        # send a command already packed into the transmit buffer
+        policy = self.retry_policy
+        if policy is not None and policy.retries_write(self._txbuf[0], self._txbuf[1]):
+            policy.run(self._send_txbuf, end)
+        else:
+            self._send_txbuf(end)
+
@@ -0,0 +1,308 @@
+# The MIT License (MIT)
+#
+# Copyright (c) 2019 Robotics Masters
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+"""
+`adafruit_seesaw.serial_transport`
+====================================================
+
+Seesaw register access over the Robo HAT MM1's UART (SERCOM5, 115200 baud, to
+the Pi header) or its USB CDC port, instead of I2C.
+
+Every register access is one frame::
+
+    0xA5  type  seq  reg_base  reg  len  payload[len]  crc8
+
+``crc8`` (polynomial 0x07) covers everything from ``type`` up to the end of
+the payload.  The host sends ``WRITE`` frames (``len`` payload bytes) and
+``READ`` frames (no payload, ``len`` is the number of bytes wanted).  The
+board answers each with the same ``seq``, ``reg_base`` and ``reg``: an
+``ACK`` for a write, ``DATA`` carrying ``len`` bytes for a read, or ``NAK``
+with one errno byte.
+
+Writes do not wait for their ``ACK``: up to ``window`` requests may be in
+flight, so a burst of servo updates streams out back to back.  A read waits
+only for its own reply; acknowledgements that arrive first are collected on
+the way.  ``read_many`` pipelines several reads.
+
+A ``NAK`` for a write that was not waited for can only be raised later, by
+the next call or ``flush``; the ``WriteRejected`` error names the register
+it belongs to.  ``Seesaw`` calls ``flush`` after any write whose outcome it
+relies on (with ``shadow_writes`` on, or when its retry policy covers the
+register), so those failures come back from the write itself.
+
+``SerialTransport`` has the ``I2CDevice`` interface, so ``Seesaw`` uses it
+unchanged and, since the board answers only once the data is ready, without
+its turnaround sleeps:
+
+.. code-block:: python
+
+  from adafruit_seesaw.seesaw import Seesaw
+  from adafruit_seesaw.serial_transport import SerialTransport
+
+  ss = Seesaw(SerialTransport("/dev/ttyS0"), reset=False)
+
+.. note:: This needs firmware that speaks the protocol above on its UART or
+  USB CDC port; ``adafruit_seesaw.simulator.PtySeesawServer`` provides it on a
+  pseudo-terminal for testing.
+
+* Author(s): Robotics Masters
+"""
+
+import time
+
+__version__ = "0.0.0-auto.0"
+__repo__ = "https://github.com/robotics-masters/mm1-hat-seesaw.git"
+
+SYNC = 0xA5
+WRITE = 0x01
+READ = 0x02
+ACK = 0x81
+DATA = 0x82
+NAK = 0x8F
+
+_HEADER = 6
+_ETIMEDOUT = 110
+_EIO = 5
+
+
+class WriteRejected(OSError):
+    """The board answered a write with ``NAK``. ``reg_base`` and ``reg`` name
+    the register written, which may be an earlier call's."""
+
+    def __init__(self, errno, reg_base, reg):
+        super().__init__(errno, "Seesaw rejected a write to 0x{:02x}/0x{:02x}"
+                         .format(reg_base, reg))
+        self.reg_base = reg_base
+        self.reg = reg
+
+
+def crc8(data, crc=0):
+    """CRC-8, polynomial 0x07, as used by the frames."""
+    for byte in data:
+        crc ^= byte
+        for _ in range(8):
+            if crc & 0x80:
+                crc = ((crc << 1) ^ 0x07) & 0xFF
+            else:
+                crc = (crc << 1) & 0xFF
+    return crc
+
+
+def encode(frame_type, seq, reg_base, reg, length, payload=b""):
+    """One frame as bytes."""
+    body = bytes((frame_type, seq, reg_base, reg, length)) + bytes(payload)
+    return bytes((SYNC,)) + body + bytes((crc8(body),))
+
+
+class FrameDecoder:
+    """Split a byte stream into ``(type, seq, reg_base, reg, length, payload)``
+    frames, resynchronising on the next ``SYNC`` after a bad checksum."""
+
+    def __init__(self):
+        self._buf = bytearray()
+        self.crc_errors = 0
+
+    def feed(self, data):
+        """Add received bytes; returns the list of complete frames."""
+        self._buf += data
+        frames = []
+        buf = self._buf
+        while True:
+            start = buf.find(SYNC)
+            if start < 0:
+                buf[:] = b""
+                break
+            if start:
+                buf[:start] = b""
+            if len(buf) < _HEADER:
+                break
+            frame_type, seq, reg_base, reg, length = buf[1:_HEADER]
+            size = _HEADER + 1
+            if frame_type in (WRITE, DATA, NAK):
+                size += length if frame_type != NAK else 1
+            if len(buf) < size:
+                break
+            if crc8(memoryview(buf)[1:size - 1]) != buf[size - 1]:
+                self.crc_errors += 1
+                buf[:1] = b""
+                continue
+            frames.append((frame_type, seq, reg_base, reg, length,
+                           bytes(buf[_HEADER:size - 1])))
+            buf[:size] = b""
+        return frames
+
+
+class SerialTransport:
+    """Seesaw register access over a serial link, with the ``I2CDevice``
+    interface.
+
+       :param str port: Serial device, e.g. ``/dev/ttyS0`` or ``/dev/ttyACM0``
+       :param int baudrate: Line rate; the MM1 UART runs at 115200
+       :param stream: An open object with ``read(n)`` and ``write(data)`` to use
+           instead of opening ``port`` with pyserial
+       :param float timeout: Seconds to wait for a reply before raising ``OSError``
+       :param int window: Requests allowed in flight before a write waits"""
+    # pylint: disable=too-many-instance-attributes
+
+    # the board replies when the data is ready, so no sleep between select and read
+    needs_turnaround = False
+
+    def __init__(self, port=None, baudrate=115200, *, stream=None, timeout=.1, window=8,
+                 device_address=0x49):
+        # pylint: disable=too-many-arguments
+        if stream is None:
+            import serial  # pylint: disable=import-outside-toplevel
+            stream = serial.Serial(port, baudrate, timeout=0.01)
+        self._stream = stream
+        self.timeout = timeout
+        self.window = window
+        # kept for Seesaw, which recognises a ready-made device by this attribute
+        self.device_address = device_address
+        self._decoder = FrameDecoder()
+        self._seq = 0
+        self._outstanding = {}
+        self._replies = {}
+        self._selected = (0, 0)
+        self._error = None
+        self.frames_sent = 0
+        self.frames_received = 0
+        self.write_errors = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+    def close(self):
+        """Wait for outstanding writes, then close the port."""
+        try:
+            self.flush()
+        finally:
+            self._stream.close()
+
+    @property
+    def crc_errors(self):
+        """Frames from the board dropped for a bad checksum."""
+        return self._decoder.crc_errors
+
+    @property
+    def in_flight(self):
+        """Requests sent and not yet answered."""
+        return len(self._outstanding)
+
+    def _send(self, frame_type, reg_base, reg, length, payload=b""):
+        while len(self._outstanding) >= self.window:
+            self._receive()
+        seq = self._seq
+        self._seq = (seq + 1) & 0xFF
+        self._outstanding[seq] = (frame_type, reg_base, reg)
+        self._stream.write(encode(frame_type, seq, reg_base, reg, length, payload))
+        self.frames_sent += 1
+        return seq
+
+    def _receive(self):
+        # block until at least one frame arrives, then file it
+        deadline = time.monotonic() + self.timeout
+        while True:
+            # whatever is buffered, or block (up to the port timeout) for one byte
+            data = self._stream.read(getattr(self._stream, "in_waiting", 0) or 1)
+            frames = self._decoder.feed(data) if data else ()
+            if frames:
+                break
+            if time.monotonic() > deadline:
+                self._outstanding.clear()
+                raise OSError(_ETIMEDOUT, "No reply from the seesaw")
+        for frame_type, seq, _, _, _, payload in frames:
+            self.frames_received += 1
+            sent = self._outstanding.pop(seq, None)
+            if sent is None:
+                continue
+            if sent[0] == READ:
+                self._replies[seq] = (frame_type, payload)
+            elif frame_type == NAK:
+                self.write_errors += 1
+                if self._error is None:
+                    # the first rejection is the one worth reporting
+                    self._error = WriteRejected(payload[0] if payload else _EIO,
+                                                sent[1], sent[2])
+
+    def _result(self, seq):
+        while seq not in self._replies:
+            if seq not in self._outstanding:
+                raise OSError(_EIO, "Reply lost")
+            self._receive()
+        frame_type, payload = self._replies.pop(seq)
+        self._raise_deferred()
+        if frame_type == NAK:
+            raise OSError(payload[0] if payload else _EIO, "Seesaw rejected a read")
+        return payload
+
+    def _raise_deferred(self):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def flush(self):
+        """Wait until every write sent so far is acknowledged."""
+        while self._outstanding:
+            self._receive()
+        self._raise_deferred()
+
+    def write(self, buf, *, start=0, end=None):
+        """Send a register write without waiting for it to be acknowledged."""
+        if end is None:
+            end = len(buf)
+        self._raise_deferred()
+        self._selected = (buf[start], buf[start + 1])
+        payload = bytes(buf[start + 2:end])
+        self._send(WRITE, buf[start], buf[start + 1], len(payload), payload)
+
+    def readinto(self, buf, *, start=0, end=None):
+        """Read from the register selected by the last write."""
+        if end is None:
+            end = len(buf)
+        reg_base, reg = self._selected
+        seq = self._send(READ, reg_base, reg, end - start)
+        buf[start:end] = self._result(seq)
+
+    def write_then_readinto(self, out_buffer, in_buffer, *, out_start=0, out_end=None,
+                            in_start=0, in_end=None):
+        """Read a register with one ``READ`` frame."""
+        # pylint: disable=too-many-arguments
+        if out_end is None:
+            out_end = len(out_buffer)
+        if in_end is None:
+            in_end = len(in_buffer)
+        if out_end - out_start > 2:
+            self.write(out_buffer, start=out_start, end=out_end)
+        reg_base, reg = out_buffer[out_start], out_buffer[out_start + 1]
+        self._selected = (reg_base, reg)
+        seq = self._send(READ, reg_base, reg, in_end - in_start)
+        in_buffer[in_start:in_end] = self._result(seq)
+
+    def read_many(self, requests):
+        """Read several registers with all requests in flight at once.
+
+        ``requests`` is a sequence of ``(reg_base, reg, length)``; returns the
+        replies as bytes, in the same order."""
+        seqs = [self._send(READ, reg_base, reg, length) for reg_base, reg, length in requests]
+        return [self._result(seq) for seq in seqs]
@@ -0,0 +1,620 @@
+# The MIT License (MIT)
+#
+# Copyright (c) 2019 Robotics Masters
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+"""
+`adafruit_seesaw.simulator`
+====================================================
+
+An in-process stand-in for a seesaw chip on an I2C bus.  ``SeesawSimulator``
+imitates ``busio.I2C`` closely enough for ``Seesaw`` (and anything built on
+top of it, such as ``rm_robohat.RoboHatMM1``) to drive it unmodified, so the
+driver can be exercised and benchmarked on a plain Linux box.
+
+.. code-block:: python
+
+  from adafruit_seesaw.seesaw import Seesaw
+  from adafruit_seesaw.simulator import SeesawSimulator
+
+  bus = SeesawSimulator(latency=0.0002, byte_time=0.00009)
+  ss = Seesaw(bus)
+  print(ss.get_temp(), bus.transactions, bus.bus_time)
+
+By default the simulated chip is a Robo HAT MM1 (product code 9998) using the
+pin tables from ``MM1_Pinmap`` and ``firmware/robohatmm1/board_config.h``.
+
+* Author(s): Robotics Masters
+"""
+
+# pylint: disable=missing-docstring,invalid-name,too-many-instance-attributes
+
+import ctypes
+import struct
+import threading
+import time
+
+try:
+    from micropython import const
+except ImportError:
+    def const(x):
+        return x
+from adafruit_seesaw.robohat import MM1_Pinmap
+
+__version__ = "0.0.0-auto.0"
+__repo__ = "https://github.com/robotics-masters/mm1-hat-seesaw.git"
+
+_STATUS_BASE = const(0x00)
+_GPIO_BASE = const(0x01)
+_SERCOM0_BASE = const(0x02)
+_TIMER_BASE = const(0x08)
+_ADC_BASE = const(0x09)
+_NEOPIXEL_BASE = const(0x0E)
+_TOUCH_BASE = const(0x0F)
+_RC_BASE = const(0x1C)
+
+_GPIO_DIRSET_BULK = const(0x02)
+_GPIO_DIRCLR_BULK = const(0x03)
+_GPIO_BULK = const(0x04)
+_GPIO_BULK_SET = const(0x05)
+_GPIO_BULK_CLR = const(0x06)
+_GPIO_BULK_TOGGLE = const(0x07)
+_GPIO_INTENSET = const(0x08)
+_GPIO_INTENCLR = const(0x09)
+_GPIO_INTFLAG = const(0x0A)
+_GPIO_PULLENSET = const(0x0B)
+_GPIO_PULLENCLR = const(0x0C)
+
+_STATUS_HW_ID = const(0x01)
+_STATUS_VERSION = const(0x02)
+_STATUS_OPTIONS = const(0x03)
+_STATUS_TEMP = const(0x04)
+_STATUS_SWRST = const(0x7F)
+
+_TIMER_PWM = const(0x01)
+_TIMER_FREQ = const(0x02)
+_TIMER_PWM_BULK = const(0x03)
+
+_ADC_CHANNEL_OFFSET = const(0x07)
+_TOUCH_CHANNEL_OFFSET = const(0x10)
+
+_RC_ENABLE = const(0x01)
+_RC_PULSES = const(0x02)
+_RC_CHANNELS = const(4)
+
+_NEOPIXEL_PIN = const(0x01)
+_NEOPIXEL_SPEED = const(0x02)
+_NEOPIXEL_BUF_LENGTH = const(0x03)
+_NEOPIXEL_BUF = const(0x04)
+_NEOPIXEL_SHOW = const(0x05)
+
+_OPTION_TIMER_PWM_BULK = const(31)
+_OPTION_ADC_BULK = const(30)
+
+_HW_ID_CODE = const(0x55)
+_ROBOHATMM1_PID = const(9998)
+
+# Modules compiled into the mm1_hat firmware (see board_config.h): status,
+# GPIO, SERCOM5 (USB UART bridge), timer, ADC, NeoPixel and touch.  EEPROM is
+# disabled with CONFIG_NO_EEPROM and the interrupt pin with CONFIG_INTERRUPT 0.
+MM1_OPTIONS = ((1 << _STATUS_BASE) | (1 << _GPIO_BASE) | (1 << (_SERCOM0_BASE + 5)) |
+               (1 << _TIMER_BASE) | (1 << _ADC_BASE) | (1 << _NEOPIXEL_BASE) |
+               (1 << _TOUCH_BASE))
+
+# CONFIG_NEOPIXEL_BUF_MAX
+NEOPIXEL_BUF_MAX = const(1024)
+
+
+class SeesawSimulator:
+    """Imitate a ``busio.I2C`` bus with a single seesaw chip attached.
+
+       :param int addr: I2C address the simulated chip answers on
+       :param int product_id: Product code reported in ``STATUS_VERSION``
+       :param int date_code: Firmware date code reported in ``STATUS_VERSION``
+       :param int options: Module bitmask reported in ``STATUS_OPTIONS``
+       :param pinmap: Pin table class (``analog_pins``, ``pwm_pins``, ``touch_pins``)
+       :param float latency: Fixed cost of every bus transaction, in seconds
+       :param float byte_time: Cost of every byte moved on the bus, in seconds
+       :param dict turnaround: Time the firmware needs to prepare a reply, in
+           seconds, keyed by register base
+       :param stretch: Extra clock-stretch time for a read, either a number of
+           seconds or a callable ``stretch(reg_base, reg)`` returning one
+       :param bool flow_control: When true (``CONFIG_I2C_SLAVE_FLOW_CONTROL``)
+           a read that arrives before the turnaround has elapsed is stretched
+           until the reply is ready. When false it returns ``0xFF`` bytes.
+       :param float boot_time: Time the chip NACKs after a software reset
+       :param bool pwm_bulk: Advertise and handle the bulk PWM timer command
+       :param bool adc_bulk: Advertise contiguous multi-channel ADC reads
+       :param bool rc_capture: Advertise and handle the RC pulse capture bank
+           (see ``adafruit_seesaw.rcin``)
+       :param sleep: Function used to spend simulated bus time"""
+
+    def __init__(self, addr=0x49, *, product_id=_ROBOHATMM1_PID, date_code=0x2019,
+                 options=MM1_OPTIONS, pinmap=MM1_Pinmap, latency=0.0, byte_time=0.0,
+                 turnaround=None, stretch=None, flow_control=True, boot_time=0.0,
+                 pwm_bulk=False, adc_bulk=False, rc_capture=False, sleep=time.sleep):
+        self.addr = addr
+        self.product_id = product_id
+        self.date_code = date_code
+        self.options = options
+        if pwm_bulk:
+            self.options |= 1 << _OPTION_TIMER_PWM_BULK
+        if adc_bulk:
+            self.options |= 1 << _OPTION_ADC_BULK
+        if rc_capture:
+            self.options |= 1 << _RC_BASE
+        self.pinmap = pinmap
+        self.latency = latency
+        self.byte_time = byte_time
+        self.turnaround = dict(turnaround) if turnaround else {}
+        self.stretch = stretch
+        self.flow_control = flow_control
+        self.boot_time = boot_time
+        self._sleep = sleep
+        self._lock = threading.Lock()
+
+        # values the "outside world" presents to the chip
+        self.temperature = 25.0
+        self.input_levels = 0
+        self.adc_values = [0] * len(pinmap.analog_pins)
+        self.touch_values = [0] * len(pinmap.touch_pins)
+        self.rc_pulses = [0] * _RC_CHANNELS
+        self._rc_stamps = [None] * _RC_CHANNELS
+
+        self.reset_stats()
+        self._power_on()
+
+    def _power_on(self):
+        self.direction = 0
+        self.output_latch = 0
+        self.pull_enable = 0
+        self.int_enable = 0
+        self.int_flags = 0
+        self.pwm_duty = [0] * len(self.pinmap.pwm_pins)
+        self.pwm_freq = [0] * len(self.pinmap.pwm_pins)
+        self.neopixel_pin = None
+        self.neopixel_speed = 1
+        self.neopixel_buf = bytearray(0)
+        self.pixels = bytes(0)
+        self.shows = 0
+        self.rc_enabled = 0
+        self._pending = None
+        self._busy_until = 0.0
+
+    def reset_stats(self):
+        """Clear the transaction counters."""
+        self.transactions = 0
+        self.bytes_written = 0
+        self.bytes_read = 0
+        self.bus_time = 0.0
+        self.corrupt_reads = 0
+        self.resets = 0
+
+    # --- busio.I2C interface -------------------------------------------------
+
+    def try_lock(self):
+        return self._lock.acquire(False)
+
+    def unlock(self):
+        self._lock.release()
+
+    def scan(self):
+        return [self.addr]
+
+    def deinit(self):
+        pass
+
+    def writeto(self, address, buffer, *, start=0, end=None, stop=True):
+        # pylint: disable=unused-argument
+        if end is None:
+            end = len(buffer)
+        self._check_address(address)
+        self._transaction(end - start)
+        self._handle_write(bytes(buffer[start:end]))
+
+    def readfrom_into(self, address, buffer, *, start=0, end=None):
+        if end is None:
+            end = len(buffer)
+        self._check_address(address)
+        self._transaction(end - start)
+        buffer[start:end] = self._handle_read(end - start)
+
+    def writeto_then_readfrom(self, address, buffer_out, buffer_in, *, out_start=0,
+                              out_end=None, in_start=0, in_end=None, stop=False):
+        # pylint: disable=unused-argument
+        if out_end is None:
+            out_end = len(buffer_out)
+        if in_end is None:
+            in_end = len(buffer_in)
+        self._check_address(address)
+        # a repeated start costs one transaction for both halves
+        self._transaction(out_end - out_start + in_end - in_start)
+        self._handle_write(bytes(buffer_out[out_start:out_end]))
+        buffer_in[in_start:in_end] = self._handle_read(in_end - in_start)
+
+    # --- helpers for setting up the outside world ---------------------------
+
+    def set_input(self, pin, value):
+        """Drive an input pin from outside the chip, latching its interrupt flag."""
+        mask = 1 << pin
+        old = self.input_levels & mask
+        if value:
+            self.input_levels |= mask
+        else:
+            self.input_levels &= ~mask
+        if old != (self.input_levels & mask) and self.int_enable & mask:
+            self.int_flags |= mask
+
+    def set_rc_pulse(self, channel, width):
+        """Record a pulse of ``width`` microseconds on RC channel ``channel``
+        (0 for RCH1) ending now, as a receiver would send every frame."""
+        self.rc_pulses[channel] = width
+        self._rc_stamps[channel] = time.monotonic()
+
+    def pin_level(self, pin):
+        """The level the chip would report for ``pin``."""
+        return bool(self._levels() & (1 << pin))
+
+    # --- bus model ----------------------------------------------------------
+
+    def _check_address(self, address):
+        if address != self.addr or time.monotonic() < self._busy_until:
+            raise OSError(19, "No such device")
+
+    def _transaction(self, nbytes):
+        self.transactions += 1
+        cost = self.latency + self.byte_time * (nbytes + 1)
+        self._spend(cost)
+
+    def _spend(self, seconds):
+        if seconds > 0:
+            self.bus_time += seconds
+            self._sleep(seconds)
+
+    def _stretch_for(self, reg_base, reg):
+        if self.stretch is None:
+            return 0.0
+        if callable(self.stretch):
+            return self.stretch(reg_base, reg)
+        return self.stretch
+
+    def _handle_write(self, data):
+        self.bytes_written += len(data)
+        if len(data) < 2:
+            # an address probe
+            return
+        reg_base, reg = data[0], data[1]
+        payload = data[2:]
+        self._pending = (reg_base, reg, time.monotonic())
+        handler = self._write_handlers.get(reg_base)
+        if handler is not None:
+            handler(self, reg, payload)
+
+    def _handle_read(self, n):
+        self.bytes_read += n
+        if self._pending is None:
+            return bytes([0xFF] * n)
+        reg_base, reg, written = self._pending
+        self._pending = None
+        ready = written + self.turnaround.get(reg_base, 0.0)
+        early = ready - time.monotonic()
+        if early > 0:
+            if not self.flow_control:
+                self.corrupt_reads += 1
+                return bytes([0xFF] * n)
+            self._spend(early)
+        self._spend(self._stretch_for(reg_base, reg))
+        handler = self._read_handlers.get(reg_base)
+        if handler is None:
+            return bytes(n)
+        reply = handler(self, reg, n)
+        if len(reply) < n:
+            reply = reply + bytes(n - len(reply))
+        return reply[:n]
+
+    # --- register banks -----------------------------------------------------
+
+    def _status_write(self, reg, payload):
+        # pylint: disable=unused-argument
+        if reg == _STATUS_SWRST:
+            self.resets += 1
+            self._power_on()
+            self._busy_until = time.monotonic() + self.boot_time
+
+    @staticmethod
+    def _mask(payload):
+        if len(payload) >= 8:
+            return struct.unpack(">I", payload[0:4])[0] | (struct.unpack(">I", payload[4:8])[0] << 32)
+        return struct.unpack(">I", payload[0:4])[0]
+
+    def _levels(self):
+        outputs = self.output_latch & self.direction
+        pulled = self.pull_enable & self.output_latch & ~self.direction
+        driven = self.input_levels & ~self.direction
+        return outputs | driven | pulled
+
+    def _status_read(self, reg, n):
+        # pylint: disable=unused-argument
+        if reg == _STATUS_HW_ID:
+            return bytes([_HW_ID_CODE])
+        if reg == _STATUS_VERSION:
+            return struct.pack(">I", (self.product_id << 16) | (self.date_code & 0xFFFF))
+        if reg == _STATUS_OPTIONS:
+            return struct.pack(">I", self.options)
+        if reg == _STATUS_TEMP:
+            return struct.pack(">I", int(self.temperature * 65536) & 0x3FFFFFFF)
+        return bytes(0)
+
+    def _gpio_write(self, reg, payload):
+        if len(payload) < 4:
+            return
+        mask = self._mask(payload)
+        if reg == _GPIO_DIRSET_BULK:
+            self.direction |= mask
+        elif reg == _GPIO_DIRCLR_BULK:
+            self.direction &= ~mask
+        elif reg == _GPIO_BULK_SET:
+            self.output_latch |= mask
+        elif reg == _GPIO_BULK_CLR:
+            self.output_latch &= ~mask
+        elif reg == _GPIO_BULK_TOGGLE:
+            self.output_latch ^= mask
+        elif reg == _GPIO_INTENSET:
+            self.int_enable |= mask
+        elif reg == _GPIO_INTENCLR:
+            self.int_enable &= ~mask
+        elif reg == _GPIO_PULLENSET:
+            self.pull_enable |= mask
+        elif reg == _GPIO_PULLENCLR:
+            self.pull_enable &= ~mask
+
+    def _gpio_read(self, reg, n):
+        # pylint: disable=unused-argument
+        if reg == _GPIO_BULK:
+            levels = self._levels()
+            return struct.pack(">II", levels & 0xFFFFFFFF, levels >> 32)
+        if reg == _GPIO_INTFLAG:
+            flags = self.int_flags
+            self.int_flags = 0
+            return struct.pack(">II", flags & 0xFFFFFFFF, flags >> 32)
+        return bytes(0)
+
+    def _timer_write(self, reg, payload):
+        if reg == _TIMER_PWM_BULK and self.options & (1 << _OPTION_TIMER_PWM_BULK):
+            for i in range(min(payload[0], (len(payload) - 1) // 3) if payload else 0):
+                index = payload[1 + 3 * i]
+                if index < len(self.pwm_duty):
+                    self.pwm_duty[index] = (payload[2 + 3 * i] << 8) | payload[3 + 3 * i]
+            return
+        if len(payload) < 2 or payload[0] >= len(self.pwm_duty):
+            return
+        if len(payload) == 2:
+            # 8-bit PWM (SAMD09 firmware)
+            value = payload[1]
+        else:
+            value = (payload[1] << 8) | payload[2]
+        if reg == _TIMER_PWM:
+            self.pwm_duty[payload[0]] = value
+        elif reg == _TIMER_FREQ:
+            timers = getattr(self.pinmap, "pwm_timers", None)
+            if timers is None:
+                self.pwm_freq[payload[0]] = value
+                return
+            # the frequency is the timer's: every channel on it follows
+            for i, timer in enumerate(timers):
+                if timer == timers[payload[0]]:
+                    self.pwm_freq[i] = value
+
+    def _adc_read(self, reg, n):
+        index = reg - _ADC_CHANNEL_OFFSET
+        if not 0 <= index < len(self.adc_values):
+            return bytes(0)
+        if self.options & (1 << _OPTION_ADC_BULK):
+            count = min((n + 1) // 2, len(self.adc_values) - index)
+        else:
+            count = 1
+        return b"".join(struct.pack(">H", value & 0xFFFF)
+                        for value in self.adc_values[index:index + count])
+
+    def _touch_read(self, reg, n):
+        # pylint: disable=unused-argument
+        index = reg - _TOUCH_CHANNEL_OFFSET
+        if 0 <= index < len(self.touch_values):
+            return struct.pack(">H", self.touch_values[index] & 0xFFFF)
+        return bytes(0)
+
+    def _neopixel_write(self, reg, payload):
+        if reg == _NEOPIXEL_SHOW:
+            self.pixels = bytes(self.neopixel_buf)
+            self.shows += 1
+        elif not payload:
+            return
+        elif reg == _NEOPIXEL_PIN:
+            self.neopixel_pin = payload[0]
+        elif reg == _NEOPIXEL_SPEED:
+            self.neopixel_speed = payload[0]
+        elif reg == _NEOPIXEL_BUF_LENGTH:
+            length = min(struct.unpack(">H", payload[0:2])[0], NEOPIXEL_BUF_MAX)
+            self.neopixel_buf = bytearray(length)
+        elif reg == _NEOPIXEL_BUF and len(payload) >= 2:
+            offset = struct.unpack(">H", payload[0:2])[0]
+            data = payload[2:2 + max(0, len(self.neopixel_buf) - offset)]
+            self.neopixel_buf[offset:offset + len(data)] = data
+
+    def _rc_write(self, reg, payload):
+        if reg == _RC_ENABLE and payload and self.options & (1 << _RC_BASE):
+            self.rc_enabled = payload[0] & ((1 << _RC_CHANNELS) - 1)
+
+    def _rc_read(self, reg, n):
+        # pylint: disable=unused-argument
+        if reg != _RC_PULSES or not self.options & (1 << _RC_BASE):
+            return bytes(0)
+        now = time.monotonic()
+        reply = bytearray()
+        for channel in range(_RC_CHANNELS):
+            stamp = self._rc_stamps[channel]
+            if not self.rc_enabled & (1 << channel) or stamp is None:
+                reply += struct.pack(">HH", 0, 0xFFFF)
+            else:
+                age = min(0xFFFF, int((now - stamp) * 1000))
+                reply += struct.pack(">HH", self.rc_pulses[channel], age)
+        return bytes(reply)
+
+    _write_handlers = {
+        _STATUS_BASE: _status_write,
+        _GPIO_BASE: _gpio_write,
+        _TIMER_BASE: _timer_write,
+        _NEOPIXEL_BASE: _neopixel_write,
+        _RC_BASE: _rc_write,
+    }
+
+    _read_handlers = {
+        _STATUS_BASE: _status_read,
+        _GPIO_BASE: _gpio_read,
+        _ADC_BASE: _adc_read,
+        _TOUCH_BASE: _touch_read,
+        _RC_BASE: _rc_read,
+    }
+
+
+class I2CDevFile:
+    """A stand-in for an open ``/dev/i2c-N`` file descriptor.
+
+    Pass ``ioctl`` to ``adafruit_seesaw.linux_i2c.LinuxI2CDevice`` and each
+    ``I2C_RDWR`` request is decoded and played against the simulators, which
+    are matched by address.
+
+    .. code-block:: python
+
+      from adafruit_seesaw.linux_i2c import LinuxI2CDevice
+
+      dev = I2CDevFile(SeesawSimulator())
+      ss = Seesaw(LinuxI2CDevice(1, 0x49, fd=dev.fd, ioctl=dev.ioctl))
+    """
+
+    I2C_RDWR = 0x0707
+    I2C_M_RD = 0x0001
+
+    def __init__(self, *simulators):
+        self._simulators = {sim.addr: sim for sim in simulators}
+        self.fd = -1
+        self.ioctls = 0
+
+    def ioctl(self, fd, request, arg):
+        # pylint: disable=unused-argument
+        if request != self.I2C_RDWR:
+            raise OSError(25, "Inappropriate ioctl for device")
+        self.ioctls += 1
+        msgs = [arg.msgs[i] for i in range(arg.nmsgs)]
+        sim = self._simulators.get(msgs[0].addr)
+        if sim is None:
+            raise OSError(121, "Remote I/O error")
+        if len(msgs) == 2 and not msgs[0].flags & self.I2C_M_RD and \
+                msgs[1].flags & self.I2C_M_RD:
+            out = bytearray(ctypes.string_at(msgs[0].buf, msgs[0].len))
+            data = bytearray(msgs[1].len)
+            sim.writeto_then_readfrom(msgs[0].addr, out, data)
+            ctypes.memmove(msgs[1].buf, bytes(data), len(data))
+            return 0
+        for msg in msgs:
+            if msg.flags & self.I2C_M_RD:
+                data = bytearray(msg.len)
+                sim.readfrom_into(msg.addr, data)
+                ctypes.memmove(msg.buf, bytes(data), len(data))
+            else:
+                sim.writeto(msg.addr, ctypes.string_at(msg.buf, msg.len))
+        return 0
+
+
+class PtySeesawServer:
+    """Serve the ``adafruit_seesaw.serial_transport`` protocol for a simulator
+    on a pseudo-terminal, the way MM1 firmware would on its UART.
+
+    .. code-block:: python
+
+      from adafruit_seesaw.serial_transport import SerialTransport
+
+      server = PtySeesawServer(SeesawSimulator())
+      ss = Seesaw(SerialTransport(server.port))
+      ...
+      server.close()
+
+    ``corrupt_every`` flips a bit in every n-th reply, to exercise the
+    checksum handling."""
+
+    def __init__(self, simulator, *, corrupt_every=0):
+        # pylint: disable=import-outside-toplevel
+        import os
+        import tty
+        from adafruit_seesaw import serial_transport
+        self._os = os
+        self._proto = serial_transport
+        self.simulator = simulator
+        self.corrupt_every = corrupt_every
+        self.requests = 0
+        self._master, self._slave = os.openpty()
+        tty.setraw(self._slave)
+        self.port = os.ttyname(self._slave)
+        self._running = True
+        self._thread = threading.Thread(target=self._serve)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def close(self):
+        self._running = False
+        self._thread.join()
+        self._os.close(self._master)
+        self._os.close(self._slave)
+
+    def _serve(self):
+        import select  # pylint: disable=import-outside-toplevel
+        decoder = self._proto.FrameDecoder()
+        while self._running:
+            ready, _, _ = select.select([self._master], [], [], 0.05)
+            if not ready:
+                continue
+            try:
+                data = self._os.read(self._master, 256)
+            except OSError:
+                return
+            for frame in decoder.feed(data):
+                reply = self._handle(*frame)
+                if reply is not None:
+                    self._os.write(self._master, reply)
+
+    def _handle(self, frame_type, seq, reg_base, reg, length, payload):
+        # pylint: disable=too-many-arguments
+        proto = self._proto
+        sim = self.simulator
+        self.requests += 1
+        try:
+            if frame_type == proto.WRITE:
+                sim.writeto(sim.addr, bytes((reg_base, reg)) + payload)
+                reply = proto.encode(proto.ACK, seq, reg_base, reg, 0)
+            elif frame_type == proto.READ:
+                data = bytearray(length)
+                sim.writeto_then_readfrom(sim.addr, bytes((reg_base, reg)), data)
+                reply = proto.encode(proto.DATA, seq, reg_base, reg, length, data)
+            else:
+                return None
+        except OSError as e:
+            reply = proto.encode(proto.NAK, seq, reg_base, reg, 1, bytes((e.errno or 5,)))
+        if self.corrupt_every and self.requests % self.corrupt_every == 0:
+            reply = reply[:-1] + bytes((reply[-1] ^ 0x01,))
+        return reply
@@ -0,0 +1,293 @@
+# The MIT License (MIT)
+#
+# Copyright (c) 2019 Robotics Masters
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+"""
+`adafruit_seesaw.telemetry`
+====================================================
+
+Background sampling of the slow-changing seesaw registers: temperature, the
+ADC channels and the touch channels.  The drive loop reads the latest values
+from memory instead of waiting on the bus.
+
+.. code-block:: python
+
+  from rm_robohat import robohat
+  from adafruit_seesaw.telemetry import TelemetrySampler
+
+  telemetry = TelemetrySampler(robohat.seesaw, interval=0.5, budget=0.02)
+  ...
+  temp = telemetry.temperature
+  volts = telemetry.analog(34) * 3.3 / 1023
+
+Each step reads one source: the temperature, all ADC channels at once (see
+``Seesaw.analog_read_all``), or one touch channel.  After a step that kept the
+bus busy for ``t`` seconds the sampler idles ``t * (1 - budget) / budget``, so
+it never takes more than ``budget`` of the bus.  When every source has been
+read, the set goes into a ring buffer preallocated for ``depth`` samples and
+the next round starts no sooner than ``interval`` after the last.  The first
+round runs back to back, so the values are real within a few milliseconds of
+starting rather than after the first paced round.
+
+With ``threading`` the sampler runs on its own thread through
+``Seesaw.fork``, which keeps its register reads from interleaving with the
+drive loop's.  It takes idle slots: a step starts when no transaction holds
+the shared ``transaction_lock`` and otherwise is retried a millisecond later.
+Only a step deferred for 10 ms waits its turn on the lock, so a drive loop
+that keeps the bus saturated is still sampled.  Either way the drive loop
+waits at most for the one step in progress.  Without threading (or with ``thread=False``) call
+``step`` from the main loop; it returns the seconds until it next wants to
+run.
+
+* Author(s): Robotics Masters
+"""
+
+import time
+from array import array
+
+try:
+    import threading
+except ImportError:
+    threading = None
+
+__version__ = "0.0.0-auto.0"
+__repo__ = "https://github.com/robotics-masters/mm1-hat-seesaw.git"
+
+_ADC_BASE = 0x09
+_TOUCH_BASE = 0x0F
+
+_TEMP = -2
+_ADC = -1
+
+# seconds before trying again when the bus was busy, and before giving up on
+# an idle slot and queueing for the lock
+_IDLE_RETRY = 0.001
+_MAX_DEFER = 0.01
+
+
+class TelemetrySampler:
+    """Poll temperature, ADC and touch on ``seesaw`` within a bus-time budget.
+
+       :param ~adafruit_seesaw.seesaw.Seesaw seesaw: The device to sample
+       :param float interval: Shortest time between complete samples, seconds
+       :param float budget: Largest fraction of the time the sampler may keep
+           the bus busy
+       :param int depth: Complete samples kept in the ring buffer
+       :param bool thread: Sample on a background thread, started here. False
+           leaves the sampler to ``step``
+
+    Values are raw register readings: ADC counts and touch counts, and degrees
+    Celsius for the temperature."""
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(self, seesaw, *, interval=0.5, budget=0.02, depth=32, thread=True):
+        # pylint: disable=too-many-arguments
+        if not 0 < budget <= 1:
+            raise ValueError("budget must be in (0, 1]")
+        self.interval = interval
+        self.budget = budget
+        self.depth = depth
+        self.version = seesaw.get_version()
+
+        pinmap = seesaw.pin_mapping
+        capabilities = seesaw.capabilities
+        self.analog_pins = tuple(pinmap.analog_pins) \
+            if capabilities.supports(_ADC_BASE) else ()
+        self.touch_pins = tuple(pinmap.touch_pins) \
+            if capabilities.supports(_TOUCH_BASE) else ()
+        self._adc_index = {pin: i for i, pin in enumerate(self.analog_pins)}
+        self._touch_index = {pin: i for i, pin in enumerate(self.touch_pins)}
+        self._sources = [_TEMP]
+        if self.analog_pins:
+            self._sources.append(_ADC)
+        self._sources.extend(range(len(self.touch_pins)))
+
+        # latest readings, updated source by source
+        self._temperature = 0.0
+        self._adc = array("H", bytes(2 * len(self.analog_pins)))
+        self._touch = array("H", bytes(2 * len(self.touch_pins)))
+        self._stamp = None
+
+        # ring of complete samples, allocated once
+        self._times = array("f", bytes(4 * depth))
+        self._temps = array("f", bytes(4 * depth))
+        self._adc_ring = array("H", bytes(2 * depth * len(self.analog_pins)))
+        self._touch_ring = array("H", bytes(2 * depth * len(self.touch_pins)))
+        self._head = 0
+        self.count = 0
+
+        self._next = 0
+        self._round_start = None
+        self._deferred = None
+        self._epoch = time.monotonic()
+        self.reset_stats()
+
+        self._thread = None
+        self._stop = None
+        if thread and threading is not None:
+            self._seesaw = seesaw.fork()
+            self.start()
+        else:
+            self._seesaw = seesaw
+
+    def reset_stats(self):
+        """Zero the sampling counters."""
+        self._since = time.monotonic()
+        self.steps = 0
+        self.skips = 0
+        self.rounds = 0
+        self.bus_time = 0.0
+        self.errors = 0
+        self.last_error = None
+
+    @property
+    def utilization(self):
+        """Fraction of the time since ``reset_stats`` spent sampling."""
+        elapsed = time.monotonic() - self._since
+        return self.bus_time / elapsed if elapsed > 0 else 0.0
+
+    def start(self):
+        """Start the background thread, if it is not running."""
+        if self._thread is not None:
+            return
+        if threading is None:
+            raise RuntimeError("threading is not available; call step() instead")
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="seesaw-telemetry",
+                                        daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background thread and wait for its current step."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._stop.wait(self.step())
+
+    def step(self):
+        """Read the next source; returns the seconds to wait before the next call."""
+        lock = self._seesaw.transaction_lock
+        acquire = getattr(lock, "acquire", None)
+        if acquire is not None and not acquire(False):
+            # someone else is mid-transaction; wait for an idle slot
+            now = time.monotonic()
+            if self._deferred is None:
+                self._deferred = now
+            if now - self._deferred < _MAX_DEFER:
+                self.skips += 1
+                return _IDLE_RETRY
+            acquire()
+        self._deferred = None
+        try:
+            source = self._sources[self._next]
+            if self._next == 0:
+                self._round_start = time.monotonic()
+            start = time.monotonic()
+            try:
+                self._sample(source)
+            except (OSError, RuntimeError) as err:
+                # telemetry must not take down whoever drives the sampler
+                self.errors += 1
+                self.last_error = err
+            now = time.monotonic()
+        finally:
+            if acquire is not None:
+                lock.release()
+        elapsed = now - start
+        self.bus_time += elapsed
+        self.steps += 1
+        wait = elapsed * (1 - self.budget) / self.budget
+        if not self.count:
+            wait = 0
+
+        self._next += 1
+        if self._next == len(self._sources):
+            self._next = 0
+            self._push(now)
+            wait = max(wait, self._round_start + self.interval - now)
+        return wait
+
+    def _sample(self, source):
+        seesaw = self._seesaw
+        if source == _TEMP:
+            self._temperature = seesaw.get_temp()
+        elif source == _ADC:
+            seesaw.analog_read_all(self._adc)
+        else:
+            self._touch[source] = seesaw.touch_read(self.touch_pins[source])
+
+    def _push(self, now):
+        head = self._head
+        self._times[head] = now - self._epoch
+        self._temps[head] = self._temperature
+        nadc = len(self._adc)
+        self._adc_ring[head * nadc:(head + 1) * nadc] = self._adc
+        ntouch = len(self._touch)
+        self._touch_ring[head * ntouch:(head + 1) * ntouch] = self._touch
+        self._head = (head + 1) % self.depth
+        self._stamp = now
+        self.rounds += 1
+        if self.count < self.depth:
+            self.count += 1
+
+    @property
+    def temperature(self):
+        """Latest chip temperature in degrees Celsius."""
+        return self._temperature
+
+    def analog(self, pin):
+        """Latest ADC reading of ``pin``."""
+        index = self._adc_index.get(pin)
+        if index is None:
+            raise ValueError("Invalid ADC pin")
+        return self._adc[index]
+
+    def touch(self, pin):
+        """Latest touch reading of ``pin``."""
+        index = self._touch_index.get(pin)
+        if index is None:
+            raise ValueError("Invalid touch pin")
+        return self._touch[index]
+
+    @property
+    def age(self):
+        """Seconds since the last complete sample, or None before the first."""
+        if self._stamp is None:
+            return None
+        return time.monotonic() - self._stamp
+
+    def sample(self, back=0):
+        """A complete sample from the ring as ``(time, temperature, adc, touch)``,
+        ``back`` samples before the newest. ``time`` is in seconds since the
+        sampler was created; ``adc`` and ``touch`` follow ``analog_pins`` and
+        ``touch_pins``."""
+        if not 0 <= back < self.count:
+            raise IndexError("No such sample")
+        slot = (self._head - 1 - back) % self.depth
+        nadc = len(self._adc)
+        ntouch = len(self._touch)
+        return (self._times[slot], self._temps[slot],
+                tuple(self._adc_ring[slot * nadc:(slot + 1) * nadc]),
+                tuple(self._touch_ring[slot * ntouch:(slot + 1) * ntouch]))
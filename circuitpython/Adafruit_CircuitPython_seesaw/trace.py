@@ -0,0 +1,239 @@
+# The MIT License (MIT)
+#
+# Copyright (c) 2019 Robotics Masters
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+"""
+`adafruit_seesaw.trace`
+====================================================
+
+Per-register transaction statistics for a running ``Seesaw``.
+
+``Tracer`` wraps the driver's ``read``, ``write``, PWM frame and transmit-buffer
+paths on one ``Seesaw`` instance and records, for every ``(reg_base, reg)``
+touched, the number of calls, bytes moved, wall time (including the turnaround
+and settle sleeps), time spent waiting on the data-ready line and errors raised.
+Latencies go into a fixed log2 histogram per register.  Nothing is patched on
+the class, so a ``Seesaw`` without a tracer attached runs the normal code with
+no extra cost.
+
+.. code-block:: python
+
+  from rm_robohat import robohat
+  from adafruit_seesaw.trace import Tracer
+
+  tracer = Tracer(robohat.seesaw)
+  ...
+  print(tracer.dump())
+  tracer.detach()
+
+* Author(s): Robotics Masters
+"""
+
+import time
+
+try:
+    from micropython import const
+except ImportError:
+    def const(x):
+        return x
+
+__version__ = "0.0.0-auto.0"
+__repo__ = "https://github.com/robotics-masters/mm1-hat-seesaw.git"
+
+_BUCKETS = const(17)
+
+_TRACED = ("read", "write", "_write_txbuf", "write_pwm_frame", "_pause", "_wait_drdy")
+
+
+def _bucket(microseconds):
+    n = 0
+    while microseconds and n < _BUCKETS - 1:
+        microseconds >>= 1
+        n += 1
+    return n
+
+
+class RegisterStats:
+    """Counters for one ``(reg_base, reg)``.
+
+    ``histogram[n]`` counts calls shorter than 2**n microseconds; times are in
+    seconds."""
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self):
+        self.count = 0
+        self.bytes = 0
+        self.time = 0.0
+        self.time_max = 0.0
+        self.drdy_time = 0.0
+        self.errors = 0
+        self.histogram = [0] * _BUCKETS
+
+    def _add(self, elapsed):
+        self.time += elapsed
+        if elapsed > self.time_max:
+            self.time_max = elapsed
+        self.histogram[_bucket(int(elapsed * 1000000))] += 1
+
+    def _extend(self, before, extra):
+        # fold a settle sleep into the call it follows
+        self.histogram[_bucket(int(before * 1000000))] -= 1
+        self._add(before + extra)
+        self.time -= before
+
+    def percentile(self, fraction):
+        """Upper bound, in seconds, of the histogram bucket holding ``fraction``
+        of the calls."""
+        target = fraction * self.count
+        seen = 0
+        for n, count in enumerate(self.histogram):
+            seen += count
+            if count and seen >= target:
+                return (1 << n) / 1000000
+        return 0.0
+
+
+class Tracer:
+    """Record per-register statistics for ``seesaw`` until ``detach`` is called.
+
+       :param ~adafruit_seesaw.seesaw.Seesaw seesaw: The device to trace
+
+    Calls made from more than one thread at a time are attributed loosely."""
+
+    def __init__(self, seesaw):
+        self._seesaw = seesaw
+        self.stats = {}
+        self._depth = 0
+        self._drdy = 0.0
+        self._last = None
+        self._last_elapsed = 0.0
+        self.attach()
+
+    def attach(self):
+        """Start tracing. Called by the constructor."""
+        self.detach()
+        seesaw = self._seesaw
+        bound = {name: getattr(seesaw, name) for name in _TRACED}
+        txbuf = seesaw._txbuf  # pylint: disable=protected-access
+
+        def read(reg_base, reg, buf, delay=None):
+            return self._call(reg_base, reg, 2 + len(buf), bound["read"],
+                              (reg_base, reg, buf, delay))
+
+        def write(reg_base, reg, buf=None):
+            return self._call(reg_base, reg, 2 + (len(buf) if buf is not None else 0),
+                              bound["write"], (reg_base, reg, buf))
+
+        def write_txbuf(end):
+            return self._call(txbuf[0], txbuf[1], end, bound["_write_txbuf"], (end,))
+
+        def write_pwm_frame(frame):
+            return self._call(frame[0], frame[1], len(frame), bound["write_pwm_frame"],
+                              (frame,))
+
+        def pause(reg_base):
+            start = time.monotonic()
+            bound["_pause"](reg_base)
+            if self._last is not None and not self._depth:
+                extra = time.monotonic() - start
+                self._last._extend(self._last_elapsed, extra)  # pylint: disable=protected-access
+                self._last_elapsed += extra
+
+        def wait_drdy():
+            start = time.monotonic()
+            try:
+                bound["_wait_drdy"]()
+            finally:
+                self._drdy += time.monotonic() - start
+
+        seesaw.read = read
+        seesaw.write = write
+        seesaw._write_txbuf = write_txbuf  # pylint: disable=protected-access
+        seesaw.write_pwm_frame = write_pwm_frame
+        seesaw._pause = pause  # pylint: disable=protected-access
+        seesaw._wait_drdy = wait_drdy  # pylint: disable=protected-access
+
+    def detach(self):
+        """Stop tracing and restore the plain driver methods. Stats are kept."""
+        for name in _TRACED:
+            self._seesaw.__dict__.pop(name, None)
+
+    def reset(self):
+        """Forget everything recorded so far."""
+        self.stats = {}
+        self._last = None
+
+    def _call(self, reg_base, reg, nbytes, method, args):
+        # pylint: disable=too-many-arguments
+        if self._depth:
+            # e.g. the register select inside a read
+            return method(*args)
+        key = (reg_base, reg)
+        stat = self.stats.get(key)
+        if stat is None:
+            stat = self.stats[key] = RegisterStats()
+        self._depth = 1
+        self._drdy = 0.0
+        start = time.monotonic()
+        try:
+            return method(*args)
+        except Exception:
+            stat.errors += 1
+            raise
+        finally:
+            elapsed = time.monotonic() - start
+            self._depth = 0
+            stat.count += 1
+            stat.bytes += nbytes
+            stat.drdy_time += self._drdy
+            stat._add(elapsed)  # pylint: disable=protected-access
+            self._last = stat
+            self._last_elapsed = elapsed
+
+    def export(self):
+        """The statistics as plain dicts keyed by ``"0xBB:0xRR"``, for logging
+        or ``json.dumps``."""
+        result = {}
+        for (reg_base, reg), stat in self.stats.items():
+            result["0x{:02x}:0x{:02x}".format(reg_base, reg)] = {
+                "count": stat.count,
+                "bytes": stat.bytes,
+                "time": stat.time,
+                "time_max": stat.time_max,
+                "drdy_time": stat.drdy_time,
+                "errors": stat.errors,
+                "histogram": list(stat.histogram),
+            }
+        return result
+
+    def dump(self):
+        """A table of the statistics, busiest register first."""
+        lines = ["{:<10}{:>8}{:>9}{:>10}{:>9}{:>9}{:>9}{:>9}{:>7}".format(
+            "register", "calls", "bytes", "total ms", "avg us", "p99 us", "max us",
+            "drdy ms", "errors")]
+        rows = sorted(self.stats.items(), key=lambda item: item[1].time, reverse=True)
+        for (reg_base, reg), stat in rows:
+            lines.append("0x{:02x}:0x{:02x}{:>8}{:>9}{:>10.2f}{:>9.0f}{:>9.0f}{:>9.0f}"
+                         "{:>9.2f}{:>7}".format(
+                             reg_base, reg, stat.count, stat.bytes, 1e3 * stat.time,
+                             1e6 * stat.time / stat.count if stat.count else 0,
+                             1e6 * stat.percentile(0.99), 1e6 * stat.time_max,
+                             1e3 * stat.drdy_time, stat.errors))
+        return "\n".join(lines)
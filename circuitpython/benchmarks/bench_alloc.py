@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Heap churn benchmark for the seesaw driver's transaction path.
+
+Every call is run against a bus that answers instantly and allocates nothing
+itself, so whatever shows up is allocated by the driver.  On CircuitPython
+and MicroPython the garbage collector is paused and ``gc.mem_alloc()`` gives
+the exact bytes allocated per call.  On CPython ``tracemalloc`` reports the
+peak transient bytes a single call needs; the ``(bus lock only)`` row is the
+interpreter's own cost of entering the ``I2CDevice`` context and is the floor
+for every other row.
+
+Usage::
+
+    python3 bench_alloc.py [--count N]
+"""
+
+import argparse
+import gc
+
+from adafruit_seesaw.seesaw import Seesaw
+from adafruit_seesaw.simulator import SeesawSimulator
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+_SERVO1 = 16
+_LED = 21
+_ADC_PIN = 34
+_TOUCH_PIN = 7
+
+
+class _NullBus:
+    """Accept every transfer without touching the heap."""
+    # pylint: disable=unused-argument,no-self-use,missing-docstring
+
+    def try_lock(self):
+        return True
+
+    def unlock(self):
+        pass
+
+    def writeto(self, address, buffer, *, start=0, end=None, stop=True):
+        pass
+
+    def readfrom_into(self, address, buffer, *, start=0, end=None):
+        pass
+
+    def writeto_then_readfrom(self, address, buffer_out, buffer_in, *, out_start=0,
+                              out_end=None, in_start=0, in_end=None, stop=False):
+        pass
+
+
+def _locked(ss):
+    with ss.i2c_device:
+        pass
+
+
+def _operations(ss):
+    return [
+        ("(bus lock only)", lambda: _locked(ss)),
+        ("digital_read_bulk", lambda: ss.digital_read_bulk(1 << _LED)),
+        ("digital_read_bulk_b", lambda: ss.digital_read_bulk_b(1)),
+        ("analog_read", lambda: ss.analog_read(_ADC_PIN)),
+        ("touch_read", lambda: ss.touch_read(_TOUCH_PIN)),
+        ("get_temp", ss.get_temp),
+        ("analog_write", lambda: ss.analog_write(_SERVO1, 4915)),
+        ("digital_write", lambda: ss.digital_write(_LED, True)),
+    ]
+
+
+def _measure(func, count):
+    func()
+    if hasattr(gc, "mem_alloc"):
+        gc.collect()
+        gc.disable()
+        before = gc.mem_alloc()
+        for _ in range(count):
+            func()
+        allocated = gc.mem_alloc() - before
+        gc.enable()
+        return allocated / count
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    return peak - current
+
+
+def run(count):
+    ss = Seesaw(SeesawSimulator())
+    ss.calibrate()
+    ss.i2c_device.i2c = _NullBus()
+    # keep the sleeps out of the measurement
+    for base in range(0x10):
+        ss._delays[base] = 0  # pylint: disable=protected-access
+
+    if not hasattr(gc, "mem_alloc"):
+        tracemalloc.start()
+        print("{:<22}{:>22}".format("operation", "transient bytes/call"))
+    else:
+        print("{:<22}{:>22}".format("operation", "bytes allocated/call"))
+    for name, func in _operations(ss):
+        print("{:<22}{:>22.1f}".format(name, _measure(func, count)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--count", type=int, default=1000)
+    args = parser.parse_args()
+    run(args.count)
+
+
+if __name__ == "__main__":
+    main()
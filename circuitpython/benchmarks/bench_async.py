@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Compare ``Seesaw`` and ``AsyncSeesaw`` polling several boards.
+
+Each board is a ``SeesawSimulator``.  The sync driver reads the boards one
+after another, sleeping through every register turnaround; the async driver
+awaits the turnarounds, so the reads of all boards overlap on one event loop.
+
+Usage::
+
+    python3 bench_async.py [--boards N] [--count N] [--latency SECONDS]
+"""
+
+import argparse
+import asyncio
+import time
+
+from adafruit_seesaw.seesaw import Seesaw
+from adafruit_seesaw.async_seesaw import AsyncSeesaw
+from adafruit_seesaw.simulator import SeesawSimulator
+
+_ADC_PIN = 34
+
+
+def _buses(boards, latency):
+    return [SeesawSimulator(addr=0x49 + i, latency=latency) for i in range(boards)]
+
+
+def run_sync(boards, count, latency):
+    devices = [Seesaw(bus, addr=bus.addr) for bus in _buses(boards, latency)]
+    start = time.monotonic()
+    for _ in range(count):
+        for ss in devices:
+            ss.get_temp()
+            ss.analog_read(_ADC_PIN)
+    return time.monotonic() - start
+
+
+async def _poll(ss, count):
+    for _ in range(count):
+        await ss.get_temp()
+        await ss.analog_read(_ADC_PIN)
+
+
+async def _run_async(boards, count, latency):
+    devices = [await AsyncSeesaw.create(bus, addr=bus.addr) for bus in _buses(boards, latency)]
+    start = time.monotonic()
+    await asyncio.gather(*[_poll(ss, count) for ss in devices])
+    return time.monotonic() - start
+
+
+def run_async(boards, count, latency):
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        return loop.run_until_complete(_run_async(boards, count, latency))
+    finally:
+        loop.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--boards", type=int, default=3)
+    parser.add_argument("--count", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.0002,
+                        help="fixed cost per bus transaction, seconds")
+    args = parser.parse_args()
+
+    reads = 2 * args.boards * args.count
+    for name, func in (("Seesaw", run_sync), ("AsyncSeesaw", run_async)):
+        elapsed = func(args.boards, args.count, args.latency)
+        print("{:<12} {:8.3f} s  {:8.0f} reads/s".format(name, elapsed, reads / elapsed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Servo write latency on a bus shared with polling threads, with and without
+``BusManager``.
+
+Two simulated boards share one wire: the MM1 at 0x49 and a second seesaw at
+0x4A.  Polling threads read temperature, ADC and touch from both as fast as
+they can while the main thread writes a servo every ``--period`` seconds.
+Without the manager the servo write waits on whichever thread wins the bus
+lock; with it, the write goes next as soon as the current transfer ends.
+
+Usage::
+
+    python3 bench_bus.py [--writes N] [--pollers N] [--period SECONDS]
+                         [--latency SECONDS] [--rate OPS]
+"""
+
+import argparse
+import threading
+import time
+
+from adafruit_seesaw.seesaw import Seesaw
+from adafruit_seesaw.busmanager import BusManager
+from adafruit_seesaw.simulator import SeesawSimulator
+
+_SERVO1 = 16
+_ADC_PIN = 34
+_TOUCH_PIN = 7
+
+
+class _SharedBus:
+    """One wire with several simulated boards on it."""
+    # pylint: disable=missing-docstring
+
+    def __init__(self, *boards):
+        self._boards = {board.addr: board for board in boards}
+        self._lock = threading.Lock()
+
+    def try_lock(self):
+        return self._lock.acquire(False)
+
+    def unlock(self):
+        self._lock.release()
+
+    def writeto(self, address, buffer, **kwargs):
+        self._board(address).writeto(address, buffer, **kwargs)
+
+    def readfrom_into(self, address, buffer, **kwargs):
+        self._board(address).readfrom_into(address, buffer, **kwargs)
+
+    def writeto_then_readfrom(self, address, buffer_out, buffer_in, **kwargs):
+        self._board(address).writeto_then_readfrom(address, buffer_out, buffer_in, **kwargs)
+
+    def _board(self, address):
+        board = self._boards.get(address)
+        if board is None:
+            raise OSError(19, "No such device")
+        return board
+
+
+def _poll(boards, stop):
+    while not stop.is_set():
+        for ss in boards:
+            ss.get_temp()
+            ss.analog_read(_ADC_PIN)
+            ss.touch_read(_TOUCH_PIN)
+
+
+def run(managed, writes, pollers, period, latency, rate):
+    # pylint: disable=too-many-arguments,too-many-locals
+    bus = _SharedBus(SeesawSimulator(0x49, latency=latency),
+                     SeesawSimulator(0x4A, latency=latency))
+    mm1 = Seesaw(bus, 0x49)
+    other = Seesaw(bus, 0x4A)
+    manager = None
+    if managed:
+        manager = BusManager()
+        manager.manage(mm1, rate=rate)
+        manager.manage(other, rate=rate)
+
+    stop = threading.Event()
+    threads = [threading.Thread(target=_poll, args=((mm1, other), stop))
+               for _ in range(pollers)]
+    for thread in threads:
+        thread.start()
+    latencies = []
+    try:
+        for i in range(writes):
+            time.sleep(period)
+            start = time.monotonic()
+            mm1.analog_write(_SERVO1, 3000 + (i & 1))
+            latencies.append(time.monotonic() - start)
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+    latencies.sort()
+    name = "BusManager" if managed else "unmanaged"
+    print("{:<12}{:>10.2f}{:>10.2f}{:>10.2f}".format(
+        name, 1e3 * latencies[len(latencies) // 2],
+        1e3 * latencies[int(len(latencies) * 0.95)], 1e3 * latencies[-1]))
+    if manager is not None:
+        print(manager.report())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--writes", type=int, default=100)
+    parser.add_argument("--pollers", type=int, default=2)
+    parser.add_argument("--period", type=float, default=0.02,
+                        help="time between servo writes, seconds")
+    parser.add_argument("--latency", type=float, default=0.0002,
+                        help="fixed cost per bus transaction, seconds")
+    parser.add_argument("--rate", type=float, default=None,
+                        help="per-board budget for polls, operations per second")
+    args = parser.parse_args()
+    print("{:<12}{:>10}{:>10}{:>10}".format("servo write", "p50 ms", "p95 ms", "max ms"))
+    for managed in (False, True):
+        run(managed, args.writes, args.pollers, args.period, args.latency, args.rate)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Time to move all eight servos: one ``MM1Servo`` write each against one
+``MM1ServoGroup`` commit.
+
+Runs against a ``SeesawSimulator`` advertising the bulk PWM command (or not,
+with ``--no-bulk``) and reports the time per pose and bus transactions per
+pose.  Separate writes land on different PWM frames; a bulk commit changes
+every output on the same frame.
+
+Usage::
+
+    python3 bench_group.py [--poses N] [--latency SECONDS] [--no-bulk]
+"""
+
+import argparse
+import time
+
+from adafruit_seesaw.seesaw import Seesaw
+from adafruit_seesaw.simulator import SeesawSimulator
+from rm_robohat import RoboHatMM1
+
+
+def run(poses, latency, bulk):
+    sim = SeesawSimulator(0x49, latency=latency, pwm_bulk=bulk)
+    robohat = RoboHatMM1(Seesaw(sim, 0x49, reset=False))
+    group = robohat.servo_group(*range(1, 9))
+    servos = group.servos
+    print("{:<14}{:>12}{:>14}".format("path", "ms/pose", "xfers/pose"))
+
+    before = sim.transactions
+    start = time.monotonic()
+    for i in range(poses):
+        for servo in servos:
+            servo.angle = 45 + (i % 90)
+    elapsed = time.monotonic() - start
+    print("{:<14}{:>12.3f}{:>14.1f}".format("separate", 1e3 * elapsed / poses,
+                                            (sim.transactions - before) / poses))
+
+    before = sim.transactions
+    start = time.monotonic()
+    for i in range(poses):
+        for index in range(len(group)):
+            group.stage(index, 45 + (i % 90))
+        group.commit()
+    elapsed = time.monotonic() - start
+    print("{:<14}{:>12.3f}{:>14.1f}".format("group commit", 1e3 * elapsed / poses,
+                                            (sim.transactions - before) / poses))
+    print("commit latency: avg {:.3f} ms, max {:.3f} ms".format(1e3 * group.commit_avg,
+                                                                1e3 * group.commit_max))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--poses", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.0002,
+                        help="fixed cost per bus transaction, seconds")
+    parser.add_argument("--no-bulk", action="store_true",
+                        help="simulate firmware without the bulk PWM command")
+    args = parser.parse_args()
+    run(args.poses, args.latency, not args.no_bulk)
+
+
+if __name__ == "__main__":
+    main()
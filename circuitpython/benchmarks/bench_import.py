@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Start-up cost of ``import rm_robohat``, measured in fresh interpreters.
+
+``rm_robohat`` now imports only its constants; the seesaw driver,
+``adafruit_motor``, ``board`` and ``busio`` load, and the bus is opened, when
+``robohat`` is first used.  The second row loads everything the module used to
+import eagerly, which is what importing it cost before.  With ``--hardware``
+the third row also creates the singleton, attaching to the seesaw on the
+default I2C pins.
+
+Usage::
+
+    python3 bench_import.py [--runs N] [--hardware]
+"""
+
+import argparse
+import subprocess
+import sys
+
+_EAGER = ("board", "busio", "adafruit_seesaw.seesaw", "adafruit_seesaw.robohat",
+          "adafruit_seesaw.pwmout", "adafruit_motor.servo", "adafruit_motor.motor",
+          "adafruit_motor.stepper")
+
+_CASES = (
+    ("import rm_robohat", "import rm_robohat"),
+    ("+ eager modules", "import rm_robohat\n" + "\n".join(
+        "import " + module for module in _EAGER)),
+    ("+ robohat", "import rm_robohat\nrm_robohat.get_robohat()"),
+)
+
+_TIMED = """
+import time
+start = time.perf_counter()
+{}
+print(time.perf_counter() - start)
+"""
+
+
+def _time(code):
+    output = subprocess.run([sys.executable, "-c", _TIMED.format(code)], check=True,
+                            stdout=subprocess.PIPE, universal_newlines=True).stdout
+    return float(output.split()[-1])
+
+
+def run(runs, hardware):
+    print("{:<20}{:>10}{:>10}".format("", "p50 ms", "min ms"))
+    for name, code in _CASES:
+        if name == "+ robohat" and not hardware:
+            continue
+        times = sorted(_time(code) for _ in range(runs))
+        print("{:<20}{:>10.1f}{:>10.1f}".format(name, 1e3 * times[len(times) // 2],
+                                                1e3 * times[0]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--hardware", action="store_true",
+                        help="also attach to a real Robo HAT MM1")
+    args = parser.parse_args()
+    run(args.runs, args.hardware)
+
+
+if __name__ == "__main__":
+    main()
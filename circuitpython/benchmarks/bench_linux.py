@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Register reads per second through ``I2CDevice`` and through ``LinuxI2CDevice``.
+
+Without ``--bus`` both paths drive a ``SeesawSimulator``: the ``I2CDevice``
+path directly, the ``I2C_RDWR`` path through the ``I2CDevFile`` stand-in.  The
+stand-in decodes every ioctl in Python, so there the useful figure is the
+number of bus transfers (syscalls on real hardware) per read, not the rate.
+With ``--bus N`` both run against the real seesaw on ``/dev/i2c-N``, the first
+through Blinka's ``busio``, and the rates are the comparison.
+
+Each transport runs as it comes and with the other calibration setting:
+``I2CDevice`` uncalibrated and after ``Seesaw.calibrate``, ``LinuxI2CDevice``
+calibrated on attach (its default) and with ``calibrate=False``.  Calibration
+is what lets a read go as one transfer, on either transport.
+
+Usage::
+
+    python3 bench_linux.py [--count N] [--bus N] [--addr ADDR]
+"""
+
+import argparse
+import time
+
+from adafruit_seesaw.seesaw import Seesaw
+from adafruit_seesaw.linux_i2c import LinuxI2CDevice
+
+_ADC_PIN = 34
+_LED = 21
+
+
+def _paths(bus, addr):
+    # (name, make the bus or device, transfer counter or None, calibrate() first)
+    if bus is None:
+        from adafruit_seesaw.simulator import SeesawSimulator, I2CDevFile
+
+        def busio_sim():
+            sim = SeesawSimulator(addr)
+            return sim, lambda: sim.transactions
+
+        def rdwr_sim(calibrate):
+            dev = I2CDevFile(SeesawSimulator(addr))
+            return (LinuxI2CDevice(1, addr, fd=dev.fd, ioctl=dev.ioctl, calibrate=calibrate),
+                    lambda: dev.ioctls)
+        return [("busio/I2CDevice", busio_sim, False),
+                ("  + calibrate()", busio_sim, True),
+                ("I2C_RDWR", lambda: rdwr_sim(True), False),
+                ("  calibrate=False", lambda: rdwr_sim(False), False)]
+    import board
+    import busio
+
+    def busio_hw():
+        return busio.I2C(board.SCL, board.SDA), None
+    return [("busio/I2CDevice", busio_hw, False),
+            ("  + calibrate()", busio_hw, True),
+            ("I2C_RDWR", lambda: (LinuxI2CDevice(bus, addr), None), False),
+            ("  calibrate=False", lambda: (LinuxI2CDevice(bus, addr, calibrate=False), None),
+             False)]
+
+
+def run(count, bus, addr):
+    print("{:<18}{:<14}{:>10}{:>12}".format("transport", "operation", "reads/s",
+                                            "xfers/read"))
+    for name, make, calibrate in _paths(bus, addr):
+        target, transfers = make()
+        ss = Seesaw(target, addr, reset=False)
+        if calibrate:
+            ss.calibrate(force=True)
+        for label, func in (("get_temp", ss.get_temp),
+                            ("analog_read", lambda: ss.analog_read(_ADC_PIN)),
+                            ("digital_read", lambda: ss.digital_read(_LED))):
+            before = transfers() if transfers else 0
+            start = time.monotonic()
+            for _ in range(count):
+                func()
+            rate = count / (time.monotonic() - start)
+            per_read = "{:.1f}".format((transfers() - before) / count) if transfers else "-"
+            print("{:<18}{:<14}{:>10.0f}{:>12}".format(name, label, rate, per_read))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--count", type=int, default=500)
+    parser.add_argument("--bus", type=int, default=None,
+                        help="use /dev/i2c-N instead of the simulator")
+    parser.add_argument("--addr", type=lambda text: int(text, 0), default=0x49)
+    args = parser.parse_args()
+    run(args.count, args.bus, args.addr)
+
+
+if __name__ == "__main__":
+    main()
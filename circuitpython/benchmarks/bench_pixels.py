@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Bus cost of a NeoPixel status animation, full uploads against dirty ranges.
+
+A single lit pixel chases along the strip, the kind of status animation that
+runs next to the servos.  The full-upload row rewrites the whole buffer every
+frame, as ``adafruit_seesaw.neopixel`` does; the ``FastNeoPixel`` row sends
+only the bytes that changed.
+
+Usage::
+
+    python3 bench_pixels.py [--pixels N] [--frames N] [--latency SECONDS]
+                            [--byte-time SECONDS]
+"""
+
+import argparse
+import time
+
+from adafruit_seesaw.seesaw import Seesaw
+from adafruit_seesaw.fastpixel import FastNeoPixel
+from adafruit_seesaw.simulator import SeesawSimulator
+
+_NEOPIXEL = 20
+
+
+def _full(pixels):
+    # upload everything, every frame
+    pixels._stale = True  # pylint: disable=protected-access
+    pixels.show()
+
+
+def run(pixels, frames, latency, byte_time):
+    for name, show in (("full upload", _full), ("FastNeoPixel", FastNeoPixel.show)):
+        bus = SeesawSimulator(latency=latency, byte_time=byte_time, flow_control=False)
+        strip = FastNeoPixel(Seesaw(bus), _NEOPIXEL, pixels, auto_write=False)
+        strip.show()
+        bus.reset_stats()
+        start = time.monotonic()
+        for frame in range(frames):
+            strip[(frame - 1) % pixels] = 0
+            strip[frame % pixels] = (0, 0, 40)
+            show(strip)
+        elapsed = time.monotonic() - start
+        print("{:<14}{:>10.1f}{:>10.1f}{:>12.1f}".format(
+            name, frames / elapsed, bus.transactions / frames, 1e3 * bus.bus_time / frames))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--pixels", type=int, default=60)
+    parser.add_argument("--frames", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.0002,
+                        help="fixed cost per bus transaction, seconds")
+    parser.add_argument("--byte-time", type=float, default=0.00009,
+                        help="cost per byte on the wire, seconds")
+    args = parser.parse_args()
+    print("{:<14}{:>10}{:>10}{:>12}".format("strip", "fps", "xfers", "bus ms"))
+    run(args.pixels, args.frames, args.latency, args.byte_time)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Pulse writes per second for donkeycar's steering and throttle: a PCA9685,
+``PWMOut.duty_cycle`` on the Robo HAT MM1, and ``MM1PulseOut.pulse_us``.
+
+``Adafruit_PCA9685.set_pwm`` writes the four ``LEDn_ON/OFF`` registers one
+byte at a time, four bus transactions per pulse.  ``PWMOut`` goes through
+``Seesaw.analog_write``.  ``MM1PulseOut`` sends one prepacked PWM frame
+without the pin lookup and packing; both take the same settle pause, 1 ms
+until the seesaw is calibrated, so the MM1 rows are repeated after
+``Seesaw.calibrate`` (which ``rm_robohat.robohat`` runs on creation).
+
+Without ``--hardware`` the PCA9685 is modelled as four writes at the same
+fixed cost per transaction as the ``SeesawSimulator`` standing in for the MM1,
+which needs ``--turnaround`` seconds before it can answer a read; with it,
+both boards must be on the default I2C bus.
+
+Usage::
+
+    python3 bench_pulse.py [--count N] [--latency SECONDS] [--turnaround SECONDS]
+                           [--hardware]
+"""
+
+import argparse
+import time
+
+from adafruit_seesaw.seesaw import Seesaw
+from adafruit_seesaw.pwmout import PWMOut
+from rm_robohat import RoboHatMM1
+
+_STEERING = 2
+_LED0_ON_L = 0x06
+
+
+class _ModelPCA9685:
+    """The bus traffic of ``Adafruit_PCA9685.PCA9685.set_pwm``."""
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.transactions = 0
+
+    def _write8(self, register, value):
+        # pylint: disable=unused-argument
+        self.transactions += 1
+        time.sleep(self.latency)
+
+    def set_pwm(self, channel, on, off):
+        base = _LED0_ON_L + 4 * channel
+        self._write8(base, on & 0xFF)
+        self._write8(base + 1, on >> 8)
+        self._write8(base + 2, off & 0xFF)
+        self._write8(base + 3, off >> 8)
+
+
+def _boards(latency, turnaround, hardware):
+    if hardware:
+        import board
+        import busio
+        import Adafruit_PCA9685
+        pca = Adafruit_PCA9685.PCA9685()
+        pca.set_pwm_freq(60)
+        return pca, Seesaw(busio.I2C(board.SCL, board.SDA), reset=False)
+    from adafruit_seesaw.simulator import SeesawSimulator
+    return (_ModelPCA9685(latency),
+            Seesaw(SeesawSimulator(0x49, latency=latency,
+                                   turnaround={base: turnaround for base in range(0x20)}),
+                   0x49, reset=False))
+
+
+def _rate(write, count):
+    start = time.monotonic()
+    for i in range(count):
+        write(i)
+    return count / (time.monotonic() - start)
+
+
+def run(count, latency, turnaround, hardware):
+    pca, seesaw = _boards(latency, turnaround, hardware)
+    robohat = RoboHatMM1(seesaw)
+    # the donkeycar calibration range, in PCA9685 ticks at 60 Hz
+    ticks = [360 + (i % 60) for i in range(count)]
+    us_per_tick = 1000000.0 / (60 * 4096)
+
+    pwm = PWMOut(seesaw, robohat.get_channel(_STEERING))
+    pwm.frequency = 50
+    duty_per_tick = us_per_tick * 50 * 0xFFFF / 1000000
+    pulse = robohat.pulse_out(_STEERING)
+
+    print("{:<40}{:>12}".format("path", "pulses/s"))
+    print("{:<40}{:>12.0f}".format(
+        "PCA9685 set_pwm", _rate(lambda i: pca.set_pwm(0, 0, ticks[i]), count)))
+    for suffix in ("", " (calibrated)"):
+        if suffix:
+            seesaw.calibrate(force=True)
+        print("{:<40}{:>12.0f}".format(
+            "MM1 PWMOut.duty_cycle" + suffix,
+            _rate(lambda i: setattr(pwm, "duty_cycle", int(ticks[i] * duty_per_tick)),
+                  count)))
+        print("{:<40}{:>12.0f}".format(
+            "MM1PulseOut.pulse_us" + suffix,
+            _rate(lambda i: setattr(pulse, "pulse_us", ticks[i] * us_per_tick), count)))
+    pulse.release()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--count", type=int, default=1000)
+    parser.add_argument("--latency", type=float, default=0.0002,
+                        help="fixed cost per bus transaction, seconds")
+    parser.add_argument("--turnaround", type=float, default=0.0001,
+                        help="time the simulated chip needs before a reply, seconds")
+    parser.add_argument("--hardware", action="store_true",
+                        help="drive a real PCA9685 and Robo HAT MM1")
+    args = parser.parse_args()
+    run(args.count, args.latency, args.turnaround, args.hardware)
+
+
+if __name__ == "__main__":
+    main()
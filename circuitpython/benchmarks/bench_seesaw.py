@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark for the seesaw driver against ``SeesawSimulator``.
+
+Runs the common Robo HAT MM1 operations against the in-process simulator and
+reports the wall time per call, the bus transactions per call and the share of
+that time spent in driver sleeps rather than on the (simulated) wire.
+
+Usage::
+
+    python3 bench_seesaw.py [--count N] [--latency SECONDS] [--byte-time SECONDS]
+                            [--turnaround SECONDS] [--calibrate] [--pwm-bulk] [--adc-bulk]
+
+The defaults model a 100 kHz bus driven through Blinka on a Raspberry Pi.
+``--calibrate`` runs ``Seesaw.calibrate`` first so the fixed 1 ms sleeps are
+replaced by the measured turnaround of the simulated firmware.
+``--pwm-bulk`` and ``--adc-bulk`` make the simulated firmware advertise the
+bulk PWM command and contiguous multi-channel ADC reads.
+"""
+
+import argparse
+import time
+
+from adafruit_seesaw.seesaw import Seesaw
+from adafruit_seesaw.simulator import SeesawSimulator
+
+_SERVO1 = 16
+_SERVOS = (16, 17, 18, 19, 11, 10, 9, 8)
+_LED = 21
+_ADC_PIN = 34
+_BUTTONS = (0, 1, 3, 28, 40)
+_TOUCH_PIN = 7
+
+
+def _cached_reads(ss):
+    # one drive loop tick: invalidate, then read every button
+    ss.gpio_cache_window = 1.0
+    ss.invalidate_gpio_cache()
+    values = [ss.digital_read(pin) for pin in _BUTTONS]
+    ss.gpio_cache_window = None
+    return values
+
+
+def _operations(ss):
+    return [
+        ("get_temp", ss.get_temp),
+        ("read8 HW_ID", lambda: ss.read8(0x00, 0x01)),
+        ("digital_read", lambda: ss.digital_read(_LED)),
+        ("digital_read x5", lambda: [ss.digital_read(pin) for pin in _BUTTONS]),
+        ("cached read x5", lambda: _cached_reads(ss)),
+        ("digital_write", lambda: ss.digital_write(_LED, True)),
+        ("analog_read", lambda: ss.analog_read(_ADC_PIN)),
+        ("analog_read_all", ss.analog_read_all),
+        ("touch_read", lambda: ss.touch_read(_TOUCH_PIN)),
+        ("analog_write", lambda: ss.analog_write(_SERVO1, 4915)),
+        ("analog_write x8", lambda: [ss.analog_write(pin, 4915) for pin in _SERVOS]),
+        ("write_bulk x8", lambda: ss.analog_write_bulk([(pin, 4915) for pin in _SERVOS])),
+    ]
+
+
+def run(count, latency, byte_time, turnaround, calibrate, pwm_bulk, adc_bulk):
+    bus = SeesawSimulator(latency=latency, byte_time=byte_time, flow_control=False,
+                          pwm_bulk=pwm_bulk, adc_bulk=adc_bulk, boot_time=0.02,
+                          turnaround={base: turnaround for base in range(0x10)})
+    start = time.monotonic()
+    ss = Seesaw(bus)
+    reset_time = time.monotonic() - start
+    start = time.monotonic()
+    Seesaw(bus, reset=False)
+    print("startup: reset {:.1f} ms, attach {:.1f} ms".format(
+        1e3 * reset_time, 1e3 * (time.monotonic() - start)))
+    ss.pin_mode(_LED, ss.OUTPUT)
+    if calibrate:
+        delays = ss.calibrate()
+        print("calibrated turnaround (us): " + ", ".join(
+            "0x{:02x}={:.0f}".format(base, 1e6 * delay) for base, delay in sorted(delays.items())))
+
+    print("{:<16}{:>12}{:>10}{:>12}".format("operation", "us/call", "xfers", "bus %"))
+    for name, func in _operations(ss):
+        bus.reset_stats()
+        start = time.monotonic()
+        for _ in range(count):
+            func()
+        elapsed = time.monotonic() - start
+        print("{:<16}{:>12.1f}{:>10.1f}{:>12.1f}".format(
+            name, 1e6 * elapsed / count, bus.transactions / count,
+            100.0 * bus.bus_time / elapsed))
+    print("corrupt reads: {}, turnaround fallbacks: {}".format(
+        bus.corrupt_reads, ss.turnaround_fallbacks))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--count", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.0002,
+                        help="fixed cost per bus transaction, seconds")
+    parser.add_argument("--byte-time", type=float, default=0.00009,
+                        help="cost per byte on the wire, seconds")
+    parser.add_argument("--turnaround", type=float, default=0.0001,
+                        help="time the firmware needs before a reply is ready, seconds")
+    parser.add_argument("--calibrate", action="store_true",
+                        help="calibrate the driver turnaround before measuring")
+    parser.add_argument("--pwm-bulk", action="store_true",
+                        help="simulate firmware with the bulk PWM command")
+    parser.add_argument("--adc-bulk", action="store_true",
+                        help="simulate firmware with contiguous ADC reads")
+    args = parser.parse_args()
+    run(args.count, args.latency, args.byte_time, args.turnaround, args.calibrate,
+        args.pwm_bulk, args.adc_bulk)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Servo angle writes per second through ``adafruit_motor`` and through ``MM1Servo``.
+
+``adafruit_motor.servo.Servo`` on a seesaw ``PWMOut`` computes each duty cycle
+in floating point and writes it with ``Seesaw.analog_write``, which pauses for
+the chip to settle.  ``MM1Servo`` looks the duty cycle up in a precomputed
+table and sends a prepacked PWM frame, with the same settle pause: 1 ms until
+the seesaw is calibrated, so the rows are repeated after ``Seesaw.calibrate``
+(which ``rm_robohat.robohat`` runs on creation).  Both run against a
+``SeesawSimulator`` that needs ``--turnaround`` seconds before it can answer a
+read, or against the Robo HAT on the default I2C pins with ``--hardware``.
+
+Usage::
+
+    python3 bench_servo.py [--count N] [--latency SECONDS] [--turnaround SECONDS]
+                           [--hardware]
+"""
+
+import argparse
+import time
+
+from adafruit_seesaw.seesaw import Seesaw
+from adafruit_seesaw.pwmout import PWMOut
+from adafruit_motor.servo import Servo
+from rm_robohat import RoboHatMM1
+
+_SERVO1 = 16
+
+
+def _seesaw(latency, turnaround, hardware):
+    if hardware:
+        import board
+        import busio
+        return Seesaw(busio.I2C(board.SCL, board.SDA), reset=False)
+    from adafruit_seesaw.simulator import SeesawSimulator
+    return Seesaw(SeesawSimulator(0x49, latency=latency,
+                                  turnaround={base: turnaround for base in range(0x20)}),
+                  0x49, reset=False)
+
+
+def _rate(servo, count):
+    start = time.monotonic()
+    for i in range(count):
+        servo.angle = 45 + (i % 90)
+    return count / (time.monotonic() - start)
+
+
+def _pulse_rate(servo, count):
+    start = time.monotonic()
+    for i in range(count):
+        servo.pulse_us = 1000 + (i % 1000)
+    return count / (time.monotonic() - start)
+
+
+def run(count, latency, turnaround, hardware):
+    robohat = RoboHatMM1(_seesaw(latency, turnaround, hardware))
+    pwm = PWMOut(robohat.seesaw, _SERVO1)
+    pwm.frequency = 50
+    print("{:<40}{:>12}".format("path", "writes/s"))
+    servo = robohat.servo_1
+    for suffix in ("", " (calibrated)"):
+        if suffix:
+            robohat.seesaw.calibrate(force=True)
+        print("{:<40}{:>12.0f}".format("adafruit_motor Servo.angle" + suffix,
+                                       _rate(Servo(pwm), count)))
+        print("{:<40}{:>12.0f}".format("MM1Servo.angle" + suffix, _rate(servo, count)))
+        print("{:<40}{:>12.0f}".format("MM1Servo.pulse_us" + suffix,
+                                       _pulse_rate(servo, count)))
+    servo.release()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--count", type=int, default=1000)
+    parser.add_argument("--latency", type=float, default=0.0002,
+                        help="fixed cost per bus transaction, seconds")
+    parser.add_argument("--turnaround", type=float, default=0.0001,
+                        help="time the simulated chip needs before a reply, seconds")
+    parser.add_argument("--hardware", action="store_true",
+                        help="drive a real Robo HAT MM1 instead of the simulator")
+    args = parser.parse_args()
+    run(args.count, args.latency, args.turnaround, args.hardware)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Drive loop time with telemetry read on demand and from a ``TelemetrySampler``.
+
+Each loop iteration writes a servo and reads the temperature, both ADC inputs
+and one touch input, against a ``SeesawSimulator`` with a fixed cost per bus
+transaction.  On demand, every read goes over the bus; with the sampler, the
+reads come from memory while a background thread polls within ``--budget``.
+The seesaw is calibrated first, and the sampler row starts once the first
+complete round is in; it fails if no further round completes while it runs.
+
+Usage::
+
+    python3 bench_telemetry.py [--loops N] [--latency SECONDS] [--budget FRACTION]
+"""
+
+import argparse
+import time
+
+from adafruit_seesaw.seesaw import Seesaw
+from adafruit_seesaw.robohat import MM1_Pinmap
+from adafruit_seesaw.simulator import SeesawSimulator
+from adafruit_seesaw.telemetry import TelemetrySampler
+
+_SERVO1 = 16
+_D2 = 34
+_D3 = 35
+_RCH1 = 7
+
+
+def _on_demand(ss):
+    ss.analog_write(_SERVO1, 3000)
+    return ss.get_temp(), ss.analog_read(_D2), ss.analog_read(_D3), ss.touch_read(_RCH1)
+
+
+def _sampled(ss, telemetry):
+    ss.analog_write(_SERVO1, 3000)
+    return (telemetry.temperature, telemetry.analog(_D2), telemetry.analog(_D3),
+            telemetry.touch(_RCH1))
+
+
+def run(loops, latency, budget):
+    ss = Seesaw(SeesawSimulator(0x49, latency=latency), 0x49, reset=False)
+    ss.pin_mapping = MM1_Pinmap
+    # as LinuxI2CDevice does on attach: no turnaround the chip does not need
+    ss.calibrate()
+    print("{:<12}{:>10}{:>10}{:>10}".format("telemetry", "p50 ms", "p99 ms", "max ms"))
+    telemetry = None
+    for name in ("on demand", "sampler"):
+        if name == "sampler":
+            telemetry = TelemetrySampler(ss, interval=0.1, budget=budget)
+            # time reads of real samples, not of the zeroed buffers
+            while telemetry.age is None:
+                time.sleep(0.001)
+            telemetry.reset_stats()
+        times = []
+        for _ in range(loops):
+            start = time.monotonic()
+            if telemetry is None:
+                _on_demand(ss)
+            else:
+                _sampled(ss, telemetry)
+            times.append(time.monotonic() - start)
+        times.sort()
+        print("{:<12}{:>10.3f}{:>10.3f}{:>10.3f}".format(
+            name, 1e3 * times[len(times) // 2], 1e3 * times[int(len(times) * 0.99)],
+            1e3 * times[-1]))
+    telemetry.stop()
+    print("sampler: {} rounds, {:.1f}% of the time on the bus, {} errors".format(
+        telemetry.rounds, 100.0 * telemetry.utilization, telemetry.errors))
+    assert telemetry.rounds > 0, "the sampler completed no round during the loops"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--loops", type=int, default=2000)
+    parser.add_argument("--latency", type=float, default=0.0002,
+                        help="fixed cost per bus transaction, seconds")
+    parser.add_argument("--budget", type=float, default=0.02,
+                        help="fraction of the bus the sampler may use")
+    args = parser.parse_args()
+    run(args.loops, args.latency, args.budget)
+
+
+if __name__ == "__main__":
+    main()
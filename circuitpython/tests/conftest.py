@@ -0,0 +1,96 @@
+"""
+Shared setup for the simulator-backed tests.
+
+The README installs these modules by copying them into the
+``adafruit_seesaw`` package; here the tree's own copies are put in front of
+the installed package instead, so the tests run against the working tree.
+``adafruit_bus_device`` (from ``adafruit-circuitpython-seesaw``) must be
+installed.
+
+Run from ``circuitpython/``::
+
+    python3 -m pytest -q tests
+"""
+
+import os
+import sys
+import types
+
+import pytest
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_SEESAW = os.path.join(_ROOT, "Adafruit_CircuitPython_seesaw")
+_ROBOHAT = os.path.join(_ROOT, "Adafruit_CircuitPython_RoboHat")
+
+try:
+    import adafruit_seesaw
+except ImportError:
+    adafruit_seesaw = types.ModuleType("adafruit_seesaw")
+    adafruit_seesaw.__path__ = []
+    sys.modules["adafruit_seesaw"] = adafruit_seesaw
+adafruit_seesaw.__path__.insert(0, _SEESAW)
+sys.path.insert(0, _ROBOHAT)
+
+pytest.importorskip("adafruit_bus_device")
+
+# pylint: disable=wrong-import-position
+from adafruit_seesaw.seesaw import Seesaw
+from adafruit_seesaw.robohat import MM1_Pinmap
+from adafruit_seesaw.simulator import SeesawSimulator
+
+
+class Faults:
+    """Count and fail bus writes to chosen registers of a ``SeesawSimulator``.
+
+    ``fail(reg_base, reg, times)`` makes the next ``times`` transfers that
+    start with that register select raise ``OSError``; ``sent(reg_base, reg)``
+    counts the transfers that reached the chip."""
+
+    def __init__(self, sim):
+        self._pending = {}
+        self._sent = {}
+        self._writeto = sim.writeto
+        self._writeto_then_readfrom = sim.writeto_then_readfrom
+        sim.writeto = self.writeto
+        sim.writeto_then_readfrom = self.writeto_then_readfrom
+
+    def fail(self, reg_base, reg, times=1):
+        self._pending[(reg_base, reg)] = times
+
+    def sent(self, reg_base, reg):
+        return self._sent.get((reg_base, reg), 0)
+
+    def _check(self, buf, start):
+        key = (buf[start], buf[start + 1])
+        left = self._pending.get(key, 0)
+        if left:
+            self._pending[key] = left - 1
+            raise OSError(121, "Remote I/O error")
+        self._sent[key] = self._sent.get(key, 0) + 1
+
+    def writeto(self, address, buffer, *, start=0, end=None, stop=True):
+        if (end if end is not None else len(buffer)) - start >= 2:
+            self._check(buffer, start)
+        return self._writeto(address, buffer, start=start, end=end, stop=stop)
+
+    def writeto_then_readfrom(self, address, buffer_out, buffer_in, **kwargs):
+        self._check(buffer_out, kwargs.get("out_start", 0))
+        return self._writeto_then_readfrom(address, buffer_out, buffer_in, **kwargs)
+
+
+@pytest.fixture
+def sim():
+    return SeesawSimulator(0x49)
+
+
+@pytest.fixture
+def faults(sim):
+    return Faults(sim)
+
+
+@pytest.fixture
+def ss(sim, faults):
+    # pylint: disable=redefined-outer-name,unused-argument
+    seesaw = Seesaw(sim, 0x49, reset=False)
+    seesaw.pin_mapping = MM1_Pinmap
+    return seesaw
@@ -0,0 +1,225 @@
+"""Retry, shadow and GPIO cache behaviour of ``Seesaw`` against the simulator."""
+
+import time
+
+import pytest
+
+from adafruit_seesaw.robohat import MM1_Pinmap
+from adafruit_seesaw.seesaw import PinTable, RetryPolicy, pin_table
+
+_GPIO_BASE = 0x01
+_GPIO_BULK = 0x04
+_GPIO_BULK_SET = 0x05
+_GPIO_BULK_TOGGLE = 0x07
+_STATUS_BASE = 0x00
+_STATUS_TEMP = 0x04
+_TIMER_BASE = 0x08
+_TIMER_PWM = 0x01
+_TIMER_FREQ = 0x02
+
+
+def _quick(**kwargs):
+    kwargs.setdefault("backoff", 0)
+    kwargs.setdefault("jitter", 0)
+    return RetryPolicy(**kwargs)
+
+
+# --- PinTable ---------------------------------------------------------------
+
+def test_pin_table_prefixes():
+    table = PinTable(MM1_Pinmap)
+    for i, pin in enumerate(MM1_Pinmap.pwm_pins):
+        assert table.pwm_index[pin] == i
+        assert table.pwm_prefix[pin] == bytes((_TIMER_BASE, _TIMER_PWM, i))
+    for i, pin in enumerate(MM1_Pinmap.analog_pins):
+        assert table.adc_reg[pin] == 0x07 + i
+    for i, pin in enumerate(MM1_Pinmap.touch_pins):
+        assert table.touch_reg[pin] == 0x10 + i
+    assert table.pwm_width == MM1_Pinmap.pwm_width
+
+
+def test_pin_table_timers():
+    table = PinTable(MM1_Pinmap)
+    # the two servo headers on TCC2 share one frequency
+    assert table.pwm_timer[16] == table.pwm_timer[17]
+
+    class NoTimers:  # pylint: disable=too-few-public-methods
+        pwm_pins = (1, 2)
+        pwm_width = 16
+        analog_pins = ()
+        touch_pins = ()
+
+    assert PinTable(NoTimers).pwm_timer == {1: None, 2: None}
+
+
+def test_pin_table_cached_per_class():
+    assert pin_table(MM1_Pinmap) is pin_table(MM1_Pinmap)
+
+
+def test_analog_write_sends_prefix(ss, sim):
+    ss.analog_write(17, 0x1234)
+    assert sim.pwm_duty[MM1_Pinmap.pwm_pins.index(17)] == 0x1234
+    with pytest.raises(ValueError):
+        ss.analog_write(0, 1)
+
+
+# --- RetryPolicy ------------------------------------------------------------
+
+def test_read_retried_and_recovered(ss, faults):
+    ss.retry_policy = policy = _quick()
+    faults.fail(_STATUS_BASE, _STATUS_TEMP, times=2)
+    assert ss.get_temp() == pytest.approx(25.0, abs=.01)
+    assert (policy.retries, policy.recovered, policy.failures) == (2, 1, 0)
+
+
+def test_read_gives_up_after_attempts(ss, faults):
+    ss.retry_policy = policy = _quick(attempts=2)
+    faults.fail(_STATUS_BASE, _STATUS_TEMP, times=5)
+    with pytest.raises(OSError):
+        ss.get_temp()
+    assert (policy.retries, policy.failures, policy.deadline_misses) == (1, 1, 0)
+
+
+def test_read_gives_up_at_deadline(ss, faults):
+    ss.retry_policy = policy = _quick(attempts=10, backoff=.01, deadline=.005)
+    faults.fail(_STATUS_BASE, _STATUS_TEMP, times=5)
+    with pytest.raises(OSError):
+        ss.get_temp()
+    assert (policy.retries, policy.failures, policy.deadline_misses) == (0, 1, 1)
+
+
+def test_no_policy_raises_at_once(ss, faults):
+    faults.fail(_STATUS_BASE, _STATUS_TEMP)
+    with pytest.raises(OSError):
+        ss.get_temp()
+    assert ss.get_temp() == pytest.approx(25.0, abs=.01)
+
+
+def test_absolute_write_retried(ss, sim, faults):
+    ss.retry_policy = policy = _quick()
+    faults.fail(_TIMER_BASE, _TIMER_PWM)
+    ss.analog_write(16, 4000)
+    assert sim.pwm_duty[MM1_Pinmap.pwm_pins.index(16)] == 4000
+    assert faults.sent(_TIMER_BASE, _TIMER_PWM) == 1
+    assert policy.recovered == 1
+
+
+def test_pwm_frame_retried(ss, sim, faults):
+    ss.retry_policy = _quick()
+    frame = ss.pwm_frame(16)
+    frame[3:5] = (4500).to_bytes(2, "big")
+    faults.fail(_TIMER_BASE, _TIMER_PWM)
+    ss.write_pwm_frame(frame)
+    assert sim.pwm_duty[MM1_Pinmap.pwm_pins.index(16)] == 4500
+
+
+def test_toggle_not_retried(ss, sim, faults):
+    # a repeated toggle would undo itself, so it must surface the error
+    ss.retry_policy = policy = _quick()
+    assert not policy.retries_write(_GPIO_BASE, _GPIO_BULK_TOGGLE)
+    faults.fail(_GPIO_BASE, _GPIO_BULK_TOGGLE)
+    with pytest.raises(OSError):
+        ss.write(_GPIO_BASE, _GPIO_BULK_TOGGLE, b"\x00\x00\x00\x01")
+    assert faults.sent(_GPIO_BASE, _GPIO_BULK_TOGGLE) == 0
+    assert sim.output_latch == 0
+    assert policy.retries == 0
+
+
+# --- shadow writes ----------------------------------------------------------
+
+def test_shadow_suppresses_repeats(ss, faults):
+    ss.shadow_writes = True
+    for _ in range(3):
+        ss.analog_write(16, 4000)
+    ss.digital_write(5, True)
+    ss.digital_write(5, True)
+    assert faults.sent(_TIMER_BASE, _TIMER_PWM) == 1
+    assert faults.sent(_GPIO_BASE, _GPIO_BULK_SET) == 1
+    assert ss.writes_suppressed == 3
+
+
+def test_shadow_off_sends_everything(ss, faults):
+    for _ in range(3):
+        ss.analog_write(16, 4000)
+    assert faults.sent(_TIMER_BASE, _TIMER_PWM) == 3
+    assert ss.writes_suppressed == 0
+
+
+def test_shadow_forgotten_after_bus_error(ss, sim, faults):
+    ss.shadow_writes = True
+    ss.analog_write(16, 4000)
+    ss.digital_write(5, True)
+    faults.fail(_STATUS_BASE, _STATUS_TEMP)
+    with pytest.raises(OSError):
+        ss.get_temp()
+    # the chip may have reset; the same values must go out again
+    sim.pwm_duty[MM1_Pinmap.pwm_pins.index(16)] = 0
+    ss.analog_write(16, 4000)
+    ss.digital_write(5, True)
+    assert sim.pwm_duty[MM1_Pinmap.pwm_pins.index(16)] == 4000
+    assert faults.sent(_TIMER_BASE, _TIMER_PWM) == 2
+    assert faults.sent(_GPIO_BASE, _GPIO_BULK_SET) == 2
+
+
+def test_shadow_not_updated_by_failed_write(ss, sim, faults):
+    ss.shadow_writes = True
+    faults.fail(_TIMER_BASE, _TIMER_PWM)
+    with pytest.raises(OSError):
+        ss.analog_write(16, 4000)
+    ss.analog_write(16, 4000)
+    assert sim.pwm_duty[MM1_Pinmap.pwm_pins.index(16)] == 4000
+
+
+def test_frequency_shadow_per_timer(ss, faults):
+    ss.shadow_writes = True
+    ss.set_pwm_freq(16, 50)
+    ss.set_pwm_freq(17, 100)  # same timer: changes pin 16 too
+    ss.set_pwm_freq(16, 50)
+    assert faults.sent(_TIMER_BASE, _TIMER_FREQ) == 3
+    ss.set_pwm_freq(17, 50)
+    assert faults.sent(_TIMER_BASE, _TIMER_FREQ) == 3
+    assert ss.writes_suppressed == 1
+
+
+# --- GPIO cache window ------------------------------------------------------
+
+def test_gpio_cache_window(ss, sim, faults):
+    ss.pin_mode(5, ss.INPUT)
+    ss.gpio_cache_window = 60
+    sim.set_input(5, True)
+    assert ss.digital_read(5)
+    sim.set_input(5, False)
+    # served from the cached fetch until invalidated
+    assert ss.digital_read(5)
+    assert ss.digital_read_bulk(1 << 5)
+    assert (ss.gpio_cache_misses, ss.gpio_cache_hits) == (1, 2)
+    ss.invalidate_gpio_cache()
+    assert not ss.digital_read(5)
+    assert faults.sent(_GPIO_BASE, _GPIO_BULK) == 2
+
+
+def test_gpio_cache_expires(ss, sim):
+    ss.pin_mode(5, ss.INPUT)
+    ss.gpio_cache_window = .001
+    sim.set_input(5, True)
+    assert ss.digital_read(5)
+    sim.set_input(5, False)
+    time.sleep(.005)
+    assert not ss.digital_read(5)
+    assert ss.gpio_cache_misses == 2
+
+
+def test_gpio_cache_cleared_by_writes(ss):
+    ss.gpio_cache_window = 60
+    ss.pin_mode(6, ss.OUTPUT)
+    assert not ss.digital_read(6)
+    ss.digital_write(6, True)
+    assert ss.digital_read(6)
+    assert ss.gpio_cache_misses == 2
+
+
+def test_gpio_cache_off_reads_every_time(ss, faults):
+    for _ in range(3):
+        ss.digital_read(5)
+    assert faults.sent(_GPIO_BASE, _GPIO_BULK) == 3
+    assert ss.gpio_cache_hits == ss.gpio_cache_misses == 0
@@ -0,0 +1,141 @@
+"""Frame encoding and error reporting of ``adafruit_seesaw.serial_transport``."""
+
+import pytest
+
+from adafruit_seesaw.robohat import MM1_Pinmap
+from adafruit_seesaw.seesaw import RetryPolicy, Seesaw
+from adafruit_seesaw.serial_transport import (ACK, DATA, READ, SYNC, WRITE, FrameDecoder,
+                                              SerialTransport, WriteRejected, crc8, encode)
+from adafruit_seesaw.simulator import PtySeesawServer
+
+_TIMER_BASE = 0x08
+_TIMER_PWM = 0x01
+
+
+def test_crc8_check_value():
+    # the standard check value for CRC-8 with polynomial 0x07
+    assert crc8(b"123456789") == 0xF4
+    assert crc8(b"") == 0
+
+
+def test_encode_layout():
+    frame = encode(WRITE, 3, 0x08, 0x01, 3, b"\x00\x12\x34")
+    assert frame[:7] == bytes((SYNC, WRITE, 3, 0x08, 0x01, 3, 0x00))
+    assert frame[-1] == crc8(frame[1:-1])
+    assert len(frame) == 7 + 3
+
+
+def test_decoder_round_trip():
+    frames = [encode(WRITE, 1, 0x08, 0x01, 3, b"\x00\x12\x34"),
+              encode(READ, 2, 0x00, 0x04, 4),
+              encode(DATA, 2, 0x00, 0x04, 4, b"\x00\x19\x00\x00"),
+              encode(ACK, 1, 0x08, 0x01, 0)]
+    decoder = FrameDecoder()
+    assert decoder.feed(b"".join(frames)) == [
+        (WRITE, 1, 0x08, 0x01, 3, b"\x00\x12\x34"),
+        (READ, 2, 0x00, 0x04, 4, b""),
+        (DATA, 2, 0x00, 0x04, 4, b"\x00\x19\x00\x00"),
+        (ACK, 1, 0x08, 0x01, 0, b"")]
+    assert decoder.crc_errors == 0
+
+
+def test_decoder_byte_at_a_time():
+    decoder = FrameDecoder()
+    frame = encode(DATA, 7, 0x01, 0x04, 2, b"\xA5\xA5")
+    got = []
+    for byte in frame:
+        got += decoder.feed(bytes((byte,)))
+    assert got == [(DATA, 7, 0x01, 0x04, 2, b"\xA5\xA5")]
+
+
+def test_decoder_skips_garbage():
+    decoder = FrameDecoder()
+    frame = encode(ACK, 9, 0x08, 0x01, 0)
+    assert decoder.feed(b"\x00\xFF\x13" + frame) == [(ACK, 9, 0x08, 0x01, 0, b"")]
+
+
+def test_decoder_resyncs_after_bad_crc():
+    decoder = FrameDecoder()
+    bad = bytearray(encode(DATA, 1, 0x00, 0x04, 4, b"\x00\x19\x00\x00"))
+    bad[-1] ^= 0x01
+    good = encode(ACK, 2, 0x08, 0x01, 0)
+    assert decoder.feed(bytes(bad) + good) == [(ACK, 2, 0x08, 0x01, 0, b"")]
+    assert decoder.crc_errors == 1
+
+
+def test_write_rejected_names_register():
+    error = WriteRejected(121, 0x08, 0x01)
+    assert isinstance(error, OSError)
+    assert error.errno == 121
+    assert (error.reg_base, error.reg) == (0x08, 0x01)
+    assert "0x08/0x01" in str(error)
+
+
+# --- against the simulator over a pseudo-terminal ---------------------------
+
+@pytest.fixture
+def serial_ss(sim, faults):
+    # pylint: disable=unused-argument
+    pytest.importorskip("serial")
+    server = PtySeesawServer(sim)
+    transport = SerialTransport(server.port)
+    seesaw = Seesaw(transport, reset=False)
+    seesaw.pin_mapping = MM1_Pinmap
+    yield seesaw
+    transport.close()
+    server.close()
+
+
+def test_serial_round_trip(serial_ss, sim):
+    serial_ss.analog_write(16, 4000)
+    assert serial_ss.get_temp() == pytest.approx(25.0, abs=.01)
+    assert sim.pwm_duty[0] == 4000
+    assert serial_ss.i2c_device.in_flight == 0
+
+
+def test_serial_rejected_write_deferred(serial_ss, faults):
+    transport = serial_ss.i2c_device
+    faults.fail(_TIMER_BASE, _TIMER_PWM)
+    serial_ss.analog_write(16, 4000)  # streamed; the NAK comes back later
+    with pytest.raises(WriteRejected) as info:
+        transport.flush()
+    assert (info.value.reg_base, info.value.reg) == (_TIMER_BASE, _TIMER_PWM)
+    assert transport.write_errors == 1
+    transport.flush()  # reported once
+
+
+def test_serial_rejected_write_immediate_with_shadow(serial_ss, sim, faults):
+    serial_ss.shadow_writes = True
+    serial_ss.analog_write(16, 4000)
+    faults.fail(_TIMER_BASE, _TIMER_PWM)
+    with pytest.raises(WriteRejected):
+        serial_ss.analog_write(16, 5000)
+    # the failure dropped the shadow, so the old value is not taken as written
+    serial_ss.analog_write(16, 4000)
+    assert sim.pwm_duty[0] == 4000
+    assert serial_ss.writes_suppressed == 0
+
+
+def test_serial_rejected_write_retried(serial_ss, sim, faults):
+    serial_ss.retry_policy = policy = RetryPolicy(backoff=0, jitter=0)
+    faults.fail(_TIMER_BASE, _TIMER_PWM)
+    serial_ss.analog_write(16, 4000)
+    assert sim.pwm_duty[0] == 4000
+    assert policy.recovered == 1
+
+
+def test_serial_corrupt_reply_raises():
+    pytest.importorskip("serial")
+    # pylint: disable=import-outside-toplevel
+    from adafruit_seesaw.simulator import SeesawSimulator
+    server = PtySeesawServer(SeesawSimulator(0x49), corrupt_every=1)
+    transport = SerialTransport(server.port, timeout=.05)
+    try:
+        seesaw = Seesaw(transport, reset=False)
+    except OSError:
+        pass
+    else:
+        with pytest.raises(OSError):
+            seesaw.get_temp()
+    assert transport.crc_errors >= 1
+    server.close()
@@ -23,7 +23,8 @@ MODELS_PATH = os.path.join(CAR_PATH, 'models')
 #VEHICLE
 DRIVE_LOOP_HZ = 20
 MAX_LOOPS = 100000
-ACTUATOR_TYPE = 'serial'
+ACTUATOR_TYPE = 'seesaw' # seesaw (Robo HAT MM1) or normal (PCA9685)
+SEESAW_TRACE = False # print seesaw per-register bus statistics on exit
 
 
 #CAMERA
@@ -51,6 +52,13 @@ JOYSTICK_MAX_THROTTLE = 0.25
 JOYSTICK_STEERING_SCALE = 1.0
 AUTO_RECORD_ON_THROTTLE = True
 
+#RC RECEIVER (Robo HAT MM1 RC headers)
+USE_RC_RECEIVER = False
+RC_STEERING_CHANNEL = 1
+RC_THROTTLE_CHANNEL = 2
+RC_FAILSAFE_TIMEOUT = 0.1 # seconds without a pulse before steering and throttle drop to 0
+RC_MAX_THROTTLE = 1.0
+
 
 TUB_PATH = os.path.join(CAR_PATH, 'tub') # if using a single tub
 
@@ -20,7 +20,9 @@ from donkeycar.parts.camera import PiCamera
 from donkeycar.parts.transform import Lambda
 from donkeycar.parts.keras import KerasLinear
 from donkeycar.parts.actuator import PCA9685, PWMSteering, PWMThrottle
-from donkeycar.parts.actuator import RoboHATMM1, SerialDevice
+from donkeycar.parts.actuator import ROBOHATMM1
+from donkeycar.parts.actuator import SeesawTrace
+from donkeycar.parts.rc_receiver import RoboHATRCReceiver
 from donkeycar.parts.joystick import PS3JoystickController, PS4JoystickController
 from donkeycar.parts.serial_controller import SerialController
 from donkeycar.parts.datastore import TubGroup, TubWriter
@@ -47,10 +49,17 @@ def drive(cfg, model_path=None, use_joystick=False, use_chaos=False):
     cam = PiCamera(resolution=cfg.CAMERA_RESOLUTION)
     V.add(cam, outputs=['cam/image_array'], threaded=True)
 
-    if use_joystick or cfg.USE_JOYSTICK_AS_DEFAULT:
+    if cfg.USE_RC_RECEIVER:
+        # steer with an RC transmitter through the Robo HAT MM1 RC inputs
+        ctr = RoboHATRCReceiver(steering_channel=cfg.RC_STEERING_CHANNEL,
+                                throttle_channel=cfg.RC_THROTTLE_CHANNEL,
+                                timeout=cfg.RC_FAILSAFE_TIMEOUT,
+                                throttle_scale=cfg.RC_MAX_THROTTLE,
+                                auto_record_on_throttle=cfg.AUTO_RECORD_ON_THROTTLE)
+    elif use_joystick or cfg.USE_JOYSTICK_AS_DEFAULT:
         #ctr = PS4JoystickController(steering_scale=cfg.JOYSTICK_STEERING_SCALE,
         #                         auto_record_on_throttle=cfg.AUTO_RECORD_ON_THROTTLE)
-        ctr = SerialDevice()
+        ctr = SerialController()
     else:
         # This web controller will create a web server that is capable
         # of managing steering, throttle, and modes, and more.
@@ -105,34 +114,35 @@ def drive(cfg, model_path=None, use_joystick=False, use_chaos=False):
           outputs=['angle', 'throttle'])
 
     ## MUST: choose one of the below controllers
-    actuator_type = cfg.ACTUATOR_MODE # normal, seesaw, serial
+    actuator_type = cfg.ACTUATOR_TYPE # normal, seesaw, serial
 
     if actuator_type == 'serial':
-        pass
-        #steering_controller = SerialDevice(cfg.STEERING_CHANNEL)
-        #throttle_controller = SerialDevice(cfg.THROTTLE_CHANNEL)
+        # there is no part in this tree that sends angle and throttle to a
+        # serial motor board; say so before the vehicle starts
+        raise ValueError("ACTUATOR_TYPE 'serial' has no actuator part here; "
+                         "use 'seesaw' for the Robo HAT MM1 or 'normal' for a PCA9685")
     elif actuator_type == 'seesaw':
-        steering_controller = RoboHATMM1(cfg.STEERING_CHANNEL)
-        throttle_controller = RoboHATMM1(cfg.THROTTLE_CHANNEL)
+        steering_controller = ROBOHATMM1(cfg.STEERING_CHANNEL)
+        throttle_controller = ROBOHATMM1(cfg.THROTTLE_CHANNEL)
     else:
         steering_controller = PCA9685(cfg.STEERING_CHANNEL)
         throttle_controller = PCA9685(cfg.THROTTLE_CHANNEL)
 
     ## This Creates the magic PWM parts for the Controllers above.
-    if actuator_type is not 'serial':
-        steering = PWMSteering(controller=steering_controller,
-                               left_pulse=cfg.STEERING_LEFT_PWM,
-                               right_pulse=cfg.STEERING_RIGHT_PWM)
-
-        throttle = PWMThrottle(controller=throttle_controller,
-                               max_pulse=cfg.THROTTLE_FORWARD_PWM,
-                               zero_pulse=cfg.THROTTLE_STOPPED_PWM,
-                               min_pulse=cfg.THROTTLE_REVERSE_PWM)
-
-        V.add(steering, inputs=['angle'])
-        V.add(throttle, inputs=['throttle'])
-    else:
-        V.add(SerialDevice(), inputs['angle', 'throttle'])
+    steering = PWMSteering(controller=steering_controller,
+                           left_pulse=cfg.STEERING_LEFT_PWM,
+                           right_pulse=cfg.STEERING_RIGHT_PWM)
+
+    throttle = PWMThrottle(controller=throttle_controller,
+                           max_pulse=cfg.THROTTLE_FORWARD_PWM,
+                           zero_pulse=cfg.THROTTLE_STOPPED_PWM,
+                           min_pulse=cfg.THROTTLE_REVERSE_PWM)
+
+    V.add(steering, inputs=['angle'])
+    V.add(throttle, inputs=['throttle'])
+
+    if actuator_type == 'seesaw' and cfg.SEESAW_TRACE:
+        V.add(SeesawTrace())
 
     # add tub to save data
     inputs = ['cam/image_array', 'user/angle', 'user/throttle', 'user/mode', 'timestamp']
@@ -7,6 +7,23 @@ are wrapped in a mixer class before being used in the drive loop.
 import time
 import donkeycar as dk
 
+# print a failing PWM write at most this often, seconds
+ERROR_REPORT_INTERVAL = 1.0
+
+
+def report_pwm_error(controller, err):
+    """
+    Count a failed PWM write and print it, at most once per
+    ERROR_REPORT_INTERVAL, so a flaky connector does not flood the console.
+    """
+    controller.errors += 1
+    now = time.time()
+    if now - controller.last_error_report < ERROR_REPORT_INTERVAL:
+        return
+    controller.last_error_report = now
+    print("Unexpected issue setting PWM (check wires to motor board): {0} "
+          "({1} errors so far)".format(err, controller.errors))
+
 
 class PCA9685:
     """
@@ -19,12 +36,14 @@ class PCA9685:
         self.pwm = Adafruit_PCA9685.PCA9685()
         self.pwm.set_pwm_freq(frequency)
         self.channel = channel
+        self.errors = 0
+        self.last_error_report = 0
 
     def set_pulse(self, pulse):
         try:
             self.pwm.set_pwm(self.channel, 0, pulse)
         except OSError as err:
-            print("Unexpected issue setting PWM (check wires to motor board): {0}".format(err))
+            report_pwm_error(self, err)
 
     def run(self, pulse):
         self.set_pulse(pulse)
@@ -32,25 +51,58 @@ class PCA9685:
 class ROBOHATMM1:
     """
     PWM motor controler using Robo MM1 HAT boards.
+
+    Pulses are given in PCA9685 ticks (1/4096 of a frame at tick_frequency)
+    so the STEERING_*_PWM and THROTTLE_*_PWM calibrations made for a PCA9685
+    carry over unchanged. Pass tick_frequency=None to give microseconds.
     """
-    def __init__(self, channel, frequency=50):
+    def __init__(self, channel, frequency=50, tick_frequency=60):
         from rm_robohat import robohat
+        from adafruit_seesaw.seesaw import RetryPolicy
         # Initialise the Robo HAT MM1 using the default address (0x49).
-        self.pwm = robohat._pulseout(channel)
-        self.pwm.frequency = frequency
+        # Retry failed transfers briefly, well inside one drive loop tick.
+        if robohat.seesaw.retry_policy is None:
+            robohat.seesaw.retry_policy = RetryPolicy(attempts=3, deadline=0.005)
+        self.pwm = robohat.pulse_out(channel, frequency=frequency)
         self.channel = channel
+        if tick_frequency:
+            self.us_per_tick = 1000000.0 / (tick_frequency * 4096)
+        else:
+            self.us_per_tick = 1.0
+        self.errors = 0
+        self.last_error_report = 0
 
     def set_pulse(self, pulse):
         try:
-            #print("pulse: ", pulse)
-            self.pwm.duty_cycle = pulse
+            self.pwm.pulse_us = pulse * self.us_per_tick
         except OSError as err:
-            print("Unexpected issue setting PWM (check wires to motor board): {0}".format(err))
+            report_pwm_error(self, err)
 
     def run(self, pulse):
         self.set_pulse(pulse)
 
 
+class SeesawTrace:
+    """
+    Records the Robo HAT MM1 seesaw bus traffic while the vehicle runs and
+    prints a per-register summary when the vehicle stops.
+    """
+    def __init__(self, seesaw=None):
+        from adafruit_seesaw.trace import Tracer
+        if seesaw is None:
+            from rm_robohat import robohat
+            seesaw = robohat.seesaw
+        self.tracer = Tracer(seesaw)
+
+    def run(self):
+        pass
+
+    def shutdown(self):
+        self.tracer.detach()
+        print("Seesaw bus trace:")
+        print(self.tracer.dump())
+
+
 class PWMSteering:
     """
     Wrapper over a PWM motor cotnroller to convert angles to PWM pulses.
@@ -0,0 +1,79 @@
+"""
+rc_receiver.py
+Manual driving from an RC transmitter, through a receiver plugged into the
+RC headers of a Robo HAT MM1. Replaces the web controller or joystick part.
+"""
+
+import time
+
+
+class RoboHATRCReceiver:
+    """
+    Reads steering and throttle pulses from the Robo HAT MM1 RC inputs and
+    publishes them as user/angle and user/throttle. When the receiver stops
+    sending (transmitter off, out of range) both drop to 0 until the signal
+    is back.
+
+    Needs seesaw firmware with the RC capture bank; see adafruit_seesaw.rcin.
+    """
+    def __init__(self, steering_channel=1, throttle_channel=2, timeout=0.1,
+                 center_pulse=1500, pulse_range=500, throttle_scale=1.0,
+                 auto_record_on_throttle=True, poll_rate=100):
+        from rm_robohat import robohat
+        from adafruit_seesaw.rcin import RCInput
+        # a seesaw of its own, so polling from the part's thread cannot
+        # interleave with the actuators' writes from the drive loop
+        self.rc = RCInput(robohat.seesaw.fork(), timeout=timeout)
+        # RC channels are numbered from 1 like the RCH headers
+        self.steering_channel = steering_channel - 1
+        self.throttle_channel = throttle_channel - 1
+        self.center_pulse = center_pulse
+        self.pulse_range = pulse_range
+        self.throttle_scale = throttle_scale
+        self.auto_record_on_throttle = auto_record_on_throttle
+        self.poll_interval = 1.0 / poll_rate
+        self.angle = 0.0
+        self.throttle = 0.0
+        self.signal = False
+        self.on = True
+
+    def poll(self):
+        """Read the receiver once and update angle and throttle."""
+        self.signal = self.rc.update()
+        if not self.signal:
+            self.angle = 0.0
+            self.throttle = 0.0
+            return
+        self.angle = self.rc.value(self.steering_channel, center=self.center_pulse,
+                                   span=self.pulse_range)
+        self.throttle = self.throttle_scale * self.rc.value(
+            self.throttle_channel, center=self.center_pulse, span=self.pulse_range)
+
+    def _outputs(self):
+        recording = self.auto_record_on_throttle and self.signal and self.throttle > 0
+        return self.angle, self.throttle, 'user', recording
+
+    def update(self):
+        while self.on:
+            try:
+                self.poll()
+            except OSError as err:
+                # a missed read is a lost signal, not a crashed vehicle
+                self.signal = False
+                self.angle = 0.0
+                self.throttle = 0.0
+                print("RC receiver read failed: {0}".format(err))
+            time.sleep(self.poll_interval)
+
+    def run_threaded(self, img_arr=None):
+        return self._outputs()
+
+    def run(self, img_arr=None):
+        self.poll()
+        return self._outputs()
+
+    def shutdown(self):
+        self.on = False
+        time.sleep(self.poll_interval)
+        print("RC receiver: {0} reads, {1} failsafes".format(self.rc.reads,
+                                                            self.rc.failsafes))